@@ -2,47 +2,47 @@
 # Use of this source code is governed by a BSD-style
 # license that can be found in the LICENSE file.
 
-from concurrent import futures
 import random
 import datetime
 import os
-import grpc
-from accounts_pb2 import *
-import accounts_pb2_grpc
 import logging
-from dotmap import DotMap
-from pymongo.mongo_client import MongoClient
-from flask import Flask, request, jsonify
-# set logging to debug
-logging.basicConfig(level=logging.DEBUG)
 
-from dotenv import load_dotenv
-load_dotenv()
-
-# db_host = os.getenv("DATABASE_HOST", "localhost")
-db_url = os.getenv("DB_URL")
-if db_url is None:
-    raise Exception("DB_URL environment variable is not set")
+if __name__ == "__main__":
+    # before the imports below, which read their settings from the environment;
+    # importing this module (the dashboard's inproc mode) has no side effects
+    from dotenv import load_dotenv
+    load_dotenv()
 
+from common import log, metrics, mongo, profiling, timing, tracing
+from common.server import serve_flask, serve_grpc
 
-# protocol = os.getenv('SERVICE_PROTOCOL')
-protocol = os.getenv('SERVICE_PROTOCOL', 'http')
-if protocol is None:
-    raise Exception("SERVICE_PROTOCOL environment variable is not set")
 
-protocol = protocol.lower()
-logging.debug(f"microservice protocol: {protocol}")
+# pool size, compression, write concern, ... are tuned via MONGO_* (see common/mongo.py)
+collection = mongo.get_collection("accounts")
+collection.ensure_index("account_number")
 
 
-uri = db_url
+def setup():
+    """Process-wide setup of the standalone service; the dashboard does its own."""
+    # LOG_LEVEL, LOG_FORMAT, ... (see common/log.py)
+    log.setup("accounts")
+    metrics.setup("accounts")
+    tracing.setup("accounts")
+    profiling.setup("accounts")
+    timing.setup("accounts")
 
-client = MongoClient(uri)
-#client = MongoClient(uri, maxPoolSize=200, minPoolSize=10) --> To increase the connection pool size
-db = client["bank"]
-collection = db["accounts"]
+    # db_host = os.getenv("DATABASE_HOST", "localhost")
+    if os.getenv("DB_URL") is None:
+        raise Exception("DB_URL environment variable is not set")
+    mongo.configure("accounts")
 
 
 class AccountsGeneric:
+    def __init__(self, on_created=()):
+        # called with the number of each account this process creates, e.g.
+        # by the dashboard's inproc mode to add it to the services' filters
+        self.on_created = list(on_created)
+
     def getAccountDetails(self, request):
         logging.debug("Get Account Details called")
         account = collection.find_one({"account_number": request.account_number})
@@ -55,6 +55,16 @@ class AccountsGeneric:
 
         return {}
 
+    def getAccountDetailsBatch(self, account_numbers):
+        """Details of many accounts in one query, by account number; unknown
+        numbers are left out. The owner's ``email_id`` is included so the
+        dashboard can tag its cached responses with it."""
+        accounts = collection.find(
+            {"account_number": {"$in": list(account_numbers)}},
+            {"_id": 0, "account_number": 1, "name": 1, "balance": 1, "currency": 1, "email_id": 1},
+        )
+        return {account["account_number"]: account for account in accounts}
+
     # Todo: check if the account already exist or not
 
     def createAccount(self, request):
@@ -64,7 +74,7 @@ class AccountsGeneric:
             {"email_id": request.email_id, "account_type": request.account_type}
         )
 
-        logging.debug(f" count: {count}")
+        logging.debug("count: %s", count)
 
         if count > 0:
             logging.debug("Account already exist")
@@ -90,6 +100,8 @@ class AccountsGeneric:
         account["created_at"] = datetime.datetime.now()
         # insert the account into the list of accounts
         collection.insert_one(account)
+        for listener in self.on_created:
+            listener(account["account_number"])
         return True  # CreateAccountResponse(result=True)
 
     def getAccounts(self, request):
@@ -132,100 +144,36 @@ class AccountsGeneric:
         return account_list
 
 
-class AccountDetailsService(accounts_pb2_grpc.AccountDetailsServiceServicer):
-    def __init__(self):
-        self.accounts = AccountsGeneric()
-
-    def getAccountDetails(self, request, context):
-
-        logging.debug("Get Account Details called")
-
-        account = self.accounts.getAccountDetails(request)
-
-        if len(account) > 0:
-            return AccountDetail(
-               account_number=account["account_number"],
-                name=account["name"],
-                balance=account["balance"],
-                currency=account["currency"],
-            )
-        return AccountDetail()
-
-    def createAccount(self, request, context):
-        # return self.accounts.createAccount(request)
-        result = self.accounts.createAccount(request)
-        return CreateAccountResponse(result=result)
-
-    def getAccounts(self, request, context):
-        # return self.accounts.getAccounts(request)
-        accounts = self.accounts.getAccounts(request)
-        account_list = []
-        for account in accounts:
-            account_list.append(
-                Account(
-                    account_number=account["account_number"],
-                    email_id=account["email_id"],
-                    account_type=account["account_type"],
-                    address=account["address"],
-                    govt_id_number=account["govt_id_number"],
-                    government_id_type=account["government_id_type"],
-                    name=account["name"],
-                    balance=account["balance"],
-                    currency=account["currency"],
-                )
-            )
-        return GetAccountsResponse(accounts=account_list)
-
-
-app = Flask(__name__)
-accounts_generic = AccountsGeneric()
-@app.route("/account-detail", methods=["POST"])
-def getAccountDetails():
-    data = request.json
-    data = DotMap(data)
-    # account_number = request.json["account_number"]
-    account = accounts_generic.getAccountDetails(data)
-    return jsonify(account)
-
-@app.route("/create-account", methods=["POST"])
-def createAccount():
-    data = request.json
-    data = DotMap(data)
-    result = accounts_generic.createAccount(data)
-    return jsonify(result)
-
-@app.route("/get-all-accounts", methods=["POST"])
-def getAccounts():
-    data = request.json
-    data = DotMap(data)
-    accounts = accounts_generic.getAccounts(data)
-    return jsonify(accounts)
+def create_app():
+    """The HTTP service (see ``accounts_http.py``)."""
+    import accounts_http
 
+    return accounts_http.create_app(AccountsGeneric())
 
 
 def serverFlask(port):
-    logging.debug(f"Starting Flask server on port {port}")
-    app.run(host='0.0.0.0' ,port=port, debug=True)    
+    logging.debug("Starting Flask server on port %s", port)
+    serve_flask(create_app(), port)
 
 
 def serverGRPC(port):
-    # recommendations_host = os.getenv("RECOMMENDATIONS_HOST", "localhost")
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
-    accounts_pb2_grpc.add_AccountDetailsServiceServicer_to_server(
-        AccountDetailsService(), server
+    logging.debug("Starting GRPC server on port %s", port)
+    # imported here: the HTTP service never loads grpc or the generated code
+    import accounts_grpc
+    from protobufs import accounts_pb2_grpc
+
+    serve_grpc(
+        accounts_grpc.AccountDetailsService(AccountsGeneric()),
+        accounts_pb2_grpc.add_AccountDetailsServiceServicer_to_server,
+        port,
     )
-    server.add_insecure_port(f"[::]:{port}")
-    # server.add_insecure_port(f"{recommendations_host}:50051")
-    # print server ip and port
-    logging.debug(f"Server started at port {port}")
-    # print IP
-    server.start()
-    server.wait_for_termination()
-
-
 
 
 if __name__ == "__main__":
+    setup()
+    protocol = os.getenv('SERVICE_PROTOCOL', 'http').lower()
+    logging.debug("microservice protocol: %s", protocol)
+
     port = 50051
     # serverGRPC(port)
     if protocol == "grpc":
@@ -0,0 +1,46 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""gRPC API of the accounts service (``SERVICE_PROTOCOL=grpc``)."""
+
+import logging
+
+from protobufs.accounts_pb2 import AccountDetail, CreateAccountResponse, GetAccountDetailsBatchResponse, GetAccountsResponse
+from protobufs import accounts_pb2_grpc
+
+from common import proto
+
+
+class AccountDetailsService(accounts_pb2_grpc.AccountDetailsServiceServicer):
+    def __init__(self, accounts_generic):
+        self.accounts = accounts_generic
+
+    def getAccountDetails(self, request, context):
+
+        logging.debug("Get Account Details called")
+
+        account = self.accounts.getAccountDetails(request)
+
+        if len(account) > 0:
+            return AccountDetail(
+               account_number=account["account_number"],
+                name=account["name"],
+                balance=account["balance"],
+                currency=account["currency"],
+            )
+        return AccountDetail()
+
+    def getAccountDetailsBatch(self, request, context):
+        accounts = self.accounts.getAccountDetailsBatch(request.account_numbers)
+        return proto.from_dict(GetAccountDetailsBatchResponse, {"accounts": list(accounts.values())})
+
+    def createAccount(self, request, context):
+        # return self.accounts.createAccount(request)
+        result = self.accounts.createAccount(request)
+        return CreateAccountResponse(result=result)
+
+    def getAccounts(self, request, context):
+        # return self.accounts.getAccounts(request)
+        accounts = self.accounts.getAccounts(request)
+        return proto.from_dict(GetAccountsResponse, {"accounts": accounts})
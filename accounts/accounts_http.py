@@ -0,0 +1,56 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""HTTP API of the accounts service (``SERVICE_PROTOCOL=http``)."""
+
+from dotmap import DotMap
+from flask import Flask, request, jsonify
+
+from common import compression, metrics, mongo, profiling, timing, tracing
+
+
+def create_app(accounts_generic):
+    app = Flask(__name__)
+    metrics.instrument_flask(app)
+    tracing.instrument_flask(app)
+    profiling.instrument_flask(app)
+    timing.instrument_flask(app)
+    compression.instrument_flask(app)
+
+    @app.route("/account-detail", methods=["POST"])
+    def getAccountDetails():
+        data = request.json
+        data = DotMap(data)
+        # account_number = request.json["account_number"]
+        account = accounts_generic.getAccountDetails(data)
+        return jsonify(account)
+
+    @app.route("/account-details", methods=["POST"])
+    def getAccountDetailsBatch():
+        # {"account_numbers": [...]} -> {account_number: details}
+        return jsonify(accounts_generic.getAccountDetailsBatch(request.json["account_numbers"]))
+
+    @app.route("/create-account", methods=["POST"])
+    def createAccount():
+        data = request.json
+        data = DotMap(data)
+        result = accounts_generic.createAccount(data)
+        return jsonify(result)
+
+    @app.route("/get-all-accounts", methods=["POST"])
+    def getAccounts():
+        data = request.json
+        data = DotMap(data)
+        accounts = accounts_generic.getAccounts(data)
+        return jsonify(accounts)
+
+    @app.route("/mongo-pool", methods=["GET"])
+    def getMongoPoolStats():
+        return jsonify(mongo.pool_stats())
+
+    @app.route("/mongo-queries", methods=["GET"])
+    def getMongoQueryStats():
+        return jsonify(mongo.query_stats())
+
+    return app
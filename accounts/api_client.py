@@ -3,8 +3,8 @@
 # license that can be found in the LICENSE file.
 
 import grpc
-from accounts_pb2_grpc import *
-from accounts_pb2 import *
+from protobufs.accounts_pb2_grpc import *
+from protobufs.accounts_pb2 import *
 
 channel = grpc.insecure_channel('localhost:50051')
 client = AccountDetailsServiceStub(channel)
@@ -5,21 +5,26 @@
 import functions_framework
 from flask import jsonify
 import os
-from pymongo import MongoClient
 import datetime
 import logging
 
-logging.basicConfig(level=logging.DEBUG)
+# shared client factory; stage ../../common into the function source before deploying
+from common import codec, compression, log, mongo
+
+# records are written synchronously: the instance may be throttled once a response is sent
+log.setup("loan-function", use_queue=False)
 
 # MongoDB connection
 DB_URL = os.environ.get('DB_URL')
 if DB_URL is None:
     raise Exception("DB_URL environment variable is not set")
 
-client = MongoClient(DB_URL)
-db = client["bank"]
-collection_accounts = db["accounts"]
-collection_loans = db["loans"]
+mongo.configure("loan-function")
+collection_accounts = mongo.get_collection("accounts", "ledger")
+collection_loans = mongo.get_collection("loans", "ledger")
+# portfolio counters maintained alongside every loan insert (see loan/loan.py)
+collection_loan_stats = mongo.get_collection("loan_stats", "stats")
+collection_loans.ensure_index([("email", 1), ("_id", -1)])
 
 class LoanGeneric:
     def ProcessLoanRequest(self, request_data):
@@ -37,8 +42,8 @@ class LoanGeneric:
         user_account = self.__getAccount(account_number)
         count = collection_accounts.count_documents({"email_id": email, 'account_number': account_number})
 
-        logging.debug(f"user account: {user_account}")
-        logging.debug(f"Count: {count}")
+        logging.debug("user account: %s", user_account)
+        logging.debug("Count: %s", count)
         
         if count == 0:
             return {"approved": False, "message": "Email or Account number not found."}
@@ -62,6 +67,15 @@ class LoanGeneric:
         }
 
         collection_loans.insert_one(loan_request)
+        collection_loan_stats.update_one(
+            {
+                "day": loan_request["timestamp"].strftime("%Y-%m-%d"),
+                "loan_type": loan_type,
+                "status": loan_request["status"],
+            },
+            {"$inc": {"count": 1, "total_amount": loan_amount}},
+            upsert=True,
+        )
         return {"approved": result, "message": message}
 
     def getLoanHistory(self, request_data):
@@ -82,11 +96,20 @@ class LoanGeneric:
                 "interest_rate": l["interest_rate"],
                 "time_period": l["time_period"],
                 "status": l["status"],
-                "timestamp": f"{l['timestamp']}",
+                "timestamp": l["timestamp"],
             })
 
         return loan_history
 
+    def getLoanHistoryVersion(self, request_data):
+        # loans are insert-only: count + newest _id changes with the history
+        email = request_data["email"]
+        count = collection_loans.count_documents({"email": email})
+        if count == 0:
+            return "0"
+        newest = collection_loans.find_one({"email": email}, {"_id": 1}, sort=[("_id", -1)])
+        return f"{count}-{newest['_id']}"
+
     def __getAccount(self, account_num):
         accounts = collection_accounts.find()
         for acc in accounts:
@@ -151,7 +174,7 @@ def process_loan_request(request):
         return (jsonify(result), 200, headers)
     
     except KeyError as e:
-        logging.error(f"Missing field: {str(e)}")
+        logging.error("Missing field: %s", e)
         return (jsonify({"error": f"Missing field: {str(e)}"}), 400, headers)
     except Exception as e:
         logging.exception("Loan processing error")
@@ -165,12 +188,13 @@ def get_loan_history(request):
         headers = {
             'Access-Control-Allow-Origin': '*',
             'Access-Control-Allow-Methods': 'POST',
-            'Access-Control-Allow-Headers': 'Content-Type',
+            'Access-Control-Allow-Headers': 'Content-Type, If-None-Match',
         }
         return ('', 204, headers)
     
     headers = {
         'Access-Control-Allow-Origin': '*',
+        'Access-Control-Expose-Headers': 'ETag',
         'Content-Type': 'application/json'
     }
     
@@ -186,9 +210,19 @@ def get_loan_history(request):
         if not request_json or "email" not in request_json:
             return (jsonify({"error": "Email is required"}), 400, headers)
         
+        # Conditional request: skip the query and body when nothing changed
+        etag_encodings = compression.strip_etag_encodings(request.environ)
+        version = loan_service.getLoanHistoryVersion(request_json)
+        headers['ETag'] = f'"{version}"'
+        if request.if_none_match.contains(version):
+            if version in etag_encodings:
+                headers['ETag'] = compression.encoded_etag(headers['ETag'], etag_encodings[version])
+            return ('', 304, headers)
+
         result = loan_service.getLoanHistory(request_json)
         # Wrap in response object to match dashboard API format
-        return (jsonify({"response": result}), 200, headers)
+        body, _ = compression.encode(request.accept_encodings, codec.dumps({"response": result}), headers)
+        return (body, 200, headers)
     
     except Exception as e:
         logging.exception("History retrieval error")
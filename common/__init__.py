@@ -0,0 +1,7 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+# Code shared by the Python microservices (accounts, transactions, loan and
+# dashboard). Images copy this directory next to protobufs/ and put /service
+# on PYTHONPATH.
@@ -0,0 +1,223 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""In-memory Bloom filter of known account numbers.
+
+Transfers and loans look an account up by number before doing anything else.
+``AccountFilter`` lets a service reject account numbers that definitely do not
+exist (typos, fuzzing) without a MongoDB round trip. A Bloom filter never gives
+false negatives, so every account it has seen is always let through; unknown
+numbers are let through with probability ``error_rate``.
+
+The filter is kept fresh off the request path: a background thread reads the
+accounts inserted since its last catch-up (an ``_id`` range, normally empty)
+every ``catchup_interval_ms``, and ``add`` records an account created in this
+process (the dashboard's ``inproc`` mode). An account created by another
+process is therefore accepted once the next catch-up has run, at most
+``catchup_interval_ms`` later.
+"""
+
+import datetime
+import hashlib
+import logging
+import math
+import os
+import threading
+import time
+
+from bson.objectid import ObjectId
+
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def __positions(self, key):
+        # Kirsch-Mitzenmacher double hashing over one 128-bit digest
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, key):
+        added = False
+        for p in self.__positions(key):
+            mask = 1 << (p & 7)
+            if not self.bits[p >> 3] & mask:
+                self.bits[p >> 3] |= mask
+                added = True
+        if added:
+            self.count += 1
+
+    def __contains__(self, key):
+        bits = self.bits
+        return all(bits[p >> 3] & (1 << (p & 7)) for p in self.__positions(key))
+
+    def expected_error_rate(self):
+        # (1 - e^(-kn/m))^k for the current number of entries
+        return (1 - math.exp(-self.num_hashes * self.count / self.num_bits)) ** self.num_hashes
+
+
+class AccountFilter:
+    # accounts service replicas generate ObjectIds independently, so catch-up
+    # re-reads a short overlap window instead of trusting strict _id order
+    CATCHUP_OVERLAP = datetime.timedelta(seconds=5)
+    BUILD_RETRY_S = 5.0
+
+    def __init__(self, collection, capacity=1000000, error_rate=0.01, catchup_interval_ms=250, enabled=True):
+        self.collection = collection
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.catchup_interval = catchup_interval_ms / 1000.0
+        self.enabled = enabled
+        self.bloom = None
+        self.high_water = None
+        self.thread = None
+        self.lock = threading.Lock()
+        self.stats_counters = {
+            "checks": 0,
+            "rejections": 0,
+            "catchups": 0,
+            "false_positives": 0,
+        }
+        self.rebuild_seconds = None
+        os.register_at_fork(after_in_child=self.__afterFork)
+
+    @classmethod
+    def from_env(cls, collection):
+        """A filter configured by ``ACCOUNT_FILTER_*``."""
+        return cls(
+            collection,
+            capacity=int(os.getenv("ACCOUNT_FILTER_CAPACITY", "1000000")),
+            error_rate=float(os.getenv("ACCOUNT_FILTER_ERROR_RATE", "0.01")),
+            catchup_interval_ms=int(os.getenv("ACCOUNT_FILTER_CATCHUP_MS", "250")),
+            enabled=os.getenv("ACCOUNT_FILTER_ENABLED", "true").lower() == "true",
+        )
+
+    def __afterFork(self):
+        # the background thread is not copied into a forked worker; a filter
+        # the parent had built is kept and ensure_started resumes catching up
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def ensure_started(self):
+        """``start`` unless the background thread already runs in this process."""
+        self.start()
+
+    def start(self):
+        """Build the filter, then keep it caught up, in a background thread;
+        until it is built every number passes."""
+        if not self.enabled:
+            return
+        with self.lock:
+            if self.thread is not None:
+                return
+            self.thread = threading.Thread(target=self.__run, name="account-filter", daemon=True)
+        self.thread.start()
+
+    def __run(self):
+        while self.bloom is None:
+            try:
+                self.rebuild()
+            except Exception:
+                logging.exception("Account filter build failed, retrying in %ss", self.BUILD_RETRY_S)
+                time.sleep(self.BUILD_RETRY_S)
+        while True:
+            time.sleep(self.catchup_interval)
+            try:
+                self.catch_up()
+            except Exception:
+                logging.exception("Account filter catch-up failed")
+
+    def rebuild(self):
+        start = time.perf_counter()
+        capacity = self.capacity
+        bloom = BloomFilter(capacity, self.error_rate)
+        high_water = None
+        # stream only the account numbers, sorted so the last _id is the high-water mark
+        cursor = self.collection.find({}, {"account_number": 1}).sort("_id", 1).batch_size(10000)
+        for acc in cursor:
+            if "account_number" in acc:
+                bloom.add(acc["account_number"])
+            high_water = acc["_id"]
+            if bloom.count > capacity:
+                capacity *= 2
+                logging.info("Account filter over capacity, rebuilding with capacity %s", capacity)
+                self.capacity = capacity
+                return self.rebuild()
+
+        with self.lock:
+            self.bloom = bloom
+            self.high_water = high_water
+        self.rebuild_seconds = time.perf_counter() - start
+        logging.info(
+            f"Account filter built: {bloom.count} accounts, {len(bloom.bits)} bytes, "
+            f"{bloom.num_hashes} hashes, expected false-positive rate {bloom.expected_error_rate():.4%}, "
+            f"{self.rebuild_seconds:.3f}s"
+        )
+
+    def catch_up(self):
+        """Add the accounts inserted since the last catch-up (or rebuild)."""
+        with self.lock:
+            query = {}
+            if self.high_water is not None:
+                since = self.high_water.generation_time - self.CATCHUP_OVERLAP
+                query = {"_id": {"$gte": ObjectId.from_datetime(since)}}
+            for acc in self.collection.find(query, {"account_number": 1}).sort("_id", 1):
+                if "account_number" in acc:
+                    self.bloom.add(acc["account_number"])
+                self.high_water = max(self.high_water, acc["_id"]) if self.high_water else acc["_id"]
+            self.stats_counters["catchups"] += 1
+        if self.bloom.count > self.bloom.capacity:
+            self.capacity = self.bloom.capacity * 2
+            self.rebuild()
+
+    def add(self, account_number):
+        """Record an account created in this process."""
+        with self.lock:
+            if self.bloom is not None:
+                self.bloom.add(account_number)
+
+    def might_contain(self, account_number):
+        """False only when ``account_number`` is definitely not an account
+        known at the last catch-up; never touches MongoDB."""
+        bloom = self.bloom
+        if bloom is None:
+            return True
+        self.stats_counters["checks"] += 1
+        if account_number in bloom:
+            return True
+        self.stats_counters["rejections"] += 1
+        return False
+
+    def record_false_positive(self):
+        """Called when the filter let a number through but the lookup found nothing."""
+        if self.bloom is not None:
+            self.stats_counters["false_positives"] += 1
+
+    def stats(self):
+        bloom = self.bloom
+        if bloom is None:
+            return {"enabled": self.enabled, "ready": False}
+        # of the unknown numbers seen, the share the filter let through
+        unknown = self.stats_counters["false_positives"] + self.stats_counters["rejections"]
+        return {
+            "enabled": self.enabled,
+            "ready": True,
+            "accounts": bloom.count,
+            "capacity": bloom.capacity,
+            "bits": bloom.num_bits,
+            "hashes": bloom.num_hashes,
+            "memory_bytes": len(bloom.bits),
+            "target_false_positive_rate": bloom.error_rate,
+            "expected_false_positive_rate": bloom.expected_error_rate(),
+            "observed_false_positive_rate": (self.stats_counters["false_positives"] / unknown) if unknown else 0.0,
+            "rebuild_seconds": self.rebuild_seconds,
+            **self.stats_counters,
+        }
@@ -0,0 +1,84 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""DataLoader-style micro-batching of lookups by key.
+
+``Batcher.load(key)`` queues ``key`` and waits for its batch: the first key of
+a batch waits ``window_ms`` (or until ``max_batch`` distinct keys are queued),
+then calls ``load_many(keys)`` once for the whole batch and every waiting
+caller gets its value from the returned ``{key: value}`` dict (``None`` for
+keys missing from it; an exception of ``load_many`` is raised to all of them).
+The call runs in the request of the batch's first key, so its trace and
+``Server-Timing`` carry the downstream call.
+
+Lookups are only concurrent within a process, so batches of more than one
+request need a threaded or gevent server (``WEB_WORKER_CLASS=threads`` or
+``gevent``). ``batch_size`` (keys per call: ``_sum`` keys, ``_count`` calls)
+and ``batch_wait_seconds`` (time from ``load`` to the call) measure the round
+trips saved and the latency added.
+"""
+
+import threading
+import time
+
+from common import metrics
+
+
+class _Batch:
+    __slots__ = ("keys", "full", "done", "results", "error")
+
+    def __init__(self):
+        # key -> time it was queued
+        self.keys = {}
+        self.full = threading.Event()
+        self.done = threading.Event()
+        self.results = None
+        self.error = None
+
+
+class Batcher:
+    def __init__(self, name, load_many, window_ms=2, max_batch=100):
+        self.name = name
+        self.load_many = load_many
+        self.window = window_ms / 1000.0
+        self.max_batch = max_batch
+        self.lock = threading.Lock()
+        self.batch = None
+
+    def load(self, key):
+        if self.window <= 0:
+            return self.load_many([key]).get(key)
+        with self.lock:
+            batch = self.batch
+            first = batch is None
+            if first:
+                batch = self.batch = _Batch()
+            batch.keys.setdefault(key, time.perf_counter())
+            if len(batch.keys) >= self.max_batch:
+                # later keys start a new batch
+                self.batch = None
+                batch.full.set()
+
+        if first:
+            batch.full.wait(self.window)
+            with self.lock:
+                if self.batch is batch:
+                    self.batch = None
+            self.__dispatch(batch)
+        else:
+            batch.done.wait()
+        if batch.error is not None:
+            raise batch.error
+        return batch.results.get(key)
+
+    def __dispatch(self, batch):
+        start = time.perf_counter()
+        metrics.batch_dispatched(self.name, len(batch.keys), [start - queued for queued in batch.keys.values()])
+        try:
+            batch.results = self.load_many(list(batch.keys))
+        except BaseException as e:
+            batch.error = e
+            raise
+        finally:
+            batch.done.set()
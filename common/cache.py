@@ -0,0 +1,135 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Key/value cache backends with expiry and tag invalidation.
+
+Entries live in named caches (``get(cache, key)``, ``set(cache, key, ...)``);
+values are ``bytes``. Every entry can carry tags (e.g. ``account:<number>``)
+and ``invalidate(tag)`` drops every entry carrying it, in any cache:
+
+======================================  =====================================
+``CACHE_BACKEND``                       ``none`` (default), ``memory`` or ``redis``
+``CACHE_MAX_ENTRIES``                   size of the ``memory`` LRU, default 10000
+``CACHE_REDIS_URL``                     ``redis`` server, default ``redis://localhost:6379/0``
+======================================  =====================================
+
+``memory`` is an LRU inside the process: each gunicorn worker has its own,
+and an invalidation only reaches the worker that handled the write. ``redis``
+is shared by every worker and replica (any server speaking the Redis
+protocol can stand in for it locally) and needs the optional ``redis``
+package. Lookups are counted in ``cache_requests_total`` and dropped entries
+in ``cache_evictions_total`` (``reason`` is ``lru``, ``expired`` or
+``invalidated``).
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from common import metrics
+
+# tag sets outlive the entries they point to
+TAG_TTL_S = 24 * 3600
+
+
+class MemoryBackend:
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        # (cache, key) -> (expires, value, tags), least recently used first
+        self.entries = OrderedDict()
+        self.tags = {}
+        os.register_at_fork(after_in_child=self.__reset)
+
+    def __reset(self):
+        self.lock = threading.Lock()
+
+    def get(self, cache, key):
+        key = (cache, key)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                self.__drop(key)
+                metrics.cache_evicted(cache, "expired")
+                entry = None
+            if entry is not None:
+                self.entries.move_to_end(key)
+        return entry[1] if entry is not None else None
+
+    def set(self, cache, key, value, ttl, tags=()):
+        key = (cache, key)
+        with self.lock:
+            if key in self.entries:
+                self.__drop(key)
+            self.entries[key] = (time.monotonic() + ttl, value, tuple(tags))
+            for tag in tags:
+                self.tags.setdefault(tag, set()).add(key)
+            while len(self.entries) > self.max_entries:
+                oldest = next(iter(self.entries))
+                self.__drop(oldest)
+                metrics.cache_evicted(oldest[0], "lru")
+
+    def invalidate(self, tag):
+        with self.lock:
+            keys = self.tags.pop(tag, ())
+            for key in keys:
+                self.__drop(key)
+        for cache, _ in keys:
+            metrics.cache_evicted(cache, "invalidated")
+
+    def __drop(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self.tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.tags[tag]
+
+
+class RedisBackend:
+    def __init__(self, url):
+        try:
+            import redis
+        except ImportError:
+            raise Exception("CACHE_BACKEND=redis requires the redis package")
+        self.redis = redis.Redis.from_url(url)
+
+    def get(self, cache, key):
+        return self.redis.get(f"cache:{cache}:{key}")
+
+    def set(self, cache, key, value, ttl, tags=()):
+        key = f"cache:{cache}:{key}"
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.set(key, value, px=int(ttl * 1000))
+        for tag in tags:
+            pipe.sadd(f"tag:{tag}", key)
+            pipe.expire(f"tag:{tag}", TAG_TTL_S)
+        pipe.execute()
+
+    def invalidate(self, tag):
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.smembers(f"tag:{tag}")
+        pipe.delete(f"tag:{tag}")
+        keys = pipe.execute()[0]
+        if keys:
+            self.redis.delete(*keys)
+        # includes entries that had already expired
+        for key in keys:
+            metrics.cache_evicted(key.decode().split(":")[1], "invalidated")
+
+
+def from_env():
+    """The configured backend, or None when caching is off."""
+    backend = os.getenv("CACHE_BACKEND", "none").lower()
+    if backend == "none":
+        return None
+    if backend == "memory":
+        return MemoryBackend(int(os.getenv("CACHE_MAX_ENTRIES", 10000)))
+    if backend == "redis":
+        return RedisBackend(os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0"))
+    raise ValueError(f"Unknown CACHE_BACKEND: {backend} (expected none, memory or redis)")
@@ -0,0 +1,56 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""JSON encoding and decoding shared by the Python services.
+
+``dumps`` returns UTF-8 ``bytes`` and ``loads`` accepts ``bytes`` or ``str``.
+Both use ``orjson`` when it is installed (``JSON_CODEC=json`` forces the
+standard library). ``datetime``/``date`` values are written as ISO 8601
+(``2024-05-01T12:30:00.123000``) and ``ObjectId`` as its hex string, so
+MongoDB documents can be returned without converting every row.
+``common.flask_json.JSONProvider`` makes ``jsonify`` and ``request.json``
+use this codec.
+"""
+
+import datetime
+import json
+import os
+
+from bson.objectid import ObjectId
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+if os.getenv("JSON_CODEC", "orjson").lower() == "json":
+    orjson = None
+
+BACKEND = "orjson" if orjson is not None else "json"
+
+
+def _default(value):
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    _OPTIONS = orjson.OPT_NON_STR_KEYS
+
+    def dumps(value):
+        return orjson.dumps(value, default=_default, option=_OPTIONS)
+
+    loads = orjson.loads
+else:
+    _encoder = json.JSONEncoder(default=_default, ensure_ascii=False, separators=(",", ":"))
+
+    def dumps(value):
+        return _encoder.encode(value).encode()
+
+    def loads(data):
+        return json.loads(data)
+
@@ -0,0 +1,244 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Response compression: ``Accept-Encoding`` negotiation for the Flask apps
+and size-based message compression for the gRPC servers.
+
+======================================  =====================================
+``COMPRESSION``                         HTTP encodings by preference, default ``zstd,br,gzip``; ``none`` disables
+``COMPRESSION_MIN_BYTES``               smaller HTTP bodies are sent as they are, default 1024
+``COMPRESSION_GZIP_LEVEL``              default 6
+``COMPRESSION_BROTLI_QUALITY``          default 4
+``COMPRESSION_ZSTD_LEVEL``              default 1
+``GRPC_COMPRESSION``                    ``none`` (default), ``gzip`` or ``deflate``
+``GRPC_COMPRESSION_MIN_BYTES``          smaller messages are sent as they are, default 1024
+======================================  =====================================
+
+``instrument_flask(app)`` compresses a response with the encoding the client
+accepts with the highest q-value (ties go to the order of ``COMPRESSION``).
+``br`` needs the optional ``brotli`` package and ``zstd`` the ``zstandard``
+package; encodings whose package is missing are skipped. Bodies under the
+threshold, streamed responses (the dashboard's proxy routes), responses that
+already carry a ``Content-Encoding`` and non-text types are sent as they are.
+A compressed response's ETag gets the encoding as a suffix (``"v"`` becomes
+``"v-gzip"``), since its bytes differ from the identity response's; the suffix
+is removed from ``If-None-Match`` before the handler compares it with the
+data's ETag and put back on the 304. Responses that may be compressed get
+``Vary: Accept-Encoding``. The time spent is the ``compress``
+phase of ``Server-Timing``. ``encode`` does the same for handlers outside
+a Flask app (the loan history cloud function).
+
+With ``GRPC_COMPRESSION`` set, ``common.server.serve_grpc`` builds its server
+with that algorithm and ``instrument_rpc`` sends responses under
+``GRPC_COMPRESSION_MIN_BYTES`` as they are, so only large ones (the
+histories) are compressed; gRPC clients decompress them transparently. It is off by default: inside
+the cluster, compressing a history takes longer than sending it.
+``compressed_responses_total`` counts responses by encoding (``identity``
+for compressible ones sent as they are) and ``compression_bytes_total`` the
+HTTP bytes before (``in``) and after (``out``) compression.
+"""
+
+import gzip
+import os
+import re
+import threading
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional encoding
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional encoding
+    zstandard = None
+
+MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", 1024))
+GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", 6))
+BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", 4))
+ZSTD_LEVEL = int(os.getenv("COMPRESSION_ZSTD_LEVEL", 1))
+GRPC_MIN_BYTES = int(os.getenv("GRPC_COMPRESSION_MIN_BYTES", 1024))
+
+TEXT_TYPES = frozenset((
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+))
+
+_zstd = threading.local()
+
+# a quoted entity tag with the suffix ``encode`` adds
+_ENCODED_ETAG = re.compile(r'"([^"]*)-(zstd|br|gzip)"')
+
+
+def _gzip(body):
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def _brotli(body):
+    return brotli.compress(body, quality=BROTLI_QUALITY)
+
+
+def _zstandard(body):
+    # compressors are not thread-safe
+    compressor = getattr(_zstd, "compressor", None)
+    if compressor is None:
+        compressor = _zstd.compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+    return compressor.compress(body)
+
+
+CODECS = {
+    "gzip": _gzip,
+    "br": _brotli if brotli is not None else None,
+    "zstd": _zstandard if zstandard is not None else None,
+}
+
+
+def _configured():
+    names = [name.strip().lower() for name in os.getenv("COMPRESSION", "zstd,br,gzip").split(",") if name.strip()]
+    if names == ["none"]:
+        return ()
+    for name in names:
+        if name not in CODECS:
+            raise ValueError(f"Unknown COMPRESSION encoding: {name} (expected zstd, br, gzip or none)")
+    return tuple(name for name in names if CODECS[name] is not None)
+
+
+ENCODINGS = _configured()
+
+
+def negotiate(accept_encodings):
+    """The encoding to use for a client's ``Accept-Encoding`` (werkzeug's
+    ``request.accept_encodings``), or None."""
+    best, best_quality = None, 0
+    for name in ENCODINGS:
+        quality = accept_encodings.quality(name)
+        if quality > best_quality:
+            best, best_quality = name, quality
+    return best
+
+
+def compress(body, encoding):
+    return CODECS[encoding](body)
+
+
+def add_vary(headers):
+    vary = headers.get("Vary")
+    if not vary:
+        headers["Vary"] = "Accept-Encoding"
+    elif "accept-encoding" not in vary.lower() and vary.strip() != "*":
+        headers["Vary"] = f"{vary}, Accept-Encoding"
+
+
+def encoded_etag(etag, encoding):
+    """``etag`` (a header value, quoted) of the ``encoding`` representation."""
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def strip_etag_encodings(environ):
+    """Remove the suffixes ``encode`` adds to ETags from the request's
+    ``If-None-Match``; ``{etag: encoding}`` of the tags changed."""
+    value = environ.get("HTTP_IF_NONE_MATCH")
+    if not value:
+        return {}
+    encodings = {m.group(1): m.group(2) for m in _ENCODED_ETAG.finditer(value)}
+    if encodings:
+        environ["HTTP_IF_NONE_MATCH"] = _ENCODED_ETAG.sub(r'"\1"', value)
+    return encodings
+
+
+def encode(accept_encodings, body, headers):
+    """``(body, encoding)``: ``body`` compressed for the client, or as it is
+    with ``encoding`` None. Sets ``Content-Encoding``, ``Vary`` and the
+    encoded ``ETag`` in ``headers``."""
+    if len(body) < MIN_BYTES or not ENCODINGS:
+        return body, None
+    add_vary(headers)
+    encoding = negotiate(accept_encodings)
+    if encoding is None:
+        return body, None
+    compressed = compress(body, encoding)
+    if len(compressed) >= len(body):
+        return body, None
+    headers["Content-Encoding"] = encoding
+    if headers.get("ETag"):
+        headers["ETag"] = encoded_etag(headers["ETag"], encoding)
+    return compressed, encoding
+
+
+def _compressible(response):
+    if response.direct_passthrough or response.is_streamed:
+        return False
+    if response.status_code < 200 or response.status_code in (204, 206, 304):
+        return False
+    if "Content-Encoding" in response.headers:
+        return False
+    mimetype = response.mimetype or ""
+    return mimetype.startswith("text/") or mimetype in TEXT_TYPES or mimetype.endswith(("+json", "+xml"))
+
+
+def instrument_flask(app):
+    """Register after ``timing.instrument_flask`` so ``compress`` is in ``Server-Timing``."""
+    from flask import g, request
+
+    from common import metrics, timing
+
+    @app.before_request
+    def _decode_etags():
+        # before anything reads request.if_none_match
+        g.etag_encodings = strip_etag_encodings(request.environ)
+
+    @app.after_request
+    def _compress(response):
+        if response.status_code == 304:
+            encodings = g.get("etag_encodings")
+            etag = response.get_etag()[0]
+            if encodings and etag in encodings:
+                response.headers["ETag"] = encoded_etag(response.headers["ETag"], encodings[etag])
+            return response
+        if not ENCODINGS or not _compressible(response):
+            return response
+        body = response.get_data()
+        if len(body) < MIN_BYTES:
+            return response
+        with timing.phase("compress"):
+            compressed, encoding = encode(request.accept_encodings, body, response.headers)
+        if encoding is None:
+            metrics.compressed_response("http", "identity")
+            return response
+        response.set_data(compressed)
+        metrics.compressed_response("http", encoding)
+        metrics.compressed_bytes(encoding, len(body), len(compressed))
+        return response
+
+
+def grpc_algorithm():
+    import grpc
+
+    algorithms = {"none": None, "gzip": grpc.Compression.Gzip, "deflate": grpc.Compression.Deflate}
+    name = os.getenv("GRPC_COMPRESSION", "none").lower()
+    if name not in algorithms:
+        raise ValueError(f"Unknown GRPC_COMPRESSION: {name} (expected none, gzip or deflate)")
+    return name, algorithms[name]
+
+
+def instrument_rpc(name, method):
+    from common import metrics
+
+    encoding, algorithm = grpc_algorithm()
+    if algorithm is None:
+        return method
+
+    def handler(request, context):
+        response = method(request, context)
+        # the server compresses every message by default
+        if response is not None and response.ByteSize() < GRPC_MIN_BYTES:
+            context.disable_next_message_compression()
+            metrics.compressed_response("grpc", "identity")
+        else:
+            metrics.compressed_response("grpc", encoding)
+        return response
+
+    return handler
@@ -0,0 +1,38 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Flask JSON providers backed by ``common.codec``, kept apart from the codec
+so gRPC servers and cloud functions can use it without importing Flask."""
+
+from flask.json.provider import JSONProvider as FlaskJSONProvider
+
+from common import codec, timing
+
+
+class JSONProvider(FlaskJSONProvider):
+    """Flask JSON provider backed by ``codec.dumps``/``codec.loads``."""
+
+    mimetype = "application/json"
+
+    def dumps(self, obj, **kwargs):
+        return codec.dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return codec.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(codec.dumps(obj), mimetype=self.mimetype)
+
+
+class TimedJSONProvider(JSONProvider):
+    """The shared JSON provider, counting ``jsonify`` time as ``encode``."""
+
+    def dumps(self, obj, **kwargs):
+        with timing.phase("encode"):
+            return super().dumps(obj, **kwargs)
+
+    def response(self, *args, **kwargs):
+        with timing.phase("encode"):
+            return super().response(*args, **kwargs)
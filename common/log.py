@@ -0,0 +1,169 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Logging setup shared by the Python services.
+
+``setup(service)`` replaces ``logging.basicConfig(level=logging.DEBUG)``:
+
+======================================  =====================================
+``LOG_LEVEL``                           root level, default ``INFO``
+``LOG_LEVELS``                          per-logger levels, e.g. ``pymongo=DEBUG``
+``LOG_FORMAT``                          ``text`` (default) or ``json``
+``LOG_QUEUE``                           write records from a background thread, default on
+``LOG_SAMPLE_RATE``                     share of DEBUG/INFO records kept, default 1
+``LOG_SAMPLE_RATES``                    per-route rates, e.g. ``/transaction/history=0.01``
+======================================  =====================================
+
+Log with ``%``-style arguments (``logging.debug("Account: %s", doc)``) so that
+nothing is formatted unless the record is emitted, and guard arguments that
+are expensive to compute with ``enabled(logging.DEBUG)``.
+
+Sampling applies to DEBUG and INFO records only. Records logged while a Flask
+request is handled are sampled per request by the matched route (or by an
+explicit ``extra={"route": ...}``), so a kept request keeps all of its lines.
+With the queue on, callers only enqueue the record; formatting and I/O happen
+on a listener thread (restarted in forked workers).
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+
+TEXT_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+
+_service = None
+
+
+def _parse_pairs(value):
+    pairs = {}
+    for part in (value or "").split(","):
+        key, _, v = part.strip().rpartition("=")
+        if key:
+            pairs[key] = v
+    return pairs
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; ``severity`` is understood by Cloud Logging."""
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "severity": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "service": _service,
+            "pid": record.process,
+        }
+        route = getattr(record, "route", None)
+        if route:
+            entry["route"] = route
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    def __init__(self, default_rate=1.0, route_rates=None):
+        super().__init__()
+        self.default_rate = default_rate
+        self.route_rates = route_rates or {}
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        route = getattr(record, "route", None)
+        flask = sys.modules.get("flask")
+        if route is None and flask is not None and flask.has_request_context():
+            # decide once per request so a kept request keeps all of its lines
+            g = flask.g
+            sampled = g.get("_log_sampled")
+            if sampled is None:
+                rule = flask.request.url_rule
+                sampled = g._log_sampled = self.__keep(rule.rule if rule is not None else None)
+            return sampled
+        return self.__keep(route)
+
+    def __keep(self, route):
+        rate = self.route_rates.get(route, self.default_rate)
+        return rate >= 1.0 or random.random() < rate
+
+
+class BackgroundQueueHandler(logging.handlers.QueueHandler):
+    """``QueueHandler`` feeding ``handler`` from a listener thread.
+
+    The listener thread does not survive ``fork``; a new queue and listener are
+    started on the first record in each process.
+    """
+
+    def __init__(self, handler):
+        super().__init__(queue.SimpleQueue())
+        self.handler = handler
+        self.listener = None
+        self.pid = None
+        atexit.register(self.stop)
+
+    def prepare(self, record):
+        # formatting happens on the listener thread
+        return record
+
+    def enqueue(self, record):
+        if self.pid != os.getpid():
+            # runs under the handler lock, which logging re-creates after fork
+            self.queue = queue.SimpleQueue()
+            self.listener = logging.handlers.QueueListener(self.queue, self.handler, respect_handler_level=True)
+            self.listener.start()
+            self.pid = os.getpid()
+        self.queue.put_nowait(record)
+
+    def stop(self):
+        if self.listener is not None and self.pid == os.getpid():
+            self.listener.stop()
+            self.listener = None
+            self.pid = None
+
+
+def setup(service, use_queue=None):
+    global _service
+    # the first service set up in a process names it (the dashboard imports
+    # the services with SERVICE_PROTOCOL=inproc)
+    if _service is not None:
+        return
+    _service = service
+
+    handler = logging.StreamHandler()
+    if os.getenv("LOG_FORMAT", "text").lower() == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+
+    if use_queue is None:
+        use_queue = os.getenv("LOG_QUEUE", "true").lower() in ("1", "true")
+    if use_queue:
+        handler = BackgroundQueueHandler(handler)
+
+    rates = {route: float(rate) for route, rate in _parse_pairs(os.getenv("LOG_SAMPLE_RATES")).items()}
+    default_rate = float(os.getenv("LOG_SAMPLE_RATE", "1"))
+    if rates or default_rate < 1.0:
+        handler.addFilter(SamplingFilter(default_rate, rates))
+
+    root = logging.getLogger()
+    for h in list(root.handlers):
+        root.removeHandler(h)
+    root.addHandler(handler)
+    root.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+
+    # the driver's own DEBUG logging is very chatty; opt in with LOG_LEVELS
+    levels = {"pymongo": "WARNING", **_parse_pairs(os.getenv("LOG_LEVELS"))}
+    for name, level in levels.items():
+        logging.getLogger(name).setLevel(level.upper())
+
+
+def enabled(level):
+    return logging.getLogger().isEnabledFor(level)
@@ -0,0 +1,273 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Prometheus metrics for the Python services.
+
+``setup(service)`` registers a MongoDB command listener (call it before the
+first query); ``instrument_flask(app)`` adds request metrics and ``GET /metrics``
+to a Flask app; ``common.server.serve_grpc`` instruments every RPC and serves
+``/metrics`` on a sidecar port (``METRICS_PORT``, default gRPC port + 1000,
+``0`` disables it).
+
+======================================  =====================================
+``http_requests_total``                 route, method, status
+``http_request_duration_seconds``       route, method (histogram)
+``http_requests_in_flight``             route
+``grpc_server_handled_total``           method, code
+``grpc_server_handling_seconds``        method (histogram)
+``grpc_server_in_flight``               method
+``mongodb_command_duration_seconds``    collection, command (histogram)
+``mongodb_command_failures_total``      collection, command
+``cache_requests_total``                cache, result (``hit``/``miss``)
+``cache_evictions_total``               cache, reason (``lru``/``expired``/``invalidated``)
+``singleflight_calls_total``            group, result (``leader``/``coalesced``)
+``circuit_breaker_state``               target (0 closed, 1 half-open, 2 open)
+``downstream_rejected_total``           target, reason (``circuit_open``/``deadline``)
+``hedged_requests_total``               target, result (``sent``/``won``)
+``batch_size``                          batcher (histogram of keys per batched call)
+``batch_wait_seconds``                  batcher (histogram of time from lookup to call)
+``compressed_responses_total``          protocol, encoding (``identity`` when sent as is)
+``compression_bytes_total``             encoding, stage (``in``/``out`` of compression)
+======================================  =====================================
+
+Every series also carries a ``service`` label. Samples are kept in
+``PROMETHEUS_MULTIPROC_DIR`` (a fresh temporary directory unless set), so a
+scrape of any gunicorn worker reports the totals of all workers.
+"""
+
+import glob
+import os
+import tempfile
+import time
+
+# must be set before prometheus_client is imported
+if not os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="martianbank-metrics-")
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client import multiprocess
+from pymongo import monitoring
+
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+MONGO_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+BATCH_SIZE_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP requests handled", ["service", "route", "method", "status"]
+)
+HTTP_SECONDS = Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ["service", "route", "method"], buckets=REQUEST_BUCKETS
+)
+HTTP_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "HTTP requests being handled", ["service", "route"], multiprocess_mode="livesum"
+)
+GRPC_HANDLED = Counter(
+    "grpc_server_handled_total", "RPCs completed", ["service", "method", "code"]
+)
+GRPC_SECONDS = Histogram(
+    "grpc_server_handling_seconds", "RPC latency", ["service", "method"], buckets=REQUEST_BUCKETS
+)
+GRPC_IN_FLIGHT = Gauge(
+    "grpc_server_in_flight", "RPCs being handled", ["service", "method"], multiprocess_mode="livesum"
+)
+MONGO_SECONDS = Histogram(
+    "mongodb_command_duration_seconds", "MongoDB command latency", ["service", "collection", "command"],
+    buckets=MONGO_BUCKETS,
+)
+MONGO_FAILURES = Counter(
+    "mongodb_command_failures_total", "Failed MongoDB commands", ["service", "collection", "command"]
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests_total", "Cache lookups", ["service", "cache", "result"]
+)
+CACHE_EVICTIONS = Counter(
+    "cache_evictions_total", "Cache entries dropped", ["service", "cache", "reason"]
+)
+SINGLEFLIGHT_CALLS = Counter(
+    "singleflight_calls_total", "Coalescable calls", ["service", "group", "result"]
+)
+BREAKER_STATE = Gauge(
+    "circuit_breaker_state", "Downstream circuit breaker state", ["service", "target"], multiprocess_mode="max"
+)
+DOWNSTREAM_REJECTED = Counter(
+    "downstream_rejected_total", "Downstream calls failed fast", ["service", "target", "reason"]
+)
+HEDGED_REQUESTS = Counter(
+    "hedged_requests_total", "Hedged downstream calls", ["service", "target", "result"]
+)
+BATCH_SIZE = Histogram(
+    "batch_size", "Keys per batched call", ["service", "batcher"], buckets=BATCH_SIZE_BUCKETS
+)
+BATCH_WAIT_SECONDS = Histogram(
+    "batch_wait_seconds", "Time a lookup waited for its batch", ["service", "batcher"], buckets=MONGO_BUCKETS
+)
+COMPRESSED_RESPONSES = Counter(
+    "compressed_responses_total", "Compressible responses by encoding", ["service", "protocol", "encoding"]
+)
+COMPRESSION_BYTES = Counter(
+    "compression_bytes_total", "Response bytes before and after compression", ["service", "encoding", "stage"]
+)
+
+_service = None
+
+
+class CommandListener(monitoring.CommandListener):
+    """Times MongoDB commands by collection and command name."""
+
+    def __init__(self):
+        # (connection, request id) -> collection; succeeded/failed events carry no command
+        self.pending = {}
+
+    def started(self, event):
+        target = event.command.get("collection") if event.command_name == "getMore" else event.command.get(event.command_name)
+        self.pending[(event.connection_id, event.request_id)] = target if isinstance(target, str) else ""
+
+    def succeeded(self, event):
+        collection = self.pending.pop((event.connection_id, event.request_id), "")
+        MONGO_SECONDS.labels(_service, collection, event.command_name).observe(event.duration_micros / 1e6)
+
+    def failed(self, event):
+        collection = self.pending.pop((event.connection_id, event.request_id), "")
+        MONGO_SECONDS.labels(_service, collection, event.command_name).observe(event.duration_micros / 1e6)
+        MONGO_FAILURES.labels(_service, collection, event.command_name).inc()
+
+
+def setup(service):
+    global _service
+    if _service is not None:
+        return
+    _service = service
+    # samples of a previous run in a configured directory would be added to ours
+    for path in glob.glob(os.path.join(os.environ["PROMETHEUS_MULTIPROC_DIR"], "*.db")):
+        os.remove(path)
+    monitoring.register(CommandListener())
+
+
+def cache_hit(cache):
+    CACHE_REQUESTS.labels(_service, cache, "hit").inc()
+
+
+def cache_miss(cache):
+    CACHE_REQUESTS.labels(_service, cache, "miss").inc()
+
+
+def cache_evicted(cache, reason):
+    CACHE_EVICTIONS.labels(_service, cache, reason).inc()
+
+
+def singleflight_call(group, result):
+    SINGLEFLIGHT_CALLS.labels(_service, group, result).inc()
+
+
+def breaker_state(target, state):
+    BREAKER_STATE.labels(_service, target).set(state)
+
+
+def downstream_rejected(target, reason):
+    DOWNSTREAM_REJECTED.labels(_service, target, reason).inc()
+
+
+def hedged(target, result):
+    HEDGED_REQUESTS.labels(_service, target, result).inc()
+
+
+def batch_dispatched(batcher, size, waits):
+    BATCH_SIZE.labels(_service, batcher).observe(size)
+    wait = BATCH_WAIT_SECONDS.labels(_service, batcher)
+    for seconds in waits:
+        wait.observe(seconds)
+
+
+def compressed_response(protocol, encoding):
+    COMPRESSED_RESPONSES.labels(_service, protocol, encoding).inc()
+
+
+def compressed_bytes(encoding, size, compressed_size):
+    COMPRESSION_BYTES.labels(_service, encoding, "in").inc(size)
+    COMPRESSION_BYTES.labels(_service, encoding, "out").inc(compressed_size)
+
+
+def exposition():
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry)
+
+
+def worker_exited(pid):
+    multiprocess.mark_process_dead(pid)
+
+
+def instrument_flask(app):
+    from flask import g, request
+
+    @app.before_request
+    def _metrics_start():
+        if request.path == "/metrics":
+            return
+        g._metrics_route = request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+        g._metrics_start = time.perf_counter()
+        HTTP_IN_FLIGHT.labels(_service, g._metrics_route).inc()
+
+    @app.after_request
+    def _metrics_record(response):
+        if "_metrics_start" in g:
+            _record(response.status_code)
+            g._metrics_recorded = True
+            # conditional requests answered from the client's copy
+            if request.if_none_match:
+                (cache_hit if response.status_code == 304 else cache_miss)("etag")
+        return response
+
+    @app.teardown_request
+    def _metrics_end(exc):
+        if "_metrics_start" in g:
+            if "_metrics_recorded" not in g:
+                _record(500)
+            HTTP_IN_FLIGHT.labels(_service, g._metrics_route).dec()
+
+    def _record(status):
+        route = g._metrics_route
+        HTTP_SECONDS.labels(_service, route, request.method).observe(time.perf_counter() - g._metrics_start)
+        HTTP_REQUESTS.labels(_service, route, request.method, str(status)).inc()
+
+    @app.route("/metrics")
+    def metrics():
+        return exposition(), 200, {"Content-Type": CONTENT_TYPE_LATEST}
+
+
+def instrument_rpc(name, method):
+    import grpc
+
+    def handler(request, context):
+        in_flight = GRPC_IN_FLIGHT.labels(_service, name)
+        in_flight.inc()
+        start = time.perf_counter()
+        code = None
+        try:
+            return method(request, context)
+        except Exception as e:
+            # aborts carry their status code; anything else is UNKNOWN
+            code = getattr(e, "code", None)
+            if not isinstance(code, grpc.StatusCode):
+                code = context.code() or grpc.StatusCode.UNKNOWN
+            raise
+        finally:
+            if code is None:
+                code = context.code() or grpc.StatusCode.OK
+            GRPC_SECONDS.labels(_service, name).observe(time.perf_counter() - start)
+            GRPC_HANDLED.labels(_service, name, code.name).inc()
+            in_flight.dec()
+
+    return handler
+
+
+def start_sidecar(grpc_port):
+    port = int(os.getenv("METRICS_PORT", grpc_port + 1000))
+    if port:
+        from prometheus_client import start_http_server
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        start_http_server(port, registry=registry)
+    return port
@@ -0,0 +1,279 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Shared, environment-configured MongoDB client for the Python services.
+
+Every service used to open its own ``MongoClient(uri)`` with driver defaults.
+``get_client`` returns one client per process, tuned from the environment:
+
+======================================  =====================================
+``DB_URL``                              connection string (required)
+``MONGO_DB_NAME``                       database name, default ``bank``
+``MONGO_MAX_POOL_SIZE``                 ``maxPoolSize``
+``MONGO_MIN_POOL_SIZE``                 ``minPoolSize``
+``MONGO_MAX_IDLE_TIME_MS``              ``maxIdleTimeMS``
+``MONGO_WAIT_QUEUE_TIMEOUT_MS``         ``waitQueueTimeoutMS``
+``MONGO_COMPRESSORS``                   ``zstd`` and/or ``zlib``, e.g. ``zstd,zlib``
+``MONGO_READ_PREFERENCE``               e.g. ``secondaryPreferred``
+``MONGO_APP_NAME``                      ``appName`` (defaults to the service)
+``MONGO_WRITE_CONCERN``                 default write concern, e.g. ``w=1``
+``MONGO_WRITE_CONCERN_<CLASS>``         write concern of one operation class
+``MONGO_SLOW_CHECKOUT_MS``              log pool checkouts slower than this
+``MONGO_QUERY_MONITOR``                 slow-query/COLLSCAN detector (``common.query_monitor``)
+======================================  =====================================
+
+Unset options keep the driver defaults. ``zstd`` needs the ``zstandard``
+package, which is in the services' requirements; ``snappy`` would need
+python-snappy, which is not installed. Write concerns are written as
+comma-separated ``key=value`` pairs (``w=majority,j=true,wtimeout=5000``).
+Operation classes used by the services are ``ledger`` (balances, transfers and
+loans), ``stats`` (derived counters) and ``default``.
+
+The client is fork-safe: a pre-fork server's workers each get their own client
+(and pool) on first use, and collections returned by ``get_collection`` resolve
+against the current process's client on every access. ``pool_stats`` reports
+connection-pool checkout waits so pool exhaustion under load is visible;
+``query_stats`` reports the query shapes seen by the query monitor.
+"""
+
+import logging
+import os
+import threading
+import time
+
+from pymongo import monitoring
+from pymongo.mongo_client import MongoClient
+from pymongo.write_concern import WriteConcern
+
+from common.query_monitor import QueryMonitor
+
+_client = None
+_client_pid = None
+_app_name = None
+_lock = threading.Lock()
+
+
+class PoolListener(monitoring.ConnectionPoolListener):
+    """Connection-pool metrics: checkout waits, failures and pool gauges."""
+
+    def __init__(self, slow_checkout_ms=None):
+        self.slow_checkout = slow_checkout_ms / 1000.0 if slow_checkout_ms else None
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.checkouts = 0
+            self.checkout_failures = 0
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+            self.connections_open = 0
+            self.connections_in_use = 0
+            self.waiting = 0
+
+    def stats(self):
+        with self.lock:
+            return {
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                "checkout_wait_avg_ms": (self.wait_total / self.checkouts * 1000) if self.checkouts else 0.0,
+                "checkout_wait_max_ms": self.wait_max * 1000,
+                "checkout_wait_total_ms": self.wait_total * 1000,
+                "connections_open": self.connections_open,
+                "connections_in_use": self.connections_in_use,
+                "waiting": self.waiting,
+            }
+
+    def connection_check_out_started(self, event):
+        self.local.started = time.perf_counter()
+        with self.lock:
+            self.waiting += 1
+
+    def connection_checked_out(self, event):
+        wait = time.perf_counter() - getattr(self.local, "started", time.perf_counter())
+        with self.lock:
+            self.waiting -= 1
+            self.checkouts += 1
+            self.connections_in_use += 1
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+        if self.slow_checkout is not None and wait > self.slow_checkout:
+            logging.warning("Slow MongoDB pool checkout: %.1f ms on %s", wait * 1000, event.address)
+
+    def connection_check_out_failed(self, event):
+        with self.lock:
+            self.waiting -= 1
+            self.checkout_failures += 1
+        logging.warning("MongoDB pool checkout failed on %s: %s", event.address, event.reason)
+
+    def connection_checked_in(self, event):
+        with self.lock:
+            self.connections_in_use -= 1
+
+    def connection_created(self, event):
+        with self.lock:
+            self.connections_open += 1
+
+    def connection_closed(self, event):
+        with self.lock:
+            self.connections_open -= 1
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+
+pool_listener = PoolListener(
+    slow_checkout_ms=float(os.environ["MONGO_SLOW_CHECKOUT_MS"]) if os.getenv("MONGO_SLOW_CHECKOUT_MS") else None
+)
+
+query_monitor = QueryMonitor.from_env() if os.getenv("MONGO_QUERY_MONITOR", "false").lower() in ("1", "true") else None
+
+
+def _int_env(name):
+    value = os.getenv(name)
+    return int(value) if value else None
+
+
+def parse_write_concern(value):
+    """``"w=majority,j=true,wtimeout=5000"`` -> ``WriteConcern``."""
+    options = {}
+    for part in value.split(","):
+        key, _, v = part.strip().partition("=")
+        if key == "w":
+            options["w"] = int(v) if v.isdigit() else v
+        elif key == "j":
+            options["j"] = v.lower() == "true"
+        elif key == "wtimeout":
+            options["wtimeout"] = int(v)
+        elif key:
+            raise ValueError(f"Unknown write concern option: {key}")
+    return WriteConcern(**options)
+
+
+def client_options(app_name=None):
+    options = {
+        "maxPoolSize": _int_env("MONGO_MAX_POOL_SIZE"),
+        "minPoolSize": _int_env("MONGO_MIN_POOL_SIZE"),
+        "maxIdleTimeMS": _int_env("MONGO_MAX_IDLE_TIME_MS"),
+        "waitQueueTimeoutMS": _int_env("MONGO_WAIT_QUEUE_TIMEOUT_MS"),
+        "compressors": os.getenv("MONGO_COMPRESSORS"),
+        "readPreference": os.getenv("MONGO_READ_PREFERENCE"),
+        "appName": os.getenv("MONGO_APP_NAME") or app_name,
+    }
+    if os.getenv("MONGO_WRITE_CONCERN"):
+        wc = parse_write_concern(os.environ["MONGO_WRITE_CONCERN"]).document
+        for key, option in (("w", "w"), ("wtimeout", "wTimeoutMS"), ("j", "journal")):
+            if key in wc:
+                options[option] = wc[key]
+    return {k: v for k, v in options.items() if v is not None}
+
+
+def configure(app_name):
+    """Name the service in server logs (``appName``); call before first use.
+    The first call wins: services imported by the dashboard share its client."""
+    global _app_name
+    if _app_name is None:
+        _app_name = app_name
+
+
+def get_client():
+    global _client, _client_pid
+    pid = os.getpid()
+    if _client is None or _client_pid != pid:
+        with _lock:
+            if _client is None or _client_pid != pid:
+                db_url = os.getenv("DB_URL")
+                if db_url is None:
+                    raise Exception("DB_URL environment variable is not set")
+                options = client_options(_app_name)
+                logging.debug("Creating MongoDB client (pid %s): %s", pid, options)
+                listeners = [pool_listener] if query_monitor is None else [pool_listener, query_monitor]
+                _client = MongoClient(db_url, event_listeners=listeners, **options)
+                _client_pid = pid
+    return _client
+
+
+def _after_fork_in_child():
+    # never reuse the parent's sockets; the child connects on first use
+    global _client, _client_pid, _lock
+    _client = None
+    _client_pid = None
+    _lock = threading.Lock()
+    pool_listener.reset()
+
+
+os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+def get_database(db_name=None):
+    return get_client()[db_name or os.getenv("MONGO_DB_NAME", "bank")]
+
+
+def write_concern_for(op_class):
+    value = os.getenv(f"MONGO_WRITE_CONCERN_{op_class.upper()}")
+    return parse_write_concern(value) if value else None
+
+
+class LazyCollection:
+    """Collection handle that resolves against the current process's client.
+
+    Module-level collections created at import time stay valid after a
+    pre-fork server forks its workers.
+    """
+
+    def __init__(self, name, op_class="default", db_name=None):
+        self._name = name
+        self._db_name = db_name
+        self._write_concern = write_concern_for(op_class)
+        self._collection = None
+        self._pid = None
+        self._indexes = []
+
+    def ensure_index(self, keys, **kwargs):
+        """``create_index`` on the first use in each process rather than at
+        import, so a service starts without a reachable MongoDB; a failed
+        creation is retried on the next use."""
+        self._indexes.append((keys, kwargs))
+        self._pid = None
+
+    def _resolve(self):
+        if self._collection is None or self._pid != os.getpid():
+            collection = get_database(self._db_name)[self._name]
+            if self._write_concern is not None:
+                collection = collection.with_options(write_concern=self._write_concern)
+            for keys, kwargs in self._indexes:
+                collection.create_index(keys, **kwargs)
+            self._collection = collection
+            self._pid = os.getpid()
+        return self._collection
+
+    def __getattr__(self, attr):
+        return getattr(self._resolve(), attr)
+
+
+def get_collection(name, op_class="default", db_name=None):
+    return LazyCollection(name, op_class=op_class, db_name=db_name)
+
+
+def pool_stats():
+    return dict(pool_listener.stats(), pid=os.getpid())
+
+
+def query_stats():
+    if query_monitor is None:
+        return {"enabled": False, "pid": os.getpid()}
+    return {"enabled": True, "pid": os.getpid(), "shapes": query_monitor.stats()}
@@ -0,0 +1,291 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""On-demand profiling of the Python services (off unless ``PROFILING_ENABLED``).
+
+======================================  =====================================
+``PROFILING_ENABLED``                   enable the profiling surface, default off
+``PROFILING_TOKEN``                     value the ``X-Profile`` header / admin calls must carry
+``PROFILING_DIR``                       where profiles are kept, default ``$TMPDIR/martianbank-profiles``
+``PROFILING_SAMPLE_HZ``                 sampling profiler rate, default 100
+``PROFILING_PORT``                      admin port of gRPC servers, default gRPC port + 2000
+======================================  =====================================
+
+Per request: a request carrying ``X-Profile: <token>`` (HTTP header or gRPC
+metadata key ``x-profile``) runs under ``cProfile``; the profile id comes
+back in the ``X-Profile-Id`` header (trailing metadata for gRPC). One request
+per process is profiled at a time; others run normally.
+
+Sampling: ``POST /debug/profiler/start`` samples the stacks of all threads of
+the process; ``POST /debug/profiler/stop`` stops and returns them as
+collapsed stacks (``flamegraph.pl`` / speedscope input), ``GET`` on
+``/debug/profiler`` returns them without stopping. ``GET
+/debug/profile/<id>`` returns a request profile (``.prof``, or the top
+functions with ``?format=text``).
+
+Flask apps get the routes from ``instrument_flask(app)``; gRPC servers serve
+them on ``PROFILING_PORT``. With gunicorn each worker is profiled separately,
+so use one worker (or the ``threads`` class) when profiling. Disabled, nothing
+is registered and RPC handlers are not wrapped.
+"""
+
+import cProfile
+import io
+import logging
+import os
+import pstats
+import re
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() in ("1", "true")
+
+_service = None
+_profile_lock = threading.Lock()
+_sampler = None
+
+
+def _token_ok(value):
+    token = os.getenv("PROFILING_TOKEN")
+    return bool(value) and (not token or value == token)
+
+
+def _profile_dir():
+    path = os.getenv("PROFILING_DIR", os.path.join(tempfile.gettempdir(), "martianbank-profiles"))
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _profile_path(profile_id):
+    if not re.fullmatch(r"[\w.-]+", profile_id):
+        return None
+    return os.path.join(_profile_dir(), f"{profile_id}.prof")
+
+
+def setup(service):
+    global _service
+    if _service is None:
+        _service = service
+
+
+class RequestProfile:
+    """cProfile of one request; ``None`` from ``start`` if another one runs."""
+
+    def __init__(self, name):
+        self.name = name
+        self.id = "%s-%s-%d-%d" % (_service, re.sub(r"\W+", "_", name).strip("_"), time.time() * 1000, os.getpid())
+        self.profiler = cProfile.Profile()
+
+    @classmethod
+    def start(cls, name):
+        if not _profile_lock.acquire(blocking=False):
+            return None
+        profile = cls(name)
+        profile.profiler.enable()
+        return profile
+
+    def finish(self):
+        self.profiler.disable()
+        _profile_lock.release()
+        self.profiler.dump_stats(_profile_path(self.id))
+        logging.info("Profiled %s: %s", self.name, self.id)
+        return self.id
+
+
+def profile_text(profile_id, limit=50):
+    path = _profile_path(profile_id)
+    if path is None or not os.path.exists(path):
+        return None
+    out = io.StringIO()
+    pstats.Stats(path, stream=out).sort_stats("cumulative").print_stats(limit)
+    return out.getvalue()
+
+
+def profile_bytes(profile_id):
+    path = _profile_path(profile_id)
+    if path is None or not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        return f.read()
+
+
+class Sampler:
+    """Samples the stacks of every other thread of the process."""
+
+    def __init__(self, hz):
+        self.interval = 1.0 / hz
+        self.stacks = Counter()
+        self.samples = 0
+        self.lock = threading.Lock()
+        self.running = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.running.set()
+        self.thread = threading.Thread(target=self.__run, name="profiler-sampler", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running.clear()
+        self.thread.join()
+
+    def __run(self):
+        own = threading.get_ident()
+        names = {}
+        while self.running.is_set():
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    key = (code.co_filename, code.co_name)
+                    label = names.get(key)
+                    if label is None:
+                        label = names[key] = f"{os.path.basename(code.co_filename)}:{code.co_name}"
+                    stack.append(label)
+                    frame = frame.f_back
+                with self.lock:
+                    self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+            time.sleep(self.interval)
+
+    def collapsed(self):
+        with self.lock:
+            stacks = self.stacks.most_common()
+        return "".join(f"{stack} {count}\n" for stack, count in stacks)
+
+
+def start_sampler():
+    global _sampler
+    if _sampler is not None and _sampler.running.is_set():
+        return False
+    _sampler = Sampler(float(os.getenv("PROFILING_SAMPLE_HZ", 100)))
+    _sampler.start()
+    logging.info("Sampling profiler started")
+    return True
+
+
+def stop_sampler():
+    if _sampler is None:
+        return None
+    if _sampler.running.is_set():
+        _sampler.stop()
+        logging.info("Sampling profiler stopped after %s samples", _sampler.samples)
+    return _sampler.collapsed()
+
+
+def sampled_stacks():
+    return _sampler.collapsed() if _sampler is not None else None
+
+
+def admin(method, path, query, token):
+    """Shared handler of the admin routes: (status, content type, body)."""
+    if not _token_ok(token):
+        return 403, "text/plain", "X-Profile token required\n"
+    if path == "/debug/profiler/start" and method == "POST":
+        started = start_sampler()
+        return (200 if started else 409), "text/plain", "started\n" if started else "already running\n"
+    if path == "/debug/profiler/stop" and method == "POST":
+        stacks = stop_sampler()
+        return (200, "text/plain", stacks) if stacks is not None else (404, "text/plain", "not started\n")
+    if path == "/debug/profiler" and method == "GET":
+        stacks = sampled_stacks()
+        return (200, "text/plain", stacks) if stacks is not None else (404, "text/plain", "not started\n")
+    if path.startswith("/debug/profile/") and method == "GET":
+        profile_id = path[len("/debug/profile/"):]
+        if query.get("format") == "text":
+            body, content_type = profile_text(profile_id), "text/plain"
+        else:
+            body, content_type = profile_bytes(profile_id), "application/octet-stream"
+        return (200, content_type, body) if body is not None else (404, "text/plain", "unknown profile\n")
+    return 404, "text/plain", "not found\n"
+
+
+def instrument_flask(app):
+    if not ENABLED:
+        return
+    from flask import g, request
+
+    @app.before_request
+    def _profile_start():
+        if not request.path.startswith("/debug/") and _token_ok(request.headers.get("X-Profile")):
+            g._profile = RequestProfile.start(f"{request.method} {request.path}")
+
+    @app.after_request
+    def _profile_header(response):
+        profile = g.pop("_profile", None)
+        if profile is not None:
+            response.headers["X-Profile-Id"] = profile.finish()
+        return response
+
+    @app.teardown_request
+    def _profile_end(exc):
+        # the view raised before after_request ran
+        profile = g.pop("_profile", None)
+        if profile is not None:
+            profile.finish()
+
+    @app.route("/debug/profiler/start", methods=["POST"], endpoint="profiler_start")
+    @app.route("/debug/profiler/stop", methods=["POST"], endpoint="profiler_stop")
+    @app.route("/debug/profiler", methods=["GET"], endpoint="profiler_stacks")
+    @app.route("/debug/profile/<profile_id>", methods=["GET"], endpoint="profile_download")
+    def profiling_admin(profile_id=None):
+        status, content_type, body = admin(request.method, request.path, request.args, request.headers.get("X-Profile"))
+        return body, status, {"Content-Type": content_type}
+
+
+def instrument_rpc(name, method):
+    if not ENABLED:
+        return method
+
+    def handler(request, context):
+        if not _token_ok(dict(context.invocation_metadata() or ()).get("x-profile")):
+            return method(request, context)
+        profile = RequestProfile.start(name)
+        if profile is None:
+            return method(request, context)
+        try:
+            return method(request, context)
+        finally:
+            # keep the trailing metadata set by the handler (ETags)
+            context.set_trailing_metadata(tuple(context.trailing_metadata() or ()) + (("x-profile-id", profile.finish()),))
+
+    return handler
+
+
+def start_admin_server(grpc_port):
+    """Admin routes for a gRPC server, on ``PROFILING_PORT``."""
+    if not ENABLED:
+        return None
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import parse_qsl, urlsplit
+
+    class Handler(BaseHTTPRequestHandler):
+        def __handle(self, method):
+            url = urlsplit(self.path)
+            status, content_type, body = admin(method, url.path, dict(parse_qsl(url.query)), self.headers.get("X-Profile"))
+            body = body.encode() if isinstance(body, str) else body
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            self.__handle("GET")
+
+        def do_POST(self):
+            self.__handle("POST")
+
+        def log_message(self, *_):
+            pass
+
+    port = int(os.getenv("PROFILING_PORT", grpc_port + 2000))
+    server = ThreadingHTTPServer(("0.0.0.0", port), Handler)
+    threading.Thread(target=server.serve_forever, name="profiling-admin", daemon=True).start()
+    return port
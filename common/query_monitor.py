@@ -0,0 +1,294 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Slow-query and collection-scan detector for the Python services.
+
+``QueryMonitor`` is a pymongo command listener that aggregates CRUD commands
+by query shape (collection, command and filter with the values blanked out):
+count, total/max time and documents returned. ``common.mongo`` registers it
+when enabled:
+
+======================================  =====================================
+``MONGO_QUERY_MONITOR``                 enable the monitor, default off
+``MONGO_SLOW_QUERY_MS``                 log commands slower than this, default 100
+``MONGO_EXPLAIN``                       ``slow`` (default), ``all`` or ``off``
+``MONGO_EXPLAIN_INTERVAL_S``            explain a shape at most this often, default 600
+``MONGO_QUERY_REPORT_S``                log the top shapes this often, default 60 (0: never)
+``MONGO_QUERY_REPORT_TOP``              shapes in the report, default 10
+======================================  =====================================
+
+Explained shapes (slow ones, or every shape once with ``all``) are re-run with
+``explain`` (``executionStats``) on a background thread, which records the
+documents and keys examined and the plan stages; a plan with ``COLLSCAN`` is
+logged as a warning. ``stats()`` returns the shapes by total time (served on
+the services' ``/mongo-queries`` routes).
+"""
+
+import json
+import logging
+import os
+import queue
+import threading
+import time
+
+from pymongo import monitoring
+
+# command -> field holding the filter (or the list of statements holding it)
+FILTERS = {
+    "find": "filter",
+    "count": "query",
+    "distinct": "query",
+    "findAndModify": "query",
+    "aggregate": "pipeline",
+    "update": "updates",
+    "delete": "deletes",
+    "insert": None,
+    "getMore": None,
+}
+
+EXPLAINABLE = ("find", "count", "distinct", "findAndModify", "aggregate", "update", "delete")
+
+
+def _blank(value):
+    if isinstance(value, dict):
+        return {k: _blank(v) for k, v in value.items()}
+    if isinstance(value, list) and value and all(isinstance(v, dict) for v in value):
+        return [_blank(v) for v in value]
+    return "?"
+
+
+def query_shape(command_name, command):
+    field = FILTERS.get(command_name)
+    if field is None:
+        return ""
+    value = command.get(field)
+    if command_name in ("update", "delete"):
+        value = (value or [{}])[0].get("q")
+    shape = {"filter": _blank(value or {})}
+    if command_name == "find" and command.get("sort"):
+        shape["sort"] = list(command["sort"])
+    if command_name == "distinct":
+        shape["key"] = command.get("key")
+    return json.dumps(shape, sort_keys=True, default=str)
+
+
+def _returned(command_name, reply):
+    cursor = reply.get("cursor")
+    if cursor is not None:
+        return len(cursor.get("firstBatch", cursor.get("nextBatch", ())))
+    if command_name == "distinct":
+        return len(reply.get("values", ()))
+    if command_name == "findAndModify":
+        return 1 if reply.get("value") is not None else 0
+    return reply.get("n", 0)
+
+
+def _walk(doc, key):
+    """Every value stored under ``key`` anywhere in an explain document."""
+    if isinstance(doc, dict):
+        for k, v in doc.items():
+            if k == key:
+                yield v
+            yield from _walk(v, key)
+    elif isinstance(doc, list):
+        for v in doc:
+            yield from _walk(v, key)
+
+
+class ShapeStats:
+    __slots__ = ("collection", "command", "shape", "count", "total", "max", "returned", "slow",
+                 "examined", "keys_examined", "plan", "explained_at")
+
+    def __init__(self, collection, command, shape):
+        self.collection = collection
+        self.command = command
+        self.shape = shape
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.returned = 0
+        self.slow = 0
+        self.examined = None
+        self.keys_examined = None
+        self.plan = None
+        self.explained_at = None
+
+    def as_dict(self):
+        return {
+            "collection": self.collection,
+            "command": self.command,
+            "shape": self.shape,
+            "count": self.count,
+            "total_ms": self.total * 1000,
+            "avg_ms": self.total / self.count * 1000 if self.count else 0.0,
+            "max_ms": self.max * 1000,
+            "docs_returned": self.returned,
+            "slow": self.slow,
+            # from the last explain of the shape
+            "docs_examined": self.examined,
+            "keys_examined": self.keys_examined,
+            "plan": self.plan,
+        }
+
+
+class QueryMonitor(monitoring.CommandListener):
+    def __init__(self, slow_ms=100, explain="slow", explain_interval_s=600, report_s=60, report_top=10):
+        if explain not in ("off", "slow", "all"):
+            raise ValueError(f"Unknown MONGO_EXPLAIN: {explain} (expected slow, all or off)")
+        self.slow = slow_ms / 1000.0
+        self.explain = explain
+        self.explain_interval = explain_interval_s
+        self.report_s = report_s
+        self.report_top = report_top
+        self.lock = threading.Lock()
+        self.reset()
+        os.register_at_fork(after_in_child=self.reset)
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            slow_ms=float(os.getenv("MONGO_SLOW_QUERY_MS", 100)),
+            explain=os.getenv("MONGO_EXPLAIN", "slow").lower(),
+            explain_interval_s=float(os.getenv("MONGO_EXPLAIN_INTERVAL_S", 600)),
+            report_s=float(os.getenv("MONGO_QUERY_REPORT_S", 60)),
+            report_top=int(os.getenv("MONGO_QUERY_REPORT_TOP", 10)),
+        )
+
+    def reset(self):
+        self.lock = threading.Lock()
+        self.shapes = {}
+        # (connection, request id) -> (shape stats, database, command)
+        self.pending = {}
+        # open cursor id -> shape stats, so getMore batches count for their query
+        self.cursors = {}
+        self.explains = None
+        self.pid = None
+
+    def __start(self):
+        # worker threads do not survive fork; start them in each process
+        with self.lock:
+            if self.pid == os.getpid():
+                return
+            self.explains = queue.Queue(maxsize=100)
+            threading.Thread(target=self.__explainLoop, name="query-explain", daemon=True).start()
+            if self.report_s > 0:
+                threading.Thread(target=self.__reportLoop, name="query-report", daemon=True).start()
+            self.pid = os.getpid()
+
+    def started(self, event):
+        name = event.command_name
+        if name not in FILTERS:
+            return
+        if self.pid != os.getpid():
+            self.__start()
+        if name == "getMore":
+            stats = self.cursors.get(event.command.get("getMore"))
+        else:
+            collection = event.command.get(name)
+            key = (collection, name, query_shape(name, event.command))
+            stats = self.shapes.get(key)
+            if stats is None:
+                with self.lock:
+                    stats = self.shapes.setdefault(key, ShapeStats(*key))
+        if stats is not None:
+            self.pending[(event.connection_id, event.request_id)] = (stats, event.database_name, event.command)
+
+    def succeeded(self, event):
+        entry = self.pending.pop((event.connection_id, event.request_id), None)
+        if entry is None:
+            return
+        stats, database, command = entry
+        elapsed = event.duration_micros / 1e6
+        returned = _returned(event.command_name, event.reply)
+        cursor = event.reply.get("cursor")
+        if cursor is not None:
+            if cursor.get("id"):
+                if len(self.cursors) > 10000:
+                    # cursors closed with killCursors or left to time out
+                    self.cursors.clear()
+                self.cursors[cursor["id"]] = stats
+            elif event.command_name == "getMore":
+                self.cursors.pop(command.get("getMore"), None)
+        if event.command_name == "getMore":
+            # further batches of a query already counted (and explained)
+            self.__record(stats, elapsed, returned, None, None, calls=0)
+        else:
+            self.__record(stats, elapsed, returned, database, command)
+
+    def failed(self, event):
+        entry = self.pending.pop((event.connection_id, event.request_id), None)
+        if entry is not None:
+            self.__record(entry[0], event.duration_micros / 1e6, 0, None, None)
+
+    def __record(self, stats, elapsed, returned, database, command, calls=1):
+        slow = elapsed >= self.slow
+        with self.lock:
+            stats.count += calls
+            stats.total += elapsed
+            stats.max = max(stats.max, elapsed)
+            stats.returned += returned
+            stats.slow += slow
+        if slow:
+            logging.warning(
+                "Slow MongoDB %s on %s: %.1f ms, %s docs returned, shape %s",
+                stats.command, stats.collection, elapsed * 1000, returned, stats.shape,
+            )
+        if command is not None and self.__shouldExplain(stats, slow):
+            try:
+                self.explains.put_nowait((stats, database, command))
+            except queue.Full:
+                pass
+
+    def __shouldExplain(self, stats, slow):
+        if self.explain == "off" or stats.command not in EXPLAINABLE or not (slow or self.explain == "all"):
+            return False
+        now = time.monotonic()
+        with self.lock:
+            if stats.explained_at is not None and now - stats.explained_at < self.explain_interval:
+                return False
+            stats.explained_at = now
+        return True
+
+    def __explainLoop(self):
+        from common import mongo
+
+        while True:
+            stats, database, command = self.explains.get()
+            explained = {k: v for k, v in command.items() if not k.startswith("$") and k not in ("lsid", "txnNumber")}
+            try:
+                result = mongo.get_client()[database].command({"explain": explained, "verbosity": "executionStats"})
+            except Exception as e:
+                logging.debug("explain of %s on %s failed: %s", stats.command, stats.collection, e)
+                continue
+            plan = sorted({stage for p in _walk(result, "winningPlan") for stage in _walk(p, "stage")})
+            with self.lock:
+                stats.plan = plan
+                stats.examined = sum(v for v in _walk(result, "totalDocsExamined") if isinstance(v, int))
+                stats.keys_examined = sum(v for v in _walk(result, "totalKeysExamined") if isinstance(v, int))
+            if "COLLSCAN" in plan:
+                logging.warning(
+                    "COLLSCAN: %s on %s examined %s docs, shape %s",
+                    stats.command, stats.collection, stats.examined, stats.shape,
+                )
+
+    def __reportLoop(self):
+        while True:
+            time.sleep(self.report_s)
+            top = self.stats(self.report_top)
+            if not top:
+                continue
+            lines = [
+                "%10.1f ms %7d x %8.2f ms avg  %-14s %-10s %s%s" % (
+                    s["total_ms"], s["count"], s["avg_ms"], s["collection"], s["command"], s["shape"],
+                    "  [%s]" % ",".join(s["plan"]) if s["plan"] else "",
+                )
+                for s in top
+            ]
+            logging.info("Top MongoDB query shapes by total time (pid %s):\n%s", os.getpid(), "\n".join(lines))
+
+    def stats(self, top=None):
+        with self.lock:
+            shapes = [s.as_dict() for s in self.shapes.values() if s.count]
+        shapes.sort(key=lambda s: s["total_ms"], reverse=True)
+        return shapes[:top] if top else shapes
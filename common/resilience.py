@@ -0,0 +1,312 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Deadlines, circuit breakers and hedged reads for calls to other services.
+
+======================================  =====================================
+``DEADLINE_MS``                         budget of an incoming request, default 10000
+``DEADLINE_<ENDPOINT>_MS``              budget of one Flask endpoint (e.g. ``DEADLINE_LOAN_FORM_MS``)
+``BREAKER_FAILURES``                    consecutive failures opening a breaker, default 5
+``BREAKER_OPEN_S``                      time an open breaker fails fast, default 10
+``HEDGE_ENABLED``                       hedge idempotent reads, default off
+``HEDGE_PERCENTILE``                    hedge after this latency percentile, default 95
+``HEDGE_DELAY_MS``                      hedge delay until 20 latencies are known, default 100
+======================================  =====================================
+
+Deadlines: ``instrument_flask(app, budgets)`` gives every request a budget
+(``budgets`` maps endpoints to their default in ms), and each downstream call
+made through ``insecure_channel`` / ``requests_client`` gets the time left as
+its gRPC deadline or ``requests`` timeout. A call with no time left fails
+with ``DeadlineExceeded`` without being sent.
+
+Breakers (one per downstream ``host:port``): ``BREAKER_FAILURES`` failures in a
+row (unavailable, timed out, gRPC ``INTERNAL``/``UNKNOWN``/``RESOURCE_EXHAUSTED``
+or HTTP 5xx) open it. An open breaker rejects calls with ``CircuitOpen`` for
+``BREAKER_OPEN_S``, then lets a single probe through (half-open): success
+closes it, failure opens it again.
+
+Hedging: a call marked idempotent that has not answered after the
+``HEDGE_PERCENTILE`` of its recent latencies is sent a second time and the
+first good answer wins. Both attempts run on a small thread pool and are
+traced separately.
+
+``instrument_flask`` answers ``CircuitOpen`` and unreachable services with
+503 and deadline overruns with 504.
+"""
+
+import collections
+import concurrent.futures
+import contextvars
+import logging
+import os
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+from common import metrics, tracing
+
+BREAKER_FAILURES = int(os.getenv("BREAKER_FAILURES", 5))
+BREAKER_OPEN_S = float(os.getenv("BREAKER_OPEN_S", 10))
+HEDGE_ENABLED = os.getenv("HEDGE_ENABLED", "false").lower() in ("1", "true")
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", 95))
+HEDGE_DELAY_MS = float(os.getenv("HEDGE_DELAY_MS", 100))
+
+_deadline = contextvars.ContextVar("deadline", default=None)
+
+
+class CircuitOpen(Exception):
+    pass
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+def remaining():
+    """Seconds left in the current request's budget (None outside a request)."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+class Breaker:
+    CLOSED, HALF_OPEN, OPEN = 0, 1, 2
+
+    def __init__(self, target):
+        self.target = target
+        self.lock = threading.Lock()
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+
+    def allow(self):
+        with self.lock:
+            if self.state == self.CLOSED:
+                return
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= BREAKER_OPEN_S:
+                # let this call through as the probe
+                self.__set(self.HALF_OPEN)
+                return
+        metrics.downstream_rejected(self.target, "circuit_open")
+        raise CircuitOpen(f"{self.target} is unavailable (circuit open)")
+
+    def record(self, ok):
+        with self.lock:
+            if ok:
+                self.failures = 0
+                if self.state != self.CLOSED:
+                    self.__set(self.CLOSED)
+                return
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= BREAKER_FAILURES:
+                self.opened_at = time.monotonic()
+                if self.state != self.OPEN:
+                    self.__set(self.OPEN)
+
+    def release(self):
+        """Reopen a half-open breaker whose probe ended without a result
+        (e.g. interrupted), so that a later call probes again."""
+        with self.lock:
+            if self.state == self.HALF_OPEN:
+                self.opened_at = time.monotonic()
+                self.__set(self.OPEN)
+
+    def __set(self, state):
+        self.state = state
+        metrics.breaker_state(self.target, state)
+
+
+class Latencies:
+    """The last 200 latencies of a call, for its hedging delay."""
+
+    def __init__(self):
+        self.samples = collections.deque(maxlen=200)
+
+    def add(self, seconds):
+        self.samples.append(seconds)
+
+    def percentile(self, p):
+        samples = sorted(self.samples)
+        if len(samples) < 20:
+            return None
+        return samples[min(int(len(samples) * p / 100), len(samples) - 1)]
+
+
+_breakers = {}
+_latencies = collections.defaultdict(Latencies)
+_lock = threading.Lock()
+_pool = None
+_pool_pid = None
+
+
+def breaker(target):
+    b = _breakers.get(target)
+    if b is None:
+        with _lock:
+            b = _breakers.setdefault(target, Breaker(target))
+    return b
+
+
+def _executor():
+    global _pool, _pool_pid
+    # threads do not survive fork; one pool per worker process
+    if _pool_pid != os.getpid():
+        with _lock:
+            if _pool_pid != os.getpid():
+                _pool = concurrent.futures.ThreadPoolExecutor(max_workers=32, thread_name_prefix="hedge")
+                _pool_pid = os.getpid()
+    return _pool
+
+
+def call(target, name, attempt, failed, idempotent=False):
+    """Run ``attempt(timeout)`` against ``target`` under its breaker and the
+    current deadline. ``failed(result)`` tells whether a returned result is a
+    failure of the target; raised exceptions always are."""
+    # before allow(): a probe admitted with no time left would never report
+    timeout = remaining()
+    if timeout is not None and timeout <= 0:
+        metrics.downstream_rejected(target, "deadline")
+        raise DeadlineExceeded(f"no time left to call {target}")
+    b = breaker(target)
+    b.allow()
+    try:
+        latencies = _latencies[(target, name)]
+        if idempotent and HEDGE_ENABLED:
+            return _hedged(b, latencies, attempt, failed, timeout)
+        return _attempt(b, latencies, attempt, failed, timeout)
+    except BaseException:
+        b.release()
+        raise
+
+
+def _attempt(b, latencies, attempt, failed, timeout):
+    start = time.perf_counter()
+    try:
+        result = attempt(timeout)
+    except Exception:
+        b.record(False)
+        raise
+    ok = not failed(result)
+    b.record(ok)
+    if ok:
+        latencies.add(time.perf_counter() - start)
+    return result
+
+
+def _hedged(b, latencies, attempt, failed, timeout):
+    delay = latencies.percentile(HEDGE_PERCENTILE)
+    delay = HEDGE_DELAY_MS / 1000 if delay is None else delay
+    if timeout is not None and delay >= timeout:
+        return _attempt(b, latencies, attempt, failed, timeout)
+
+    pool = _executor()
+    first = pool.submit(contextvars.copy_context().run, _attempt, b, latencies, attempt, failed, timeout)
+    done, _ = concurrent.futures.wait([first], timeout=delay)
+    if done:
+        return first.result()
+    metrics.hedged(b.target, "sent")
+    second = pool.submit(contextvars.copy_context().run, _attempt, b, latencies, attempt, failed, timeout - delay if timeout is not None else None)
+
+    pending = {first, second}
+    while pending:
+        done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+        good = [f for f in done if f.exception() is None and not failed(f.result())]
+        if good:
+            if good[0] is second:
+                metrics.hedged(b.target, "won")
+            return good[0].result()
+    # both failed: the first attempt's outcome
+    return first.result()
+
+
+def insecure_channel(target, idempotent=(), options=None):
+    """``tracing.insecure_channel`` with deadlines and a breaker; the full
+    method names in ``idempotent`` (``/Service/method``) may be hedged."""
+    from common import resilience_grpc
+
+    return resilience_grpc.insecure_channel(target, idempotent, options)
+
+
+class _ResilientRequests:
+    """``tracing.requests_client()`` with deadlines and a breaker per host.
+    ``idempotent=True`` on a call allows hedging it (never for streamed calls)."""
+
+    def __init__(self, session=None):
+        self.client = tracing.requests_client(session)
+
+    def request(self, method, url, idempotent=False, **kwargs):
+        target = urlsplit(url).netloc
+
+        def attempt(timeout):
+            if timeout is not None:
+                kwargs["timeout"] = min(timeout, kwargs.get("timeout") or timeout)
+            return self.client.request(method, url, **kwargs)
+
+        return call(
+            target, f"{method.upper()} {urlsplit(url).path}", attempt, lambda response: response.status_code >= 500,
+            idempotent=idempotent and not kwargs.get("stream"),
+        )
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request("PUT", url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request("DELETE", url, **kwargs)
+
+
+def requests_client(session=None):
+    return _ResilientRequests(session)
+
+
+def instrument_flask(app, budgets=None, grpc_errors=False):
+    """``grpc_errors``: the app calls gRPC services (their errors are answered
+    like the other downstream failures)."""
+    import requests
+    from flask import jsonify, request
+    from werkzeug.exceptions import InternalServerError
+
+    budgets = budgets or {}
+    default_ms = float(os.getenv("DEADLINE_MS", 10000))
+
+    @app.before_request
+    def _deadline_start():
+        endpoint = request.endpoint or ""
+        budget = float(os.getenv(f"DEADLINE_{endpoint.upper()}_MS", budgets.get(endpoint, default_ms)))
+        _deadline.set(time.monotonic() + budget / 1000)
+
+    @app.teardown_request
+    def _deadline_end(exc):
+        _deadline.set(None)
+
+    @app.errorhandler(CircuitOpen)
+    def _circuit_open(e):
+        return jsonify({"response": None, "error": str(e)}), 503, {"Retry-After": str(int(BREAKER_OPEN_S))}
+
+    def _failed(e, status):
+        logging.warning("%s %s: downstream call failed: %s", request.method, request.path, e)
+        return jsonify({"response": None, "error": str(e)}), status
+
+    @app.errorhandler(DeadlineExceeded)
+    @app.errorhandler(requests.Timeout)
+    @app.errorhandler(requests.ConnectionError)
+    def _downstream_error(e):
+        return _failed(e, 504 if isinstance(e, (DeadlineExceeded, requests.Timeout)) else 503)
+
+    if grpc_errors:
+        import grpc
+
+        @app.errorhandler(grpc.RpcError)
+        def _rpc_error(e):
+            status = {grpc.StatusCode.DEADLINE_EXCEEDED: 504, grpc.StatusCode.UNAVAILABLE: 503}.get(e.code())
+            if status is None:
+                # any other RPC error stays an internal error
+                app.log_exception(sys.exc_info())
+                return InternalServerError(original_exception=e)
+            return _failed(e, status)
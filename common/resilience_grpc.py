@@ -0,0 +1,48 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""gRPC client side of ``common.resilience``, imported by
+``resilience.insecure_channel`` so HTTP-only processes never load grpc."""
+
+import grpc
+
+from common import resilience, tracing, tracing_grpc
+
+FAILED_CODES = frozenset((
+    grpc.StatusCode.UNAVAILABLE,
+    grpc.StatusCode.DEADLINE_EXCEEDED,
+    grpc.StatusCode.INTERNAL,
+    grpc.StatusCode.UNKNOWN,
+    grpc.StatusCode.RESOURCE_EXHAUSTED,
+))
+
+
+class _Interceptor(grpc.UnaryUnaryClientInterceptor):
+    def __init__(self, target, idempotent):
+        self.target = target
+        self.idempotent = idempotent
+
+    def intercept_unary_unary(self, continuation, client_call_details, request):
+        def attempt(timeout):
+            details = client_call_details
+            if timeout is not None and (details.timeout is None or timeout < details.timeout):
+                details = tracing_grpc.CallDetails(
+                    details.method, timeout, details.metadata, details.credentials,
+                    details.wait_for_ready, details.compression,
+                )
+            outcome = continuation(details, request)
+            # blocks until the call completes
+            outcome.exception()
+            return outcome
+
+        def failed(outcome):
+            error = outcome.exception()
+            return isinstance(error, grpc.RpcError) and error.code() in FAILED_CODES
+
+        method = client_call_details.method
+        return resilience.call(self.target, method, attempt, failed, idempotent=method in self.idempotent)
+
+
+def insecure_channel(target, idempotent=(), options=None):
+    return grpc.intercept_channel(tracing.insecure_channel(target, options), _Interceptor(target, frozenset(idempotent)))
@@ -0,0 +1,222 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Production launchers for the Flask and gRPC servers of the Python services.
+
+``serve_flask(app, port)`` runs a service's ``app`` under gunicorn, a pre-fork
+WSGI server, instead of Werkzeug's development server:
+
+======================================  =====================================
+``WEB_SERVER``                          ``gunicorn`` (default) or ``werkzeug``
+``WEB_WORKERS``                         worker processes, default 2 * CPUs + 1
+``WEB_WORKER_CLASS``                    ``sync`` (default), ``threads``, ``gevent``
+``WEB_THREADS``                         threads per worker (``threads``), default 4
+``WEB_WORKER_CONNECTIONS``              connections per worker (``gevent``), default 1000
+``WEB_KEEPALIVE``                       keep-alive seconds, default 5
+``WEB_TIMEOUT``                         kill workers silent for longer, default 30
+``WEB_GRACEFUL_TIMEOUT``                drain time on reload/stop, default 30
+``WEB_MAX_REQUESTS``                    recycle a worker after N requests, default 0 (never)
+``WEB_MAX_REQUESTS_JITTER``             random extra requests before recycling
+``WEB_BACKLOG``                         listen backlog, default 2048
+``FLASK_DEBUG``                         debugger/reloader for ``werkzeug``, default on
+======================================  =====================================
+
+The app is imported once in the master and workers are forked from it.
+``SIGHUP`` gracefully replaces the workers (in-flight requests finish within
+``WEB_GRACEFUL_TIMEOUT``), ``SIGTERM`` drains and stops. Each worker opens its
+own MongoDB client (``common.mongo`` is fork-safe) and runs ``on_worker_start``
+after forking; Werkzeug runs it once, before serving. ``gevent`` needs the
+optional ``gevent`` package.
+
+``serve_grpc(servicer, add_servicer, port)`` builds the gRPC server:
+
+======================================  =====================================
+``GRPC_MAX_WORKERS``                    handler threads, default 10
+``GRPC_MAX_CONCURRENT_RPCS``            reject RPCs beyond this with RESOURCE_EXHAUSTED
+``GRPC_COMPRESSION``                    ``none`` (default), ``gzip`` or ``deflate``, see ``common.compression``
+``GRPC_KEEPALIVE_TIME_MS``              server keepalive ping interval
+``GRPC_KEEPALIVE_TIMEOUT_MS``           close connections not acking a ping
+``GRPC_KEEPALIVE_PERMIT_WITHOUT_CALLS`` allow client pings on idle connections
+``GRPC_MIN_PING_INTERVAL_MS``           minimum interval of client pings
+``GRPC_MAX_CONNECTION_IDLE_MS``         close idle connections
+``GRPC_MAX_CONNECTION_AGE_MS``          recycle connections (rebalances clients)
+``GRPC_MAX_MESSAGE_MB``                 send/receive message size limit
+``GRPC_GRACE_PERIOD_S``                 drain time on SIGTERM, default 10
+======================================  =====================================
+
+Each running RPC holds one of the ``GRPC_MAX_WORKERS`` threads: the handlers
+use the synchronous MongoDB driver. RPCs are instrumented by ``common.metrics``, which serves ``/metrics`` on a sidecar
+HTTP port, traced by ``common.tracing``, timed by phase in ``server-timing``
+trailing metadata (``common.timing``) and, when enabled, profiled on demand by
+``common.profiling``. Large responses are compressed (``common.compression``).
+"""
+
+import importlib.util
+import logging
+import os
+import signal
+import threading
+from concurrent import futures
+
+from common import compression, metrics, profiling, timing, tracing
+
+WORKER_CLASSES = {
+    "sync": "sync",
+    "threads": "gthread",
+    "gthread": "gthread",
+    "gevent": "gevent",
+}
+
+
+def _cpu_count():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def gunicorn_options(port):
+    worker_class = os.getenv("WEB_WORKER_CLASS", "sync").lower()
+    if worker_class not in WORKER_CLASSES:
+        raise ValueError(f"Unknown WEB_WORKER_CLASS: {worker_class} (expected sync, threads or gevent)")
+    worker_class = WORKER_CLASSES[worker_class]
+    if worker_class == "gevent" and importlib.util.find_spec("gevent") is None:
+        raise Exception("WEB_WORKER_CLASS=gevent requires the gevent package")
+
+    return {
+        "bind": f"0.0.0.0:{port}",
+        "workers": int(os.getenv("WEB_WORKERS", 2 * _cpu_count() + 1)),
+        "worker_class": worker_class,
+        "threads": int(os.getenv("WEB_THREADS", 4)) if worker_class == "gthread" else 1,
+        "worker_connections": int(os.getenv("WEB_WORKER_CONNECTIONS", 1000)),
+        "keepalive": int(os.getenv("WEB_KEEPALIVE", 5)),
+        "timeout": int(os.getenv("WEB_TIMEOUT", 30)),
+        "graceful_timeout": int(os.getenv("WEB_GRACEFUL_TIMEOUT", 30)),
+        "max_requests": int(os.getenv("WEB_MAX_REQUESTS", 0)),
+        "max_requests_jitter": int(os.getenv("WEB_MAX_REQUESTS_JITTER", 0)),
+        "backlog": int(os.getenv("WEB_BACKLOG", 2048)),
+        "accesslog": os.getenv("WEB_ACCESS_LOG"),
+        "errorlog": "-",
+    }
+
+
+def serve_flask(app, port, on_worker_start=None):
+    server = os.getenv("WEB_SERVER", "gunicorn").lower()
+    if server == "werkzeug":
+        debug = os.getenv("FLASK_DEBUG", "true").lower() in ("1", "true")
+        logging.debug("Starting Werkzeug development server on port %s (debug=%s)", port, debug)
+        if on_worker_start is not None:
+            on_worker_start()
+        app.run(host="0.0.0.0", port=port, debug=debug)
+        return
+    if server != "gunicorn":
+        raise ValueError(f"Unknown WEB_SERVER: {server} (expected gunicorn or werkzeug)")
+
+    from gunicorn.app.base import BaseApplication
+
+    options = gunicorn_options(port)
+
+    def post_fork(arbiter, worker):
+        from common import mongo
+
+        mongo.get_client()
+        if on_worker_start is not None:
+            on_worker_start()
+        logging.debug("Worker %s ready", worker.pid)
+
+    def child_exit(arbiter, worker):
+        metrics.worker_exited(worker.pid)
+
+    class FlaskApplication(BaseApplication):
+        def load_config(self):
+            for key, value in options.items():
+                if value is not None:
+                    self.cfg.set(key, value)
+            self.cfg.set("post_fork", post_fork)
+            self.cfg.set("child_exit", child_exit)
+
+        def load(self):
+            return app
+
+    logging.debug("Starting gunicorn on port %s: %s", port, options)
+    FlaskApplication().run()
+
+
+def grpc_options():
+    options = []
+    for env, option in (
+        ("GRPC_KEEPALIVE_TIME_MS", "grpc.keepalive_time_ms"),
+        ("GRPC_KEEPALIVE_TIMEOUT_MS", "grpc.keepalive_timeout_ms"),
+        ("GRPC_MIN_PING_INTERVAL_MS", "grpc.http2.min_ping_interval_without_data_ms"),
+        ("GRPC_MAX_CONNECTION_IDLE_MS", "grpc.max_connection_idle_ms"),
+        ("GRPC_MAX_CONNECTION_AGE_MS", "grpc.max_connection_age_ms"),
+    ):
+        if os.getenv(env):
+            options.append((option, int(os.environ[env])))
+    if os.getenv("GRPC_KEEPALIVE_PERMIT_WITHOUT_CALLS"):
+        permit = os.environ["GRPC_KEEPALIVE_PERMIT_WITHOUT_CALLS"].lower() in ("1", "true")
+        options.append(("grpc.keepalive_permit_without_calls", int(permit)))
+    if os.getenv("GRPC_MAX_MESSAGE_MB"):
+        size = int(float(os.environ["GRPC_MAX_MESSAGE_MB"]) * 1024 * 1024)
+        options.append(("grpc.max_send_message_length", size))
+        options.append(("grpc.max_receive_message_length", size))
+    return options
+
+
+def grpc_server_kwargs():
+    max_rpcs = os.getenv("GRPC_MAX_CONCURRENT_RPCS")
+    return {
+        "options": grpc_options(),
+        "maximum_concurrent_rpcs": int(max_rpcs) if max_rpcs else None,
+        # small responses opt out (common.compression.instrument_rpc)
+        "compression": compression.grpc_algorithm()[1],
+    }
+
+
+def _rpc_names(servicer):
+    if isinstance(servicer, _WrappedServicer):
+        return servicer.rpc_names
+    # RPCs are the methods of the generated ``*Servicer`` base class
+    names = set()
+    for cls in type(servicer).__mro__:
+        if cls.__module__.endswith("_pb2_grpc") and cls.__name__.endswith("Servicer"):
+            names.update(n for n, v in vars(cls).items() if callable(v) and not n.startswith("_"))
+    return names
+
+
+class _WrappedServicer:
+    def __init__(self, servicer, wrap):
+        self.rpc_names = _rpc_names(servicer)
+        for name in self.rpc_names:
+            setattr(self, name, wrap(name, getattr(servicer, name)))
+
+
+def serve_grpc(servicer, add_servicer, port):
+    # imported here: services serving HTTP never load grpc
+    import grpc
+
+    from common import proto
+
+    proto.check_backend()
+    max_workers = int(os.getenv("GRPC_MAX_WORKERS", 10))
+    grace = float(os.getenv("GRPC_GRACE_PERIOD_S", 10))
+    kwargs = grpc_server_kwargs()
+    logging.debug("Starting gRPC server (%s workers) on port %s: %s", max_workers, port, kwargs)
+    wraps = (compression.instrument_rpc, profiling.instrument_rpc, timing.instrument_rpc, tracing.instrument_rpc, metrics.instrument_rpc)
+    for wrap in wraps:
+        servicer = _WrappedServicer(servicer, wrap)
+    metrics_port = metrics.start_sidecar(port)
+    if metrics_port:
+        logging.debug("Serving /metrics on port %s", metrics_port)
+    profiling_port = profiling.start_admin_server(port)
+    if profiling_port:
+        logging.debug("Serving profiling routes on port %s", profiling_port)
+
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=max_workers), **kwargs)
+    add_servicer(servicer, server)
+    server.add_insecure_port(f"[::]:{port}")
+    server.start()
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, lambda *_: server.stop(grace))
+    server.wait_for_termination()
@@ -0,0 +1,67 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Request coalescing ("single flight") for identical concurrent reads.
+
+``Group.do(key, fn)`` runs ``fn`` once for all callers asking for the same
+``key`` at the same time: the first caller runs it, callers arriving while it
+runs wait for it and get its result (or its exception). Nothing is cached, a
+call arriving after the first one finished runs again. The key must hold
+everything the result depends on, and only reads may be coalesced.
+
+Callers are only concurrent within a process, so this needs a threaded or
+gevent server (``WEB_WORKER_CLASS=threads``/``gevent``). Every call is counted
+in ``singleflight_calls_total`` (``result`` is ``leader`` or ``coalesced``).
+``SINGLEFLIGHT_ENABLED=false`` runs every call.
+"""
+
+import os
+import threading
+
+from common import metrics
+
+ENABLED = os.getenv("SINGLEFLIGHT_ENABLED", "true").lower() in ("1", "true")
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class Group:
+    def __init__(self, name):
+        self.name = name
+        self.lock = threading.Lock()
+        self.calls = {}
+
+    def do(self, key, fn):
+        if not ENABLED:
+            return fn()
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = _Call()
+        if not leader:
+            metrics.singleflight_call(self.name, "coalesced")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        metrics.singleflight_call(self.name, "leader")
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
@@ -0,0 +1,137 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+import datetime
+import time
+
+from bson.objectid import ObjectId
+
+from common import mongo
+from common.account_filter import AccountFilter, BloomFilter
+
+accounts = mongo.get_collection("accounts")
+
+
+def insert(*numbers, at=None):
+    for number in numbers:
+        _id = ObjectId.from_datetime(at) if at else ObjectId()
+        accounts.insert_one({"_id": _id, "account_number": number})
+
+
+def built(**kwargs):
+    account_filter = AccountFilter(accounts, **kwargs)
+    account_filter.rebuild()
+    return account_filter
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(1000, 0.01)
+    keys = [f"IBAN{i}" for i in range(1000)]
+    for key in keys:
+        bloom.add(key)
+
+    assert all(key in bloom for key in keys)
+    false_positives = sum(f"OTHER{i}" in bloom for i in range(10000))
+    assert false_positives < 300
+
+
+def test_unbuilt_filter_lets_everything_through():
+    account_filter = AccountFilter(accounts)
+
+    assert account_filter.might_contain("anything")
+    assert account_filter.stats() == {"enabled": True, "ready": False}
+
+
+def test_disabled_filter_never_starts():
+    account_filter = AccountFilter(accounts, enabled=False)
+    account_filter.start()
+
+    assert account_filter.thread is None
+    assert account_filter.might_contain("anything")
+
+
+def test_rebuilt_filter_rejects_unknown_numbers():
+    insert("A1", "A2")
+    account_filter = built()
+
+    assert account_filter.might_contain("A1") and account_filter.might_contain("A2")
+    assert not account_filter.might_contain("A3")
+    stats = account_filter.stats()
+    assert (stats["accounts"], stats["checks"], stats["rejections"]) == (2, 3, 1)
+
+
+def test_catch_up_adds_new_accounts():
+    insert("A1")
+    account_filter = built()
+    insert("A2")
+
+    assert not account_filter.might_contain("A2")
+    account_filter.catch_up()
+    assert account_filter.might_contain("A2")
+    assert account_filter.stats()["catchups"] == 1
+
+
+def test_catch_up_rereads_the_overlap_window():
+    # another accounts replica's ObjectId, a little older than the high-water mark
+    insert("A1")
+    account_filter = built()
+    insert("A2", at=account_filter.high_water.generation_time - datetime.timedelta(seconds=2))
+    account_filter.catch_up()
+
+    assert account_filter.might_contain("A2")
+
+
+def test_catch_up_of_an_empty_collection():
+    account_filter = built()
+    insert("A1")
+    account_filter.catch_up()
+
+    assert account_filter.might_contain("A1")
+
+
+def test_add_accepts_an_account_right_away():
+    insert("A1")
+    account_filter = built()
+    account_filter.add("A2")
+
+    assert account_filter.might_contain("A2")
+
+
+def test_rebuild_grows_past_capacity():
+    insert(*(f"A{i}" for i in range(30)))
+    account_filter = built(capacity=10)
+
+    assert account_filter.stats()["capacity"] == 40
+    assert all(account_filter.might_contain(f"A{i}") for i in range(30))
+
+
+def test_catch_up_grows_past_capacity():
+    account_filter = built(capacity=10)
+    insert(*(f"A{i}" for i in range(15)))
+    account_filter.catch_up()
+
+    assert account_filter.stats()["capacity"] == 20
+    assert all(account_filter.might_contain(f"A{i}") for i in range(15))
+
+
+def test_false_positives_are_counted():
+    insert("A1")
+    account_filter = built()
+    account_filter.might_contain("A2")
+    account_filter.record_false_positive()
+
+    assert account_filter.stats()["observed_false_positive_rate"] == 0.5
+
+
+def test_background_thread_builds_and_catches_up():
+    insert("A1")
+    account_filter = AccountFilter(accounts, catchup_interval_ms=10)
+    account_filter.start()
+    insert("A2")
+
+    deadline = time.monotonic() + 5
+    while not account_filter.stats().get("catchups") and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert account_filter.might_contain("A1") and account_filter.might_contain("A2")
+    assert not account_filter.might_contain("A3")
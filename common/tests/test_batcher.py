@@ -0,0 +1,79 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+import threading
+
+import pytest
+
+from common.batcher import Batcher
+
+
+class Loader:
+    def __init__(self, error=None):
+        self.calls = []
+        self.error = error
+
+    def __call__(self, keys):
+        self.calls.append(sorted(keys))
+        if self.error is not None:
+            raise self.error
+        return {key: key.upper() for key in keys if key != "missing"}
+
+
+def load_concurrently(batcher, keys):
+    results, errors = {}, {}
+
+    def load(key):
+        try:
+            results[key] = batcher.load(key)
+        except Exception as e:
+            errors[key] = e
+
+    threads = [threading.Thread(target=load, args=(key,)) for key in keys]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results, errors
+
+
+def test_concurrent_loads_share_one_call():
+    loader = Loader()
+    results, _ = load_concurrently(Batcher("test", loader, window_ms=200), ["a", "b", "c", "missing"])
+
+    assert loader.calls == [["a", "b", "c", "missing"]]
+    assert results == {"a": "A", "b": "B", "c": "C", "missing": None}
+
+
+def test_duplicate_keys_are_loaded_once():
+    loader = Loader()
+    results, _ = load_concurrently(Batcher("test", loader, window_ms=200), ["a", "a", "b"])
+
+    assert loader.calls == [["a", "b"]]
+    assert results == {"a": "A", "b": "B"}
+
+
+def test_full_batch_is_sent_before_the_window_ends():
+    loader = Loader()
+    load_concurrently(Batcher("test", loader, window_ms=5000, max_batch=2), ["a", "b"])
+
+    assert loader.calls == [["a", "b"]]
+
+
+def test_error_is_raised_to_every_caller():
+    loader = Loader(ConnectionError("accounts unavailable"))
+    results, errors = load_concurrently(Batcher("test", loader, window_ms=200), ["a", "b"])
+
+    assert results == {}
+    assert set(errors) == {"a", "b"} and all(isinstance(e, ConnectionError) for e in errors.values())
+
+
+def test_no_window_loads_each_key_alone():
+    loader = Loader()
+    batcher = Batcher("test", loader, window_ms=0)
+
+    assert (batcher.load("a"), batcher.load("missing")) == ("A", None)
+    assert loader.calls == [["a"], ["missing"]]
+    with pytest.raises(ConnectionError):
+        Batcher("test", Loader(ConnectionError()), window_ms=0).load("a")
@@ -0,0 +1,71 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+import datetime
+import importlib
+
+import pytest
+from bson.objectid import ObjectId
+from flask import Flask, jsonify
+
+from common import codec
+from common.flask_json import JSONProvider
+
+
+@pytest.fixture(params=["orjson", "json"])
+def backend(request, monkeypatch):
+    if request.param == "orjson":
+        pytest.importorskip("orjson")
+    monkeypatch.setenv("JSON_CODEC", request.param)
+    importlib.reload(codec)
+    yield codec
+    monkeypatch.undo()
+    importlib.reload(codec)
+
+
+def test_datetimes_are_iso_8601(backend):
+    value = {
+        "time_stamp": datetime.datetime(2024, 5, 1, 12, 30, 0, 123000),
+        "whole_second": datetime.datetime(2024, 5, 1, 12, 30),
+        "aware": datetime.datetime(2024, 5, 1, 12, 30, tzinfo=datetime.timezone.utc),
+        "day": datetime.date(2024, 5, 1),
+    }
+
+    assert backend.loads(backend.dumps(value)) == {
+        "time_stamp": "2024-05-01T12:30:00.123000",
+        "whole_second": "2024-05-01T12:30:00",
+        "aware": "2024-05-01T12:30:00+00:00",
+        "day": "2024-05-01",
+    }
+
+
+def test_documents(backend):
+    _id = ObjectId()
+    data = backend.dumps({"_id": _id, "amount": 1.5, "name": "Zoë", 1: None})
+
+    assert isinstance(data, bytes)
+    assert backend.loads(data) == {"_id": str(_id), "amount": 1.5, "name": "Zoë", "1": None}
+    assert backend.loads(data.decode()) == backend.loads(data)
+
+
+def test_backends_write_the_same_bytes(backend):
+    value = {"a": [1, 2.5, None, True], "b": {"c": "ü"}, "t": datetime.datetime(2024, 5, 1, 12, 30, 0, 5)}
+
+    assert backend.dumps(value) == '{"a":[1,2.5,null,true],"b":{"c":"ü"},"t":"2024-05-01T12:30:00.000005"}'.encode()
+
+
+def test_unsupported_type(backend):
+    with pytest.raises(TypeError):
+        backend.dumps({"value": object()})
+
+
+def test_flask_provider():
+    app = Flask(__name__)
+    app.json = JSONProvider(app)
+    _id = ObjectId()
+
+    with app.app_context():
+        response = jsonify({"transaction_id": _id, "time_stamp": datetime.datetime(2024, 5, 1)})
+    assert response.mimetype == "application/json"
+    assert response.get_data() == codec.dumps({"transaction_id": str(_id), "time_stamp": "2024-05-01T00:00:00"})
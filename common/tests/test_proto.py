@@ -0,0 +1,99 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+import datetime
+import os
+import sys
+
+import pytest
+from bson.objectid import ObjectId
+from google.protobuf import json_format
+from google.protobuf.descriptor import FieldDescriptor
+
+from common import codec, proto
+from protobufs import accounts_pb2, loan_pb2, transaction_pb2
+from protobufs.transaction_pb2 import GetALLTransactionsResponse, Transaction
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "performance_locust"))
+
+import proto_benchmark  # noqa: E402
+
+MESSAGES = [
+    getattr(module, name)
+    for module in (accounts_pb2, loan_pb2, transaction_pb2)
+    for name in module.DESCRIPTOR.message_types_by_name
+]
+
+SCALARS = {
+    FieldDescriptor.TYPE_STRING: "text",
+    FieldDescriptor.TYPE_DOUBLE: 1.5,
+    FieldDescriptor.TYPE_FLOAT: 0.5,
+    FieldDescriptor.TYPE_INT64: 2 ** 40,
+    FieldDescriptor.TYPE_INT32: 7,
+    FieldDescriptor.TYPE_BOOL: True,
+}
+
+
+def sample(descriptor):
+    """A dict setting every field of ``descriptor``, nested messages and maps included."""
+    data = {}
+    for field in descriptor.fields:
+        map_value = proto._map_value(field)
+        if map_value is not None:
+            value = sample(map_value.message_type) if map_value.type == FieldDescriptor.TYPE_MESSAGE else SCALARS[map_value.type]
+            data[field.name] = {"key": value}
+            continue
+        value = sample(field.message_type) if field.type == FieldDescriptor.TYPE_MESSAGE else SCALARS[field.type]
+        data[field.name] = [value, value] if proto._repeated(field) else value
+    return data
+
+
+@pytest.mark.parametrize("cls", MESSAGES, ids=lambda cls: cls.DESCRIPTOR.name)
+def test_round_trip_matches_json_format(cls):
+    data = sample(cls.DESCRIPTOR)
+    message = proto.from_dict(cls, data)
+
+    assert message == json_format.ParseDict(data, cls())
+    assert proto.to_dict(message) == data
+    assert proto.from_json(cls, proto.to_json(message)) == message
+
+
+@pytest.mark.parametrize("cls", MESSAGES, ids=lambda cls: cls.DESCRIPTOR.name)
+def test_empty_message_has_every_field(cls):
+    assert list(proto.to_dict(cls())) == [field.name for field in cls.DESCRIPTOR.fields]
+
+
+def test_generated_converters_match_the_closures():
+    docs = proto_benchmark.documents(50)
+    build, read = proto_benchmark.closures(Transaction)
+    message = proto.from_dict(GetALLTransactionsResponse, {"transactions": docs})
+
+    assert message == GetALLTransactionsResponse(transactions=[build(doc) for doc in docs])
+    assert proto.to_dict(message)["transactions"] == [read(t) for t in message.transactions]
+
+
+def test_documents_are_converted_as_the_codec_writes_them():
+    _id = ObjectId()
+    time_stamp = datetime.datetime(2024, 5, 1, 12, 30, 0, 123000)
+    message = proto.from_dict(Transaction, {
+        "_id": _id, "transaction_id": _id, "time_stamp": time_stamp, "reason": None, "amount": 2.5,
+    })
+
+    assert message.transaction_id == codec.loads(codec.dumps(_id))
+    assert message.time_stamp == codec.loads(codec.dumps(time_stamp)) == "2024-05-01T12:30:00.123000"
+    assert message.reason == "" and message.account_number == ""
+
+
+def test_messages_are_passed_through():
+    transaction = Transaction(amount=1.0)
+    response = proto.from_dict(GetALLTransactionsResponse, {"transactions": [transaction, {"amount": 2.0}]})
+
+    assert proto.from_dict(Transaction, transaction) is transaction
+    assert [t.amount for t in response.transactions] == [1.0, 2.0]
+    assert proto.from_dict(Transaction, None) is None
+
+
+def test_unsupported_value_is_rejected():
+    with pytest.raises(TypeError):
+        proto.from_dict(Transaction, {"reason": 3})
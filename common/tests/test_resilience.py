@@ -0,0 +1,148 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+import threading
+import time
+
+import pytest
+
+from common import resilience
+from common.resilience import Breaker, CircuitOpen, DeadlineExceeded
+
+
+@pytest.fixture(autouse=True)
+def breaker_settings(monkeypatch):
+    monkeypatch.setattr(resilience, "BREAKER_FAILURES", 2)
+    monkeypatch.setattr(resilience, "BREAKER_OPEN_S", 0.05)
+
+
+@pytest.fixture
+def target(request):
+    # breakers are per process and per target
+    return f"{request.node.name}:1"
+
+
+def ok(timeout):
+    return "ok"
+
+
+def fail(timeout):
+    raise ConnectionError("unavailable")
+
+
+def call(target, attempt):
+    return resilience.call(target, "get", attempt, lambda result: result != "ok")
+
+
+def open_breaker(target):
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            call(target, fail)
+    assert resilience.breaker(target).state == Breaker.OPEN
+
+
+def test_failures_open_the_breaker(target):
+    open_breaker(target)
+
+    with pytest.raises(CircuitOpen):
+        call(target, ok)
+
+
+def test_failed_result_counts_as_a_failure(target):
+    call(target, lambda timeout: "error")
+    call(target, lambda timeout: "error")
+
+    assert resilience.breaker(target).state == Breaker.OPEN
+
+
+def test_success_resets_the_failure_count(target):
+    with pytest.raises(ConnectionError):
+        call(target, fail)
+    call(target, ok)
+    with pytest.raises(ConnectionError):
+        call(target, fail)
+
+    assert resilience.breaker(target).state == Breaker.CLOSED
+
+
+def test_probe_success_closes_the_breaker(target):
+    open_breaker(target)
+    time.sleep(0.06)
+
+    assert call(target, ok) == "ok"
+    assert resilience.breaker(target).state == Breaker.CLOSED
+
+
+def test_probe_failure_reopens_the_breaker(target):
+    open_breaker(target)
+    time.sleep(0.06)
+    with pytest.raises(ConnectionError):
+        call(target, fail)
+
+    assert resilience.breaker(target).state == Breaker.OPEN
+    with pytest.raises(CircuitOpen):
+        call(target, ok)
+
+
+def test_half_open_admits_one_probe(target):
+    open_breaker(target)
+    time.sleep(0.06)
+    started, finish = threading.Event(), threading.Event()
+
+    def slow(timeout):
+        started.set()
+        finish.wait(5)
+        return "ok"
+
+    probe = threading.Thread(target=call, args=(target, slow))
+    probe.start()
+    started.wait(5)
+    try:
+        assert resilience.breaker(target).state == Breaker.HALF_OPEN
+        with pytest.raises(CircuitOpen):
+            call(target, ok)
+    finally:
+        finish.set()
+        probe.join()
+    assert resilience.breaker(target).state == Breaker.CLOSED
+
+
+def test_interrupted_probe_releases_the_breaker(target):
+    open_breaker(target)
+    time.sleep(0.06)
+
+    def interrupted(timeout):
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        call(target, interrupted)
+    assert resilience.breaker(target).state == Breaker.OPEN
+
+    # a later call probes again instead of finding the breaker stuck half-open
+    time.sleep(0.06)
+    assert call(target, ok) == "ok"
+
+
+def test_no_time_left_is_not_admitted_as_a_probe(target):
+    open_breaker(target)
+    time.sleep(0.06)
+    token = resilience._deadline.set(time.monotonic() - 1)
+    try:
+        with pytest.raises(DeadlineExceeded):
+            call(target, ok)
+    finally:
+        resilience._deadline.reset(token)
+
+    assert resilience.breaker(target).state == Breaker.OPEN
+    assert call(target, ok) == "ok"
+
+
+def test_attempt_gets_the_time_left(target):
+    token = resilience._deadline.set(time.monotonic() + 5)
+    try:
+        timeout = resilience.call(target, "get", lambda timeout: timeout, lambda result: False)
+    finally:
+        resilience._deadline.reset(token)
+
+    assert 4 < timeout <= 5
@@ -0,0 +1,186 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Per-request latency breakdown in ``Server-Timing`` format.
+
+Every request of a service is split into phases, reported in the
+``Server-Timing`` response header (HTTP) or the ``server-timing`` trailing
+metadata key (gRPC), e.g. ``mongo_read;dur=3.10, encode;dur=0.42, total;dur=5.02``:
+
+======================================  =====================================
+``mongo_read`` / ``mongo_write``        MongoDB commands (via command monitoring)
+``encode``                              JSON encoding of Flask responses
+``compress``                            compression of Flask responses
+``downstream``                          calls to other services (dashboard)
+``downstream_<phase>``                  the phases reported by those services
+``parse``                               before the first downstream call
+``serialize``                           after the last downstream call
+``app``                                 the rest (services without downstream calls)
+``total``                               the whole request
+======================================  =====================================
+
+``setup(service)`` registers the MongoDB listener; ``instrument_flask(app)``
+and ``common.server.serve_grpc`` time every request. The dashboard's clients
+(``common.tracing.insecure_channel`` / ``requests_client``) time downstream
+calls and merge the downstream services' phases.
+"""
+
+import contextlib
+import contextvars
+import time
+
+from pymongo import monitoring
+
+READ_COMMANDS = frozenset(("find", "getMore", "aggregate", "count", "distinct"))
+WRITE_COMMANDS = frozenset(("insert", "update", "delete", "findAndModify"))
+
+_current = contextvars.ContextVar("server_timing", default=None)
+
+
+class Timings:
+    __slots__ = ("start", "phases", "first_downstream", "last_downstream")
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.phases = {}
+        self.first_downstream = None
+        self.last_downstream = None
+
+    def add(self, name, seconds):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def merge(self, header, prefix="downstream_"):
+        """Add the phases of a downstream ``Server-Timing`` value."""
+        for entry in (header or "").split(","):
+            name, _, params = entry.strip().partition(";")
+            for param in params.split(";"):
+                key, _, value = param.strip().partition("=")
+                if key == "dur" and name:
+                    try:
+                        self.add(prefix + name, float(value) / 1000)
+                    except ValueError:
+                        pass
+
+    def header(self):
+        end = time.perf_counter()
+        total = end - self.start
+        phases = dict(self.phases)
+        if self.first_downstream is not None:
+            phases["parse"] = self.first_downstream - self.start
+            phases["serialize"] = end - self.last_downstream
+        else:
+            measured = sum(v for k, v in phases.items() if not k.startswith("downstream_"))
+            phases["app"] = max(total - measured, 0.0)
+        phases["total"] = total
+        return ", ".join(f"{name};dur={seconds * 1000:.2f}" for name, seconds in phases.items())
+
+
+def current():
+    return _current.get()
+
+
+@contextlib.contextmanager
+def phase(name):
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - start)
+
+
+@contextlib.contextmanager
+def downstream():
+    """Times a call to another service; yields the request's ``Timings`` (or None)."""
+    timings = _current.get()
+    if timings is None:
+        yield None
+        return
+    start = time.perf_counter()
+    if timings.first_downstream is None:
+        timings.first_downstream = start
+    try:
+        yield timings
+    finally:
+        timings.last_downstream = time.perf_counter()
+        timings.add("downstream", timings.last_downstream - start)
+
+
+class CommandListener(monitoring.CommandListener):
+    """Adds MongoDB command time to the phases of the current request."""
+
+    def __init__(self):
+        self.pending = {}
+
+    def started(self, event):
+        timings = _current.get()
+        if timings is not None:
+            self.pending[(event.connection_id, event.request_id)] = timings
+
+    def succeeded(self, event):
+        self.__record(event)
+
+    def failed(self, event):
+        self.__record(event)
+
+    def __record(self, event):
+        timings = self.pending.pop((event.connection_id, event.request_id), None)
+        if timings is None:
+            return
+        if event.command_name in READ_COMMANDS:
+            timings.add("mongo_read", event.duration_micros / 1e6)
+        elif event.command_name in WRITE_COMMANDS:
+            timings.add("mongo_write", event.duration_micros / 1e6)
+
+
+_registered = False
+
+
+def setup(service):
+    global _registered
+    if not _registered:
+        monitoring.register(CommandListener())
+        _registered = True
+
+
+def instrument_flask(app):
+    from flask import g
+
+    from common.flask_json import TimedJSONProvider
+
+    app.json = TimedJSONProvider(app)
+
+    @app.before_request
+    def _timing_start():
+        g._timing_parent = _current.get()
+        _current.set(Timings())
+
+    @app.after_request
+    def _timing_header(response):
+        timings = _current.get()
+        if timings is not None and "_timing_parent" in g:
+            response.headers["Server-Timing"] = timings.header()
+        return response
+
+    @app.teardown_request
+    def _timing_end(exc):
+        if "_timing_parent" in g:
+            _current.set(g._timing_parent)
+
+
+def instrument_rpc(name, method):
+    def handler(request, context):
+        token = _current.set(Timings())
+        try:
+            response = method(request, context)
+            timings = _current.get()
+            context.set_trailing_metadata(tuple(context.trailing_metadata() or ()) + (("server-timing", timings.header()),))
+            return response
+        finally:
+            _current.reset(token)
+
+    return handler
@@ -0,0 +1,354 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Request tracing across the dashboard, the services and MongoDB.
+
+Trace context travels in the W3C ``traceparent`` header (HTTP) or metadata key
+(gRPC). ``setup(service)`` registers a MongoDB command listener;
+``instrument_flask(app)`` and ``common.server.serve_grpc`` open a server span
+per request; ``insecure_channel(target)`` and ``requests_client()`` propagate
+the context on outgoing calls (and time them for ``common.timing``). Every MongoDB command run while a span is
+active becomes a child span.
+
+======================================  =====================================
+``TRACE_EXPORTER``                      ``none`` (default), ``file`` or ``http``
+``TRACE_FILE``                          JSON-lines file, default ``$TMPDIR/martianbank-traces.jsonl``
+``TRACE_COLLECTOR_URL``                 where ``http`` POSTs batches of spans
+``TRACE_SAMPLE_RATE``                   share of new traces recorded, default 1
+======================================  =====================================
+
+Sampling is decided where a trace starts and carried in ``traceparent``, so a
+trace is recorded by every service or by none. Spans are written by a
+background thread (restarted in forked workers).
+``performance_locust/trace_report.py`` prints the critical path of the
+slowest traces and doubles as a collector for ``http``.
+"""
+
+import atexit
+import contextvars
+import json
+import logging
+import os
+import queue
+import random
+import tempfile
+import threading
+import time
+import urllib.request
+from urllib.parse import urlsplit
+
+from pymongo import monitoring
+
+from common import timing
+
+_service = None
+_exporter = None
+_sample_rate = 1.0
+_current = contextvars.ContextVar("trace_span", default=None)
+
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "sampled", "name", "kind",
+                 "attributes", "start", "_t0", "error")
+
+    def __init__(self, trace_id, parent_id, sampled, name, kind, attributes=None):
+        self.trace_id = trace_id
+        self.span_id = "%016x" % random.getrandbits(64)
+        self.parent_id = parent_id
+        self.sampled = sampled
+        self.name = name
+        self.kind = kind
+        self.attributes = attributes or {}
+        self.start = time.time()
+        self._t0 = time.perf_counter()
+        self.error = None
+
+    def child(self, name, kind="internal", attributes=None):
+        return Span(self.trace_id, self.span_id, self.sampled, name, kind, attributes)
+
+    def traceparent(self):
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def end(self, error=None):
+        if error is not None:
+            self.error = error
+        if self.sampled and _exporter is not None:
+            _exporter.export({
+                "trace_id": self.trace_id,
+                "span_id": self.span_id,
+                "parent_id": self.parent_id,
+                "name": self.name,
+                "kind": self.kind,
+                "service": _service,
+                "start": self.start,
+                "duration_ms": (time.perf_counter() - self._t0) * 1000,
+                "error": self.error,
+                "attributes": self.attributes,
+            })
+
+
+class _Exporter:
+    """Writes finished spans from a background thread in batches."""
+
+    def __init__(self, write):
+        self.write = write
+        self.queue = None
+        self.pid = None
+        self.lock = threading.Lock()
+        os.register_at_fork(after_in_child=self.__afterFork)
+        atexit.register(self.flush)
+
+    def __afterFork(self):
+        self.lock = threading.Lock()
+
+    def export(self, span):
+        if self.pid != os.getpid():
+            with self.lock:
+                if self.pid != os.getpid():
+                    self.queue = queue.SimpleQueue()
+                    threading.Thread(target=self.__run, args=(self.queue,), name="trace-exporter", daemon=True).start()
+                    self.pid = os.getpid()
+        self.queue.put_nowait(span)
+
+    def __run(self, spans):
+        while True:
+            batch = [spans.get()]
+            while len(batch) < 512:
+                try:
+                    batch.append(spans.get_nowait())
+                except queue.Empty:
+                    break
+            self.__write(batch)
+
+    def __write(self, batch):
+        try:
+            self.write("".join(json.dumps(s, default=str) + "\n" for s in batch))
+        except Exception as e:
+            logging.warning("Dropped %s spans: %s", len(batch), e)
+
+    def flush(self):
+        if self.queue is None or self.pid != os.getpid():
+            return
+        batch = []
+        while True:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        if batch:
+            self.__write(batch)
+
+
+def _file_writer(path):
+    def write(lines):
+        # one append per batch keeps lines of concurrent workers intact
+        with open(path, "a") as f:
+            f.write(lines)
+
+    return write
+
+
+def _http_writer(url):
+    def write(lines):
+        req = urllib.request.Request(url, data=lines.encode(), headers={"Content-Type": "application/x-ndjson"})
+        urllib.request.urlopen(req, timeout=5).close()
+
+    return write
+
+
+class CommandListener(monitoring.CommandListener):
+    """Child span per MongoDB command run under an active span."""
+
+    def __init__(self):
+        self.pending = {}
+
+    def started(self, event):
+        parent = _current.get()
+        if parent is None or not parent.sampled:
+            return
+        target = event.command.get("collection") if event.command_name == "getMore" else event.command.get(event.command_name)
+        self.pending[(event.connection_id, event.request_id)] = parent.child(
+            f"mongodb {event.command_name}",
+            "client",
+            {"db.name": event.database_name, "db.collection": target if isinstance(target, str) else ""},
+        )
+
+    def succeeded(self, event):
+        span = self.pending.pop((event.connection_id, event.request_id), None)
+        if span is not None:
+            span.end()
+
+    def failed(self, event):
+        span = self.pending.pop((event.connection_id, event.request_id), None)
+        if span is not None:
+            span.end(str(event.failure))
+
+
+def setup(service):
+    global _service, _exporter, _sample_rate
+    if _service is not None:
+        return
+    _service = service
+    exporter = os.getenv("TRACE_EXPORTER", "none").lower()
+    if exporter == "none":
+        return
+    if exporter == "file":
+        path = os.getenv("TRACE_FILE", os.path.join(tempfile.gettempdir(), "martianbank-traces.jsonl"))
+        _exporter = _Exporter(_file_writer(path))
+    elif exporter == "http":
+        url = os.getenv("TRACE_COLLECTOR_URL")
+        if not url:
+            raise Exception("TRACE_EXPORTER=http requires TRACE_COLLECTOR_URL")
+        _exporter = _Exporter(_http_writer(url))
+    else:
+        raise ValueError(f"Unknown TRACE_EXPORTER: {exporter} (expected none, file or http)")
+    _sample_rate = float(os.getenv("TRACE_SAMPLE_RATE", "1"))
+    monitoring.register(CommandListener())
+    logging.debug("Tracing %s with the %s exporter", service, exporter)
+
+
+def _parse_traceparent(value):
+    parts = (value or "").split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16 or len(parts[3]) != 2:
+        return None
+    try:
+        flags = int(parts[3], 16)
+    except ValueError:
+        return None
+    return parts[1], parts[2], flags & 1 == 1
+
+
+def start_server_span(name, traceparent, attributes=None):
+    """Span continuing the caller's trace, or starting one; None if tracing is off."""
+    if _exporter is None:
+        return None
+    parent = _parse_traceparent(traceparent)
+    if parent is None:
+        trace_id, parent_id = "%032x" % random.getrandbits(128), None
+        sampled = _sample_rate >= 1.0 or random.random() < _sample_rate
+    else:
+        trace_id, parent_id, sampled = parent
+    return Span(trace_id, parent_id, sampled, name, "server", attributes)
+
+
+def current():
+    return _current.get()
+
+
+def instrument_flask(app):
+    from flask import g, request
+
+    @app.before_request
+    def _trace_start():
+        if _exporter is None or request.path == "/metrics":
+            return
+        route = request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+        span = start_server_span(
+            f"{request.method} {route}",
+            request.headers.get("traceparent"),
+            {"http.method": request.method, "http.route": route},
+        )
+        g._trace_parent = _current.get()
+        g._trace_span = span
+        _current.set(span)
+
+    @app.after_request
+    def _trace_status(response):
+        span = g.get("_trace_span")
+        if span is not None:
+            span.attributes["http.status_code"] = response.status_code
+        return response
+
+    @app.teardown_request
+    def _trace_end(exc):
+        if "_trace_span" in g:
+            span = g._trace_span
+            _current.set(g._trace_parent)
+            if exc is None and span.attributes.get("http.status_code", 500) >= 500:
+                exc = f"HTTP {span.attributes.get('http.status_code', 500)}"
+            span.end(str(exc) if exc is not None else None)
+
+
+def instrument_rpc(name, method):
+    import grpc
+
+    def handler(request, context):
+        if _exporter is None:
+            return method(request, context)
+        metadata = dict(context.invocation_metadata() or ())
+        span = start_server_span(name, metadata.get("traceparent"), {"rpc.method": name})
+        previous = _current.get()
+        _current.set(span)
+        error = None
+        try:
+            return method(request, context)
+        except Exception as e:
+            code = getattr(e, "code", None)
+            error = code.name if isinstance(code, grpc.StatusCode) else repr(e)
+            raise
+        finally:
+            _current.set(previous)
+            code = context.code()
+            if error is None and code not in (None, grpc.StatusCode.OK):
+                error = code.name
+            span.end(error)
+
+    return handler
+
+
+def insecure_channel(target, options=None):
+    """``grpc.insecure_channel`` that propagates the current trace and collects
+    the downstream ``server-timing``."""
+    from common import tracing_grpc
+
+    return tracing_grpc.insecure_channel(target, options)
+
+
+class _TracedRequests:
+    """``requests``-like client (``get``/``post``/...) that propagates the current
+    trace and collects the downstream ``Server-Timing``. Calls go through
+    ``session`` (a ``requests.Session``, to reuse connections) when given."""
+
+    def __init__(self, session=None):
+        import requests
+
+        self.requests = session if session is not None else requests
+
+    def request(self, method, url, **kwargs):
+        with timing.downstream() as timings:
+            response = self.__request(method, url, **kwargs)
+            if timings is not None:
+                timings.merge(response.headers.get("Server-Timing"))
+        return response
+
+    def __request(self, method, url, **kwargs):
+        parent = _current.get()
+        if parent is None:
+            return self.requests.request(method, url, **kwargs)
+        span = parent.child(f"{method.upper()} {urlsplit(url).path}", "client", {"http.url": url})
+        kwargs["headers"] = dict(kwargs.get("headers") or {}, traceparent=span.traceparent())
+        try:
+            response = self.requests.request(method, url, **kwargs)
+        except Exception as e:
+            span.end(repr(e))
+            raise
+        span.attributes["http.status_code"] = response.status_code
+        span.end(f"HTTP {response.status_code}" if response.status_code >= 500 else None)
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request("PUT", url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request("DELETE", url, **kwargs)
+
+
+def requests_client(session=None):
+    return _TracedRequests(session)
@@ -0,0 +1,51 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""gRPC client side of ``common.tracing``, imported by
+``tracing.insecure_channel`` so HTTP-only processes never load grpc."""
+
+import collections
+
+import grpc
+
+from common import timing, tracing
+
+
+class CallDetails(
+    collections.namedtuple("CallDetails", ("method", "timeout", "metadata", "credentials", "wait_for_ready", "compression")),
+    grpc.ClientCallDetails,
+):
+    pass
+
+
+def _server_timing(metadata):
+    return next((value for key, value in metadata or () if key == "server-timing"), None)
+
+
+class _ClientInterceptor(grpc.UnaryUnaryClientInterceptor):
+    def intercept_unary_unary(self, continuation, client_call_details, request):
+        with timing.downstream() as timings:
+            parent = tracing.current()
+            if parent is None:
+                outcome = continuation(client_call_details, request)
+            else:
+                span = parent.child(client_call_details.method, "client", {"rpc.method": client_call_details.method})
+                details = CallDetails(
+                    client_call_details.method,
+                    client_call_details.timeout,
+                    list(client_call_details.metadata or ()) + [("traceparent", span.traceparent())],
+                    client_call_details.credentials,
+                    client_call_details.wait_for_ready,
+                    client_call_details.compression,
+                )
+                outcome = continuation(details, request)
+                error = outcome.exception()
+                span.end(error.code().name if isinstance(error, grpc.RpcError) else (repr(error) if error else None))
+            if timings is not None:
+                timings.merge(_server_timing(outcome.trailing_metadata()))
+        return outcome
+
+
+def insecure_channel(target, options=None):
+    return grpc.intercept_channel(grpc.insecure_channel(target, options), _ClientInterceptor())
@@ -0,0 +1,41 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""pytest setup for the Python services' tests: ``python -m pytest`` from the
+repository root.
+
+The services and the dashboard import ``common`` and their own modules the way
+their Dockerfiles lay them out (``PYTHONPATH=/service`` plus the service's
+directory). MongoDB is replaced by mongomock, one in-memory database shared by
+every module and emptied after each test.
+"""
+
+import os
+import sys
+
+import mongomock
+import pytest
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+for _path in (ROOT, *(os.path.join(ROOT, d) for d in ("accounts", "transactions", "loan", "dashboard"))):
+    if _path not in sys.path:
+        sys.path.append(_path)
+
+os.environ.setdefault("DB_URL", "mongodb://localhost")
+
+# Locust scenarios, not tests (comprehensive_system_test.py)
+collect_ignore = ["performance_locust"]
+
+from common import mongo  # noqa: E402
+
+mongo.MongoClient = mongomock.MongoClient
+
+
+@pytest.fixture(autouse=True)
+def database():
+    """The services' database, emptied after the test (indexes are kept)."""
+    db = mongo.get_database()
+    yield db
+    for name in db.list_collection_names():
+        db[name].delete_many({})
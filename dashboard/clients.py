@@ -0,0 +1,346 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Clients of the accounts, transactions and loan services.
+
+``AccountsClient``, ``TransactionsClient`` and ``LoanClient`` are the one way
+the dashboard calls the services, whatever ``SERVICE_PROTOCOL`` is: ``grpc``
+clients (``clients_grpc.py``, imported only in that mode) use one channel
+per service and worker process, ``http`` clients one
+pooled ``requests`` session, and ``inproc`` clients call the services'
+``*Generic`` classes in this process (see ``inproc.py``).
+
+======================================  =====================================
+``ACCOUNT_HOST``                        accounts service host, default ``localhost``
+``TRANSACTION_HOST``                    transactions service host, default ``localhost``
+``LOAN_HOST``                           loan service host, default ``localhost``
+``<SERVICE>_CALL_TIMEOUT_MS``           longest one call to ``ACCOUNTS``, ``TRANSACTIONS`` or ``LOAN`` may take
+``CLIENT_HTTP_POOL_SIZE``               connections kept per service (``http``), default 10
+======================================  =====================================
+
+Every transport answers with the same shapes: the ``grpc`` clients turn the
+responses into the dicts the services' HTTP routes return. Results marked
+``JSON`` are a JSON-ready value or, from the ``http`` clients, the service's
+JSON body as bytes, which the dashboard relays without decoding it.
+
+Remote calls go through ``common.resilience``: they get the rest of the
+request's deadline (or their call timeout, if shorter) and a circuit breaker,
+and reads may be hedged. Conditional reads take the request's
+``If-None-Match`` (werkzeug ``ETags``) and return ``(None, etag)`` when the
+client's copy is current.
+"""
+
+import abc
+import os
+import threading
+from typing import Any, Optional, Tuple, Union
+
+import requests
+from dotmap import DotMap
+from werkzeug.datastructures import ETags
+from werkzeug.http import unquote_etag
+
+from common import codec, resilience
+
+# a value, or its JSON encoding (see above)
+JSON = Union[bytes, Any]
+
+POOL_SIZE = int(os.getenv("CLIENT_HTTP_POOL_SIZE", 10))
+
+
+class AccountsClient(abc.ABC):
+    @abc.abstractmethod
+    def create_account(
+        self, email_id: str, account_type: str, address: str, govt_id_number: str, government_id_type: str, name: str
+    ) -> JSON:
+        """True, or False when the email already has an account of that type."""
+
+    @abc.abstractmethod
+    def get_accounts(self, email_id: str) -> JSON:
+        """The accounts of an email: ``[{"account_number", "email_id", ...}]``."""
+
+    @abc.abstractmethod
+    def get_account_details_batch(self, account_numbers: list) -> dict:
+        """``{account_number: {"account_number", "name", "balance", "currency"}}``;
+        unknown numbers are left out."""
+
+
+class TransactionsClient(abc.ABC):
+    @abc.abstractmethod
+    def send_money(
+        self, sender_account_number: str, receiver_account_number: str, amount: float,
+        sender_account_type: str, receiver_account_type: str, reason: str,
+    ) -> JSON:
+        """``{"approved", "message"}``"""
+
+    @abc.abstractmethod
+    def zelle(self, sender_email: str, receiver_email: str, amount: float, reason: str) -> JSON:
+        """``{"approved", "message"}``"""
+
+    @abc.abstractmethod
+    def get_transactions_history(
+        self, account_number: str, since: str = "", if_none_match: Optional[ETags] = None
+    ) -> Tuple[Optional[JSON], Optional[str]]:
+        """``(transactions, etag)``; ``since`` is a transaction id or an ISO
+        timestamp, and only newer transactions are returned."""
+
+    @abc.abstractmethod
+    def get_transaction_by_id(self, transaction_id: str) -> JSON:
+        """The transaction, or ``{}``."""
+
+
+class LoanClient(abc.ABC):
+    @abc.abstractmethod
+    def process_loan_request(
+        self, name: str, email: str, account_type: str, account_number: str, govt_id_type: str,
+        govt_id_number: str, loan_type: str, loan_amount: float, interest_rate: float, time_period: str,
+    ) -> JSON:
+        """``{"approved", "message"}``"""
+
+    @abc.abstractmethod
+    def get_loan_history(self, email: str, if_none_match: Optional[ETags] = None) -> Tuple[Optional[JSON], Optional[str]]:
+        """``(loans, etag)``"""
+
+    @abc.abstractmethod
+    def get_loan_portfolio_stats(self, filters: dict) -> JSON:
+        """Totals of the loans matching ``filters`` (``from_day``, ``to_day``,
+        ``loan_type``, ``status``), by day, loan type and status."""
+
+
+class _Http:
+    def __init__(self, base_url, timeout=None):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.__client = None
+        self.__pid = None
+
+    @property
+    def client(self):
+        # pooled connections do not survive fork; one session per worker process
+        if self.__pid != os.getpid():
+            with self.lock:
+                if self.__pid != os.getpid():
+                    session = requests.Session()
+                    session.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=POOL_SIZE))
+                    # inside the cluster compressing a response costs more than sending it
+                    session.headers["Accept-Encoding"] = "identity"
+                    self.__client = resilience.requests_client(session)
+                    self.__pid = os.getpid()
+        return self.__client
+
+    def post(self, path, body, idempotent=False, headers=None):
+        return self.client.post(
+            self.base_url + path, json=body, idempotent=idempotent, headers=headers, timeout=self.timeout
+        )
+
+    def conditional(self, path, body, if_none_match):
+        """``(body, etag)``, with ``body`` None when not modified."""
+        headers = {"If-None-Match": if_none_match.to_header()} if if_none_match else None
+        response = self.post(path, body, idempotent=True, headers=headers)
+        etag = unquote_etag(response.headers.get("ETag"))[0]
+        if response.status_code == 304:
+            return None, etag
+        return json_body(response), etag
+
+
+def json_body(response):
+    """Body of a service's JSON response, kept as bytes so it can be relayed
+    without decoding and re-encoding it; other bodies are decoded (and fail)."""
+    if "json" not in response.headers.get("Content-Type", ""):
+        return codec.loads(response.content)
+    return response.content
+
+
+class HttpAccountsClient(_Http, AccountsClient):
+    def create_account(self, email_id, account_type, address, govt_id_number, government_id_type, name):
+        return json_body(self.post("/create-account", {
+            "email_id": email_id,
+            "account_type": account_type,
+            "address": address,
+            "govt_id_number": govt_id_number,
+            "government_id_type": government_id_type,
+            "name": name,
+        }))
+
+    def get_accounts(self, email_id):
+        return json_body(self.post("/get-all-accounts", {"email_id": email_id}, idempotent=True))
+
+    def get_account_details_batch(self, account_numbers):
+        response = self.post("/account-details", {"account_numbers": account_numbers}, idempotent=True)
+        return codec.loads(response.content)
+
+
+class InprocAccountsClient(AccountsClient):
+    def __init__(self, accounts):
+        self.accounts = accounts
+
+    def create_account(self, email_id, account_type, address, govt_id_number, government_id_type, name):
+        return self.accounts.createAccount(DotMap(
+            email_id=email_id,
+            account_type=account_type,
+            address=address,
+            govt_id_number=govt_id_number,
+            government_id_type=government_id_type,
+            name=name,
+        ))
+
+    def get_accounts(self, email_id):
+        return self.accounts.getAccounts(DotMap(email_id=email_id))
+
+    def get_account_details_batch(self, account_numbers):
+        return self.accounts.getAccountDetailsBatch(account_numbers)
+
+
+class HttpTransactionsClient(_Http, TransactionsClient):
+    def send_money(
+        self, sender_account_number, receiver_account_number, amount, sender_account_type, receiver_account_type, reason
+    ):
+        return json_body(self.post("/transfer", {
+            "sender_account_number": sender_account_number,
+            "receiver_account_number": receiver_account_number,
+            "amount": amount,
+            "sender_account_type": sender_account_type,
+            "receiver_account_type": receiver_account_type,
+            "reason": reason,
+        }))
+
+    def zelle(self, sender_email, receiver_email, amount, reason):
+        return json_body(self.post("/zelle", {
+            "sender_email": sender_email, "receiver_email": receiver_email, "amount": amount, "reason": reason,
+        }))
+
+    def get_transactions_history(self, account_number, since="", if_none_match=None):
+        return self.conditional(
+            "/transaction-history", {"account_number": account_number, "since": since}, if_none_match
+        )
+
+    def get_transaction_by_id(self, transaction_id):
+        return json_body(self.post("/transaction-with-id", {"transaction_id": transaction_id}, idempotent=True))
+
+
+class InprocTransactionsClient(TransactionsClient):
+    def __init__(self, transactions):
+        self.transactions = transactions
+
+    def send_money(
+        self, sender_account_number, receiver_account_number, amount, sender_account_type, receiver_account_type, reason
+    ):
+        return self.transactions.SendMoney(DotMap(
+            sender_account_number=sender_account_number,
+            receiver_account_number=receiver_account_number,
+            amount=amount,
+            sender_account_type=sender_account_type,
+            receiver_account_type=receiver_account_type,
+            reason=reason,
+        ))
+
+    def zelle(self, sender_email, receiver_email, amount, reason):
+        return self.transactions.Zelle(DotMap(
+            sender_email=sender_email, receiver_email=receiver_email, amount=amount, reason=reason
+        ))
+
+    def get_transactions_history(self, account_number, since="", if_none_match=None):
+        req = DotMap(account_number=account_number, since=since)
+        version = self.transactions.GetTransactionsHistoryVersion(req)
+        if if_none_match is not None and if_none_match.contains(version):
+            return None, version
+        try:
+            return self.transactions.GetTransactionsHistory(req), version
+        except ValueError:
+            # what the service answers over HTTP (with a 400, and no ETag)
+            return {"error": f"Invalid since: {since}"}, None
+
+    def get_transaction_by_id(self, transaction_id):
+        return self.transactions.GetTransactionByID(DotMap(transaction_id=transaction_id))
+
+
+class HttpLoanClient(_Http, LoanClient):
+    def process_loan_request(
+        self, name, email, account_type, account_number, govt_id_type, govt_id_number, loan_type, loan_amount,
+        interest_rate, time_period,
+    ):
+        return json_body(self.post("/loan/request", {
+            "name": name,
+            "email": email,
+            "account_type": account_type,
+            "account_number": account_number,
+            "govt_id_type": govt_id_type,
+            "govt_id_number": govt_id_number,
+            "loan_type": loan_type,
+            "loan_amount": loan_amount,
+            "interest_rate": interest_rate,
+            "time_period": time_period,
+        }))
+
+    def get_loan_history(self, email, if_none_match=None):
+        return self.conditional("/loan/history", {"email": email}, if_none_match)
+
+    def get_loan_portfolio_stats(self, filters):
+        return json_body(self.post("/loan/stats", filters, idempotent=True))
+
+
+class InprocLoanClient(LoanClient):
+    def __init__(self, loan):
+        self.loan = loan
+
+    def process_loan_request(
+        self, name, email, account_type, account_number, govt_id_type, govt_id_number, loan_type, loan_amount,
+        interest_rate, time_period,
+    ):
+        return self.loan.ProcessLoanRequest({
+            "name": name,
+            "email": email,
+            "account_type": account_type,
+            "account_number": account_number,
+            "govt_id_type": govt_id_type,
+            "govt_id_number": govt_id_number,
+            "loan_type": loan_type,
+            "loan_amount": loan_amount,
+            "interest_rate": interest_rate,
+            "time_period": time_period,
+        })
+
+    def get_loan_history(self, email, if_none_match=None):
+        req = {"email": email}
+        version = self.loan.getLoanHistoryVersion(req)
+        if if_none_match is not None and if_none_match.contains(version):
+            return None, version
+        return self.loan.getLoanHistory(req), version
+
+    def get_loan_portfolio_stats(self, filters):
+        return self.loan.getLoanPortfolioStats(filters)
+
+
+def _timeout(service):
+    timeout_ms = os.getenv(f"{service}_CALL_TIMEOUT_MS")
+    return float(timeout_ms) / 1000 if timeout_ms else None
+
+
+def connect(protocol):
+    """``(accounts, transactions, loan)`` clients for ``SERVICE_PROTOCOL``."""
+    if protocol == "inproc":
+        import inproc
+
+        return (
+            InprocAccountsClient(inproc.accounts_generic),
+            InprocTransactionsClient(inproc.transaction_generic),
+            InprocLoanClient(inproc.loan_generic),
+        )
+
+    services = (
+        ("ACCOUNTS", os.getenv("ACCOUNT_HOST", "localhost"), 50051),
+        ("TRANSACTIONS", os.getenv("TRANSACTION_HOST", "localhost"), 50052),
+        ("LOAN", os.getenv("LOAN_HOST", "localhost"), 50053),
+    )
+    if protocol == "grpc":
+        # imported here: the other protocols never load grpc
+        import clients_grpc
+        from common import proto
+
+        proto.check_backend()
+        kinds = (clients_grpc.GrpcAccountsClient, clients_grpc.GrpcTransactionsClient, clients_grpc.GrpcLoanClient)
+        return tuple(kind(f"{host}:{port}", _timeout(name)) for kind, (name, host, port) in zip(kinds, services))
+    kinds = (HttpAccountsClient, HttpTransactionsClient, HttpLoanClient)
+    return tuple(kind(f"http://{host}:{port}", _timeout(name)) for kind, (name, host, port) in zip(kinds, services))
@@ -0,0 +1,163 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""gRPC clients of the accounts, transactions and loan services
+(``SERVICE_PROTOCOL=grpc``, see ``clients.py``)."""
+
+import os
+import threading
+
+import grpc
+
+from protobufs.accounts_pb2 import CreateAccountRequest, GetAccountDetailsBatchRequest, GetAccountsRequest
+from protobufs.accounts_pb2_grpc import AccountDetailsServiceStub
+from protobufs.loan_pb2 import LoanRequest, LoansHistoryRequest, LoanStatsRequest
+from protobufs.loan_pb2_grpc import LoanServiceStub
+from protobufs.transaction_pb2 import GetALLTransactionsRequest, TransactionByIDRequest, TransactionRequest, ZelleRequest
+from protobufs.transaction_pb2_grpc import TransactionServiceStub
+
+from clients import AccountsClient, LoanClient, TransactionsClient
+from common import proto, resilience
+
+# reads that may be hedged (sent twice)
+READ_RPCS = (
+    "/AccountDetailsService/getAccounts",
+    "/AccountDetailsService/getAccountDetailsBatch",
+    "/TransactionService/getTransactionsHistory",
+    "/TransactionService/getTransactionByID",
+    "/LoanService/getLoanHistory",
+    "/LoanService/getLoanPortfolioStats",
+)
+
+
+class _Grpc:
+    stub_class = None
+
+    def __init__(self, target, timeout=None):
+        self.target = target
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.__stub = None
+        self.__pid = None
+
+    @property
+    def stub(self):
+        # channels do not survive fork; one per worker process
+        if self.__pid != os.getpid():
+            with self.lock:
+                if self.__pid != os.getpid():
+                    self.__stub = self.stub_class(resilience.insecure_channel(self.target, idempotent=READ_RPCS))
+                    self.__pid = os.getpid()
+        return self.__stub
+
+    def conditional(self, rpc, req, if_none_match):
+        """``(response, etag)``, with ``response`` None when not modified."""
+        etags = if_none_match.as_set() if if_none_match is not None else ()
+        metadata = [("if-none-match", next(iter(etags)))] if etags else []
+        response, call = rpc.with_call(req, metadata=metadata, timeout=self.timeout)
+        trailers = dict(call.trailing_metadata() or ())
+        if trailers.get("not-modified"):
+            return None, trailers.get("etag")
+        return response, trailers.get("etag")
+
+
+class GrpcAccountsClient(_Grpc, AccountsClient):
+    stub_class = AccountDetailsServiceStub
+
+    def create_account(self, email_id, account_type, address, govt_id_number, government_id_type, name):
+        response = self.stub.createAccount(CreateAccountRequest(
+            email_id=email_id,
+            account_type=account_type,
+            address=address,
+            govt_id_number=govt_id_number,
+            government_id_type=government_id_type,
+            name=name,
+        ), timeout=self.timeout)
+        return response.result
+
+    def get_accounts(self, email_id):
+        response = self.stub.getAccounts(GetAccountsRequest(email_id=email_id), timeout=self.timeout)
+        return proto.to_dict(response)["accounts"]
+
+    def get_account_details_batch(self, account_numbers):
+        response = self.stub.getAccountDetailsBatch(
+            GetAccountDetailsBatchRequest(account_numbers=account_numbers), timeout=self.timeout
+        )
+        return {acc["account_number"]: acc for acc in proto.to_dict(response)["accounts"]}
+
+
+class GrpcTransactionsClient(_Grpc, TransactionsClient):
+    stub_class = TransactionServiceStub
+
+    def send_money(
+        self, sender_account_number, receiver_account_number, amount, sender_account_type, receiver_account_type, reason
+    ):
+        response = self.stub.sendMoney(TransactionRequest(
+            sender_account_number=sender_account_number,
+            receiver_account_number=receiver_account_number,
+            amount=amount,
+            sender_account_type=sender_account_type,
+            receiver_account_type=receiver_account_type,
+            reason=reason,
+        ), timeout=self.timeout)
+        return proto.to_dict(response)
+
+    def zelle(self, sender_email, receiver_email, amount, reason):
+        response = self.stub.Zelle(ZelleRequest(
+            sender_email=sender_email, receiver_email=receiver_email, amount=amount, reason=reason
+        ), timeout=self.timeout)
+        return proto.to_dict(response)
+
+    def get_transactions_history(self, account_number, since="", if_none_match=None):
+        try:
+            response, etag = self.conditional(
+                self.stub.getTransactionsHistory,
+                GetALLTransactionsRequest(account_number=account_number, since=since),
+                if_none_match,
+            )
+        except grpc.RpcError as e:
+            if e.code() != grpc.StatusCode.INVALID_ARGUMENT:
+                raise
+            # what the service answers over HTTP (with a 400, and no ETag)
+            return {"error": e.details()}, None
+        if response is None:
+            return None, etag
+        return proto.to_dict(response)["transactions"], etag
+
+    def get_transaction_by_id(self, transaction_id):
+        t = self.stub.getTransactionByID(TransactionByIDRequest(transaction_id=transaction_id), timeout=self.timeout)
+        # unknown ids: an empty message
+        return proto.to_dict(t) if t.transaction_id else {}
+
+
+class GrpcLoanClient(_Grpc, LoanClient):
+    stub_class = LoanServiceStub
+
+    def process_loan_request(
+        self, name, email, account_type, account_number, govt_id_type, govt_id_number, loan_type, loan_amount,
+        interest_rate, time_period,
+    ):
+        response = self.stub.ProcessLoanRequest(LoanRequest(
+            name=name,
+            email=email,
+            account_type=account_type,
+            account_number=account_number,
+            govt_id_type=govt_id_type,
+            govt_id_number=govt_id_number,
+            loan_type=loan_type,
+            loan_amount=loan_amount,
+            interest_rate=interest_rate,
+            time_period=time_period,
+        ), timeout=self.timeout)
+        return proto.to_dict(response)
+
+    def get_loan_history(self, email, if_none_match=None):
+        response, etag = self.conditional(self.stub.getLoanHistory, LoansHistoryRequest(email=email), if_none_match)
+        if response is None:
+            return None, etag
+        return proto.to_dict(response)["loans"], etag
+
+    def get_loan_portfolio_stats(self, filters):
+        response = self.stub.getLoanPortfolioStats(LoanStatsRequest(**filters), timeout=self.timeout)
+        return proto.to_dict(response)
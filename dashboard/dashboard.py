@@ -2,65 +2,247 @@
 # Use of this source code is governed by a BSD-style
 # license that can be found in the LICENSE file.
 
+import functools
+import hashlib
 import os
 import logging
-import json
 
 # from google.protobuf.json_format import MessageToDict
 from flask_cors import CORS
 
-from flask import Flask, render_template, request, jsonify
-import grpc
+from flask import Flask, current_app, g, render_template, request, jsonify, make_response
+from werkzeug.http import unquote_etag
 
-from dotenv import load_dotenv
-load_dotenv()
+if __name__ == "__main__":
+    # before the imports below, which read their settings from the environment
+    from dotenv import load_dotenv
+    load_dotenv()
+
+from common import batcher, cache, codec, compression, log, metrics, mongo, profiling, resilience, singleflight, timing, tracing
+from common.server import serve_flask
+
+import clients
+
+
+# calls to the auth and ATM services propagate the trace context, and have
+# deadlines and circuit breakers (see common/resilience.py)
+flask_client_requests = resilience.requests_client()
+
+# calls to the accounts, transactions and loan services (see clients.py), set
+# by create_app
+accounts_client = transactions_client = loan_client = None
+account_details = None
+
+# the dashboard's routes, added to the app by create_app
+ROUTES = []
+
+
+def route(rule, **options):
+    def decorator(view):
+        ROUTES.append((rule, options, view))
+        return view
+
+    return decorator
+
+
+def setup():
+    """Process-wide setup: logging, metrics, tracing, profiling and timing."""
+    # LOG_LEVEL, LOG_FORMAT, ... (see common/log.py)
+    log.setup("dashboard")
+    metrics.setup("dashboard")
+    tracing.setup("dashboard")
+    profiling.setup("dashboard")
+    timing.setup("dashboard")
+
+    # db_host = os.getenv("DATABASE_HOST", "localhost")
+    if os.getenv("DB_URL") is None:
+        raise Exception("DB_URL environment variable is not set")
+    mongo.configure("dashboard")
+
+
+def create_app():
+    """The dashboard, calling the services over ``SERVICE_PROTOCOL``; run
+    ``setup`` first in a standalone process."""
+    global accounts_client, transactions_client, loan_client, account_details
+
+    protocol = os.getenv('SERVICE_PROTOCOL', 'http').lower()
+    logging.debug("microservice protocol: %s", protocol)
+    # inproc: the services' code runs in this process, see inproc.py
+    accounts_client, transactions_client, loan_client = clients.connect(protocol)
+
+    # Lookups from concurrent requests within ACCOUNT_BATCH_WINDOW_MS share one call
+    # (see common/batcher.py); sync workers serve one request at a time, so the
+    # window defaults to 0 (no batching) for them.
+    account_details = batcher.Batcher(
+        "account_details",
+        accounts_client.get_account_details_batch,
+        window_ms=float(os.getenv(
+            "ACCOUNT_BATCH_WINDOW_MS", 0 if os.getenv("WEB_WORKER_CLASS", "sync").lower() == "sync" else 2
+        )),
+        max_batch=int(os.getenv("ACCOUNT_BATCH_MAX", 100)),
+    )
+
+    app = Flask(__name__)
+    CORS(app)
+    metrics.instrument_flask(app)
+    tracing.instrument_flask(app)
+    # per-request deadline budgets in ms (DEADLINE_MS for the other routes)
+    resilience.instrument_flask(app, grpc_errors=protocol == "grpc", budgets={
+        "get_all_accounts": 5000,
+        "get_account_details": 5000,
+        "get_all_transactions": 5000,
+        "GetTransactionByID": 5000,
+        "loan_history": 5000,
+        "loan_portfolio_stats": 5000,
+        "get_atms": 5000,
+        "get_specific_atm": 5000,
+    })
+    profiling.instrument_flask(app)
+    timing.instrument_flask(app)
+    compression.instrument_flask(app)
+    for rule, options, view in ROUTES:
+        app.add_url_rule(rule, view_func=view, **options)
+    return app
+
+
+def envelope(body):
+    """``{"response": body}``; downstream JSON bytes are spliced in as they are."""
+    return b'{"response":' + (body if isinstance(body, bytes) else codec.dumps(body)) + b"}"
+
+
+def json_response(body):
+    return current_app.response_class(body, mimetype="application/json")
+
+
+# Identical concurrent reads share one downstream call (see common/singleflight.py);
+# never use these for routes that change anything.
+account_reads = singleflight.Group("accounts")
+account_detail_reads = singleflight.Group("account_detail")
+atm_reads = singleflight.Group("atm")
+
+
+def read_key():
+    """The route and its form parameters, in a canonical order."""
+    return request.path, tuple(sorted(request.form.items(multi=True)))
+
+
+def with_etag(body, etag):
+    response = make_response(body)
+    if etag:
+        response.set_etag(etag)
+    return response
+
+
+def not_modified(etag):
+    response = make_response("", 304)
+    response.set_etag(etag)
+    return response
+
+
+# Read routes are answered from the response cache (common/cache.py, off unless
+# CACHE_BACKEND is set) for CACHE_TTL_<NAME>_S seconds; the write routes drop
+# the entries tagged with the accounts and emails they change.
+response_cache = cache.from_env()
+CACHED_HEADERS = ("Content-Type", "Content-Encoding", "ETag")
+
+
+def cache_key():
+    """Method, path, query, accepted encodings and the (sorted) form or body."""
+    form = sorted(request.form.items(multi=True))
+    body = codec.dumps(form) if form else request.get_data()
+    parts = (request.method, request.full_path, request.headers.get("Accept-Encoding", ""))
+    return hashlib.sha256("\0".join(parts).encode() + b"\0" + body).hexdigest()
+
+
+def cached_response(entry):
+    meta, _, body = entry.partition(b"\n")
+    status, headers = codec.loads(meta)
+    etag = dict(headers).get("ETag")
+    if etag and request.if_none_match.contains(unquote_etag(etag)[0]):
+        return not_modified(unquote_etag(etag)[0])
+    return current_app.response_class(body, status=status, headers=headers)
 
-from accounts_pb2 import *
-from accounts_pb2_grpc import *
 
-from transaction_pb2_grpc import *
-from transaction_pb2 import *
+def cached(name, default_ttl, tags=lambda body: (), methods=("POST",)):
+    """Cache the 200 responses to ``methods`` of a read route; ``tags(body)``
+    lists the tags of a response (``account:<number>``, ``email:<email>``)."""
+    ttl = float(os.getenv(f"CACHE_TTL_{name.upper()}_S", default_ttl))
 
-from loan_pb2_grpc import LoanServiceStub
-from loan_pb2 import *
+    def decorator(view):
+        if response_cache is None or ttl <= 0:
+            return view
 
-from pymongo.mongo_client import MongoClient
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method not in methods:
+                return view(*args, **kwargs)
+            key = cache_key()
+            entry = response_cache.get(name, key)
+            if entry is not None:
+                metrics.cache_hit(name)
+                return cached_response(entry)
+            metrics.cache_miss(name)
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code == 200 and not response.is_streamed:
+                body = response.get_data()
+                headers = [(h, response.headers[h]) for h in CACHED_HEADERS if h in response.headers]
+                response_cache.set(name, key, codec.dumps([200, headers]) + b"\n" + body, ttl, tags(body))
+            return response
 
-import requests as flask_client_requests
+        return wrapper
 
-# set logging to debug
-logging.basicConfig(level=logging.DEBUG)
+    return decorator
 
 
-# db_host = os.getenv("DATABASE_HOST", "localhost")
-db_url = os.getenv("DB_URL")
-if db_url is None:
-    raise Exception("DB_URL environment variable is not set")
+def invalidates(tags):
+    """Drop the cached responses tagged with ``tags()`` once a write route ran."""
 
-uri = db_url
+    def decorator(view):
+        if response_cache is None:
+            return view
 
-logging.debug(f"Connecting to MongoDB at {uri}")
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            try:
+                return view(*args, **kwargs)
+            finally:
+                if request.method == "POST":
+                    for tag in tags():
+                        response_cache.invalidate(tag)
 
-# protocol = os.getenv('SERVICE_PROTOCOL')
-protocol = os.getenv('SERVICE_PROTOCOL', 'http')
+        return wrapper
 
-if protocol is None:
-    raise Exception("SERVICE_PROTOCOL environment variable is not set")
+    return decorator
 
-protocol = protocol.lower()
-logging.debug(f"microservice protocol: {protocol}")
 
+def account_tags(body):
+    accounts = codec.loads(body)["response"]
+    return [f"account:{acc['account_number']}" for acc in accounts] if isinstance(accounts, list) else []
 
-client = MongoClient(uri)
-db = client["bank"]
-collection = db["accounts"]
 
+def owner_tags(account_number, email=None):
+    """``account:<number>`` and ``email:<email>`` of the account's owner, so
+    writes by email (Zelle) drop the entry too; ``email`` is looked up when
+    not given."""
+    if email is None:
+        try:
+            email = (account_details.load(account_number) or {}).get("email_id")
+        except Exception:
+            logging.warning("Owner of %s unknown, cached without its email tag", account_number, exc_info=True)
+    return [f"account:{account_number}"] + ([f"email:{email}"] if email else [])
 
-app = Flask(__name__)
-CORS(app)
 
+@route("/mongo-pool", methods=["GET"])
+def mongo_pool_stats():
+    return jsonify(mongo.pool_stats())
 
-@app.route("/")
+
+@route("/mongo-queries", methods=["GET"])
+def mongo_query_stats():
+    return jsonify(mongo.query_stats())
+
+
+@route("/")
 def render_homepage():
     return f"Dashboard is running..."
 
@@ -82,61 +264,21 @@ def render_homepage():
 # gRPC setup
 
 
-@app.route("/account/create", methods=["GET", "POST"])
+@route("/account/create", methods=["GET", "POST"])
+@invalidates(lambda: [f"email:{request.form['email_id']}"])
 def create_account():
-    def __grpc():
-        channel = grpc.insecure_channel(host_ip_port)
-        client = AccountDetailsServiceStub(channel)
-        email_id = request.form["email_id"]
-        account_type = request.form["account_type"]
-        address = request.form["address"]
-        govt_id_number = request.form["govt_id_number"]
-        government_id_type = request.form["government_id_type"]
-        name = request.form["name"]
-
-        # Create a gRPC request
-        account_request = CreateAccountRequest(
-            email_id=email_id,
-            account_type=account_type,
-            address=address,
-            govt_id_number=govt_id_number,
-            government_id_type=government_id_type,
-            name=name,
-        )
-
-        logging.debug(f"Sending account creation request: {account_request}")
-        # Send the gRPC request to the Account Microservice
-        response = client.createAccount(account_request)
-        logging.debug(f"Account creation response: {response}")
-
-        logging.debug(f"Account creation response: {response.result}")
-
-        # Return a JSON response
-        return json.dumps({"response": {"status": response.result}})
-
-    def __flask():
-        response = flask_client_requests.post(
-            f"http://{host_ip_port}/create-account", json=request.form
-        )
-        logging.debug(f"====================== {response.json()}")
-        return {"response": response.json()}
-
-    accounts_host = os.getenv("ACCOUNT_HOST", "localhost")
-    host_ip_port = f"{accounts_host}:50051"
-
     if request.method == "POST":
-        logging.debug("+++++++++++++++++++++++++++++++++++++++++")
-        logging.debug(request.form)
-        # result = __grpc()
-        # result = __flask()
-        result = None
-        if protocol == "grpc":
-            result = __grpc()
-        else:
-            result = __flask()
-
-
-        return result
+        logging.debug("Form: %s", request.form)
+        result = accounts_client.create_account(
+            email_id=request.form["email_id"],
+            account_type=request.form["account_type"],
+            address=request.form["address"],
+            govt_id_number=request.form["govt_id_number"],
+            government_id_type=request.form["government_id_type"],
+            name=request.form["name"],
+        )
+        logging.debug("Account creation response: %s", result)
+        return json_response(envelope(result))
 
     return render_template("create_account_form.html")
 
@@ -144,580 +286,252 @@ def create_account():
 #  a_b
 
 
-@app.route("/account/allaccounts", methods=["GET", "POST"])
+@route("/account/allaccounts", methods=["GET", "POST"])
+@cached("accounts", 5, lambda body: [f"email:{request.form['email_id']}"] + account_tags(body))
 def get_all_accounts():
-    def __grpc():
-        channel = grpc.insecure_channel(host_ip_port)
-        client = AccountDetailsServiceStub(channel)
-        logging.debug("+++++++++++++++++++++++++++++++++++++++++")
-        logging.debug(request.form)
-
-        email_id = request.form["email_id"]
-        get_req = GetAccountsRequest(email_id=email_id)
-        response = client.getAccounts(get_req)
-        response = [
-            {
-                "account_number": acc.account_number,
-                "email_id": acc.email_id,
-                "account_type": acc.account_type,
-                "address": acc.address,
-                "govt_id_number": acc.govt_id_number,
-                "government_id_type": acc.government_id_type,
-                "name": acc.name,
-                "currency": acc.currency,
-                "balance": acc.balance,
-            }
-            for acc in response.accounts
-        ]
-
-        return json.dumps({"response": response})
-
-    def __flask():
-        response = flask_client_requests.post(
-            f"http://{host_ip_port}/get-all-accounts", json=request.form
-        )
-        logging.debug(f"====================== {response.json()}")
-        return {"response": response.json()}
+    def __load():
+        return envelope(accounts_client.get_accounts(request.form["email_id"]))
 
-    accounts_host = os.getenv("ACCOUNT_HOST", "localhost")
-    host_ip_port = f"{accounts_host}:50051"
     if request.method == "POST":
-        # response =  __grpc()
-        # response = __flask()
-        response = None
-        if protocol == "grpc":
-            response = __grpc()
-        else:
-            response = __flask()
-        
-        return response
+        logging.debug("Form: %s", request.form)
+        return json_response(account_reads.do(read_key(), __load))
 
     return jsonify({"response": None})
 
 
-@app.route("/account/detail", methods=["GET", "POST"])
+@route("/account/detail", methods=["GET", "POST"])
+@cached("account_detail", 5, lambda body: owner_tags(request.form["account_number"], g.get("owner_email") or ""))
 def get_account_details():
-    def __grpc():
-        logging.debug(" get account details called")
-        channel = grpc.insecure_channel(host_ip_port)
-        client = AccountDetailsServiceStub(channel)
-
-        account_number = request.form["account_number"]
-        get_req = GetAccountDetailRequest(account_number=account_number)
-        response = client.getAccountDetails(get_req)
-
-        return json.dumps(
-            {
-                "response": {
-                    "account_number": response.account_number,
-                    "name": response.name,
-                    "balance": response.balance,
-                    "currency": response.currency,
-                }
-            }
-        )
-
-    def __flask():
-        response = flask_client_requests.post(
-            f"http://{host_ip_port}/account-detail", json=request.form
-        )
-        logging.debug(f"====================== {response.json()}")
-        return {"response": response.json()}
-
-    accounts_host = os.getenv("ACCOUNT_HOST", "localhost")
-    host_ip_port = f"{accounts_host}:50051"
+    def __load():
+        # unknown accounts: {}; the owner's email is only for the cache tags
+        detail = dict(account_details.load(request.form["account_number"]) or {})
+        email = detail.pop("email_id", None)
+        return envelope(detail), email
 
     if request.method == "POST":
-        logging.debug("+++++++++++++++++++++++++++++++++++++++++")
-        logging.debug(request.form)
-        # response = __grpc()
-        # response = __flask()
-        response = None
-        if protocol == "grpc":
-            response = __grpc()
-        else:
-            response = __flask()
-        
-        return response
+        logging.debug("Form: %s", request.form)
+        body, g.owner_email = account_detail_reads.do(read_key(), __load)
+        return json_response(body)
 
     return jsonify({"response": None})
 
 
-@app.route("/transaction/", methods=["GET", "POST"])
+@route("/transaction/", methods=["GET", "POST"])
+@invalidates(lambda: [
+    f"account:{request.form['sender_account_number']}", f"account:{request.form['receiver_account_number']}"
+])
 def transaction_form():
-    def __grpc():
-        channel = grpc.insecure_channel(host_ip_port)
-        client = TransactionServiceStub(channel)
-        sender_account_number = request.form["sender_account_number"]  # type: ignore
-        receiver_account_number = request.form["receiver_account_number"]  # type: ignore
-        amount = float(request.form["amount"])  # type: ignore
-        sender_account_type = request.form["sender_account_type"]  # type: ignore
-        receiver_account_type = request.form["receiver_account_type"]  # type: ignore
-        reason = request.form["reason"]  # type: ignore
-        req = TransactionRequest(
-            sender_account_number=sender_account_number,
-            receiver_account_number=receiver_account_number,
-            amount=amount,
-            sender_account_type=sender_account_type,
-            receiver_account_type=receiver_account_type,
-            reason=reason,
+    if request.method == "POST":
+        result = transactions_client.send_money(
+            sender_account_number=request.form["sender_account_number"],
+            receiver_account_number=request.form["receiver_account_number"],
+            amount=float(request.form["amount"]),
+            sender_account_type=request.form["sender_account_type"],
+            receiver_account_type=request.form["receiver_account_type"],
+            reason=request.form["reason"],
         )
+        logging.debug("Transaction response: %s", result)
+        return json_response(envelope(result))
 
-        logging.debug("Sending transaction request...")
-
-        response = client.sendMoney(req)
-        # return f"Transaction successful. Transaction ID: {response}"
-        return json.dumps(
-            {"response": {"approved": response.approved, "message": response.message}}
-        )
+    return render_template("transaction.html")
 
-    def __flask():
-        response = flask_client_requests.post(
-            f"http://{host_ip_port}/transfer", json=request.form
-        )
-        logging.debug(f"====================== {response.json()}")
-        return {"response": response.json()}
 
-    transaction_host = os.getenv("TRANSACTION_HOST", "localhost")
-    host_ip_port = f"{transaction_host}:50052"
+@route("/transaction/zelle/", methods=["GET", "POST"])
+@invalidates(lambda: [f"email:{request.form['sender_email']}", f"email:{request.form['receiver_email']}"])
+def transaction_zelle():
     if request.method == "POST":
-        # result = __grpc()
-        # result = __flask()
-        result = None
-        if protocol == "grpc":
-            result = __grpc()
-        else:
-            result = __flask()
-        
-        logging.debug(f"---->Transaction response: {result}")
-        return result
+        result = transactions_client.zelle(
+            sender_email=request.form["sender_email"],
+            receiver_email=request.form["receiver_email"],
+            amount=float(request.form["amount"]),
+            reason=request.form["reason"],
+        )
+        logging.debug("Zelle response: %s", result)
+        return json_response(envelope(result))
 
     return render_template("transaction.html")
 
 
-@app.route("/transaction/zelle/", methods=["GET", "POST"])
-def transaction_zelle():
-    def __grpc():
-        channel = grpc.insecure_channel(host_ip_port)
-        client = TransactionServiceStub(channel)
-        sender_email = request.form["sender_email"]  # type: ignore
-        receiver_email = request.form["receiver_email"]  # type: ignore
-        amount = float(request.form["amount"])  # type: ignore
-        reason = request.form["reason"]  # type: ignore
-
-        req = ZelleRequest(
-            sender_email=sender_email,
-            receiver_email=receiver_email,
-            amount=amount,
-            reason=reason,
+@route("/transaction/history", methods=["GET", "POST"])
+@cached("transaction_history", 5, lambda body: owner_tags(request.form["account_number"]))
+def get_all_transactions():
+    if request.method == "POST":
+        result, etag = transactions_client.get_transactions_history(
+            request.form["account_number"], request.form.get("since", ""), request.if_none_match
         )
+        if result is None:
+            return not_modified(etag)
+        logging.debug("Transaction response: %s", result)
+        return with_etag(envelope(result), etag)
 
-        logging.debug("Sending transaction request...")
-
-        response = client.Zelle(req)
+    return envelope(None)
 
-        logging.debug(f"Zelle response: {response}")
-
-        # return f"Transaction successful. Transaction ID: {response}"
-        return json.dumps(
-            {"response": {"approved": response.approved, "message": response.message}}
-        )
 
-    def __flask():
-        req = {
-            "sender_email": request.form["sender_email"],
-            "receiver_email": request.form["receiver_email"],
-            "amount": float(request.form["amount"]),
-            "reason": request.form["reason"],
-        }
-        response = flask_client_requests.post(f"http://{host_ip_port}/zelle", json=req)
-        logging.debug(f"====================== {response.json()}")
-        return {"response": response.json()}
-
-    transaction_host = os.getenv("TRANSACTION_HOST", "localhost")
-    host_ip_port = f"{transaction_host}:50052"
+# transactions never change
+@route("/transaction/transaction-with-id", methods=["GET", "POST"])
+@cached("transaction", 300)
+def GetTransactionByID():
     if request.method == "POST":
-        # result = __grpc()
-        # result = __flask()
-        
-        result = None
-        if protocol == "grpc":
-            result = __grpc()
-        else:
-            result = __flask()
-        
-        logging.debug(f"---->Transaction response: {result}")
-        return result
-
-    return render_template("transaction.html")
+        result = transactions_client.get_transaction_by_id(request.form["transaction_id"])
+        logging.debug("Transaction response: %s", result)
+        return json_response(envelope(result))
 
+    return envelope(None)
 
-@app.route("/transaction/history", methods=["GET", "POST"])
-def get_all_transactions():
-    def __grpc():
-        channel = grpc.insecure_channel(host_ip_port)
-        client = TransactionServiceStub(channel)
-
-        account_number = request.form["account_number"]  # type: ignore
-        req = GetALLTransactionsRequest(account_number=account_number)
-        response = client.getTransactionsHistory(req)
-        transaction_history = []
-        for r in response.transactions:
-            t = {
-                "account_number": r.account_number,
-                "amount": r.amount,
-                "reason": r.reason,
-                "time_stamp": r.time_stamp,
-                "type": r.type,
-                "transaction_id": r.transaction_id,
-            }
-            transaction_history.append(t)
-        return json.dumps({"response": transaction_history})
-
-    def __flask():
-        req = {"account_number": request.form["account_number"]}
-        response = flask_client_requests.post(
-            f"http://{host_ip_port}/transaction-history", json=req
-        )
-        logging.debug(f"====================== {response.json()}")
-        return {"response": response.json()}
 
-    transaction_host = os.getenv("TRANSACTION_HOST", "localhost")
-    host_ip_port = f"{transaction_host}:50052"
+@route("/loan/", methods=["GET", "POST"])
+@invalidates(lambda: [f"email:{request.form['email']}", f"account:{request.form['account_number']}"])
+def loan_form():
     if request.method == "POST":
-        # result = __grpc()
-        # result = __flask()
-        result = None
-        if protocol == "grpc":
-            result = __grpc()
-        else:
-            result = __flask()
-        logging.debug(f"---->Transaction response: {result}")
-        return result
-
-    return json.dumps({"response": None})
+        result = loan_client.process_loan_request(
+            name=request.form["name"],
+            email=request.form["email"],
+            account_type=request.form["account_type"],
+            account_number=request.form["account_number"],
+            govt_id_type=request.form["govt_id_type"],
+            govt_id_number=request.form["govt_id_number"],
+            loan_type=request.form["loan_type"],
+            loan_amount=float(request.form["loan_amount"]),
+            interest_rate=float(request.form["interest_rate"]),
+            time_period=request.form["time_period"],
+        )
+        logging.debug("Loan response: %s", result)
+        return envelope(result)
 
+    return render_template("loan_form.html")
 
-@app.route("/transaction/transaction-with-id", methods=["GET", "POST"])
-def GetTransactionByID():
-    def __grpc():
-        transaction_id = request.form["transaction_id"]  # type: ignore
-        channel = grpc.insecure_channel(host_ip_port)
-        client = TransactionServiceStub(channel)
-        req = TransactionByIDRequest(transaction_id=transaction_id)
-        r = client.getTransactionByID(req)
-        response = {
-            "account_number": r.account_number,
-            "amount": r.amount,
-            "reason": r.reason,
-            "time_stamp": r.time_stamp,
-            "type": r.type,
-            "transaction_id": r.transaction_id,
-        }
-        return json.dumps({"response": response})
-
-    def __flask():
-        req = {"transaction_id": request.form["transaction_id"]}
-        response = flask_client_requests.post(
-            f"http://{host_ip_port}/transaction-with-id", json=req
-        )
-        logging.debug(f"====================== {response.json()}")
-        return {"response": response.json()}
 
-    transaction_host = os.getenv("TRANSACTION_HOST", "localhost")
-    host_ip_port = f"{transaction_host}:50052"
+@route("/loan/history", methods=["GET", "POST"])
+@cached("loan_history", 5, lambda body: [f"email:{request.form['email']}"])
+def loan_history():
     if request.method == "POST":
-        # result = __grpc()
-        # result = __flask()
-        
-        result = None
-        if protocol == "grpc":
-            result = __grpc()
-        else:
-            result = __flask()
-        
-        logging.debug(f"---->Transaction response: {result}")
-        return result
-
-    return json.dumps({"response": None})
-
-
-@app.route("/loan/", methods=["GET", "POST"])
-def loan_form():
-    def __getLoanGRPC():
-        name = request.form["name"]
-        email = request.form["email"]
-        account_type = request.form["account_type"]
-        account_number = request.form["account_number"]
-        govt_id_type = request.form["govt_id_type"]
-        govt_id_number = request.form["govt_id_number"]
-        loan_type = request.form["loan_type"]
-        loan_amount = float(request.form["loan_amount"])
-        interest_rate = float(request.form["interest_rate"])
-        time_period = request.form["time_period"]
-
-        # Create a gRPC request
-        loan_request = LoanRequest(
-            name=name,
-            email=email,
-            account_type=account_type,
-            account_number=account_number,
-            govt_id_type=govt_id_type,
-            govt_id_number=govt_id_number,
-            loan_type=loan_type,
-            loan_amount=loan_amount,
-            interest_rate=interest_rate,
-            time_period=time_period,
-        )
+        response, etag = loan_client.get_loan_history(request.form["email"], request.if_none_match)
+        if response is None:
+            return not_modified(etag)
 
-        # Send the gRPC request to the Loan Microservice
-        channel = grpc.insecure_channel(host_ip_port)
-        client = LoanServiceStub(channel)
-        response = client.ProcessLoanRequest(loan_request)
-        # response.account_number = account_number
-        logging.debug(f"Loan response: {response.approved}")
-        return {"approved": response.approved, "message": response.message}
-
-    def __getLoanFlask():
-        # send a request to loan microservice implemented in flask
-        name = request.form["name"]
-        email = request.form["email"]
-        account_type = request.form["account_type"]
-        account_number = request.form["account_number"]
-        govt_id_type = request.form["govt_id_type"]
-        govt_id_number = request.form["govt_id_number"]
-        loan_type = request.form["loan_type"]
-        loan_amount = float(request.form["loan_amount"])
-        interest_rate = float(request.form["interest_rate"])
-        time_period = request.form["time_period"]
-
-        loan_request = {
-            "name": name,
-            "email": email,
-            "account_type": account_type,
-            "account_number": account_number,
-            "govt_id_type": govt_id_type,
-            "govt_id_number": govt_id_number,
-            "loan_type": loan_type,
-            "loan_amount": loan_amount,
-            "interest_rate": interest_rate,
-            "time_period": time_period,
-        }
-
-        logging.debug(f"........==============>  {loan_request}")
-
-        logging.debug(f"........==============>  http://{host_ip_port}/loan/request")
-        response = flask_client_requests.post(
-            f"http://{host_ip_port}/loan/request", json=loan_request
-        )
-        return response.json()
+        return with_etag(envelope(response), etag)
+    return envelope(None)
 
-    loan_host = os.getenv("LOAN_HOST", "localhost")
-    host_ip_port = f"{loan_host}:50053"
-    if request.method == "POST":
-        # result = __getLoanGRPC()
-        # result = __getLoanFlask()
 
-        result = None
-        if protocol == "grpc":
-            result = __getLoanGRPC()
-        else:
-            result = __getLoanFlask()
+@route("/loan/stats", methods=["GET", "POST"])
+def loan_portfolio_stats():
+    params = request.form if request.method == "POST" else request.args
+    filters = {
+        k: params[k] for k in ("from_day", "to_day", "loan_type", "status") if params.get(k)
+    }
+    return envelope(loan_client.get_loan_portfolio_stats(filters))
 
-        logging.debug(f"---->Loan response: {result}")
-        return json.dumps({"response": result})
 
-    return render_template("loan_form.html")
+#################### Proxy Routes for API Clarity ####################
 
+# The auth and ATM services' responses are streamed to the client as they
+# arrive: the body is neither buffered nor decoded, so the proxy costs the
+# same whatever the payload size.
+PROXY_CHUNK_BYTES = int(os.getenv("PROXY_CHUNK_BYTES", 64 * 1024))
+PROXY_REQUEST_HEADERS = ("Content-Type", "Accept", "Accept-Encoding", "Authorization", "Cookie")
+PROXY_RESPONSE_HEADERS = (
+    "Content-Type", "Content-Encoding", "Content-Length", "Cache-Control", "ETag", "Last-Modified", "Location",
+)
 
-@app.route("/loan/history", methods=["GET", "POST"])
-def loan_history():
-    def __grpc():
-        # Send the gRPC request to the Loan Microservice
-        channel = grpc.insecure_channel(host_ip_port)
-        client = LoanServiceStub(channel)
-        req = LoansHistoryRequest(email=request.form["email"])
-        response = client.getLoanHistory(req)
-        loans = []
-        for r in response.loans:
-            t = {
-                "name": r.name,
-                "email": r.email,
-                "account_type": r.account_type,
-                "account_number": r.account_number,
-                "govt_id_type": r.govt_id_type,
-                "govt_id_number": r.govt_id_number,
-                "loan_type": r.loan_type,
-                "loan_amount": r.loan_amount,
-                "interest_rate": r.interest_rate,
-                "time_period": r.time_period,
-                "status": r.status,
-                "timestamp": r.timestamp,
-            }
-            loans.append(t)
-        return loans
-
-        # return MessageToDict(response)
-
-    def __flask():
-        # send a post request to loan microservice implemented in flask
-        req = {"email": request.form["email"]}
-        logging.debug(
-            f'=========================> this is  {f"{host_ip_port}/loan/history"}'
-        )
-        response = flask_client_requests.post(
-            f"http://{host_ip_port}/loan/history", json=req
-        )
-        logging.debug(f"====================== {response.json()}")
-        return response.json()
 
-    loan_host = os.getenv("LOAN_HOST", "localhost")
-    host_ip_port = f"{loan_host}:50053"
-    if request.method == "POST":
-        logging.debug("+++++++++++++++++++++++++++++++++++++++++")
+def relayed_headers(upstream):
+    headers = [(name, upstream.headers[name]) for name in PROXY_RESPONSE_HEADERS if name in upstream.headers]
+    # requests folds repeated headers into one; cookies must stay separate
+    return headers + [("Set-Cookie", cookie) for cookie in upstream.raw.headers.getlist("Set-Cookie")]
 
-        # response = __grpc()
-        # response = __flask()
 
-        response = None
-        if protocol == "grpc":
-            response = __grpc()
-        else:
-            response = __flask()
+def fetch(method, url, data, headers):
+    """The whole upstream response: (status, relayed headers, raw body)."""
+    with flask_client_requests.request(method, url, data=data, headers=headers, stream=True) as upstream:
+        return upstream.status_code, relayed_headers(upstream), upstream.raw.read(decode_content=False)
 
-        
 
-        logging.debug("-----------------------------------------")
+def proxy(url, reads=None):
+    """Forward the current request to ``url`` and stream the response back with
+    its status and allowlisted headers; compressed bodies stay compressed.
 
-        return json.dumps({"response": response})
-    return json.dumps({"response": None})
+    With a single-flight group ``reads``, identical concurrent requests (same
+    method, URL, body and forwarded headers) share one upstream call, whose
+    body is then buffered."""
+    if request.query_string:
+        url = f"{url}?{request.query_string.decode()}"
+    headers = {name: request.headers[name] for name in PROXY_REQUEST_HEADERS if name in request.headers}
+    # the body is relayed as sent: only ask for encodings the client accepts
+    headers.setdefault("Accept-Encoding", "identity")
+    data = request.get_data() or None
 
+    if reads is not None:
+        key = (request.method, url, data, tuple(sorted(headers.items())))
+        status, upstream_headers, content = reads.do(key, lambda: fetch(request.method, url, data, headers))
+    else:
+        upstream = flask_client_requests.request(request.method, url, data=data, headers=headers, stream=True)
 
-#################### Proxy Routes for API Clarity ####################
+        def body():
+            try:
+                yield from upstream.raw.stream(PROXY_CHUNK_BYTES, decode_content=False)
+            finally:
+                upstream.close()
+
+        status, upstream_headers, content = upstream.status_code, relayed_headers(upstream), body()
+    logging.debug("response from %s: %s", url, status)
+    return current_app.response_class(content, status=status, headers=upstream_headers)
 
 
-@app.route("/api/users", methods=["POST"])
+@route("/api/users", methods=["POST"])
 def register_user():
-    logging.debug("=========================> register user called")
+    logging.debug("register user called")
 
     customer_auth_host = os.getenv("CUSTOMER_AUTH_HOST", "localhost")
-    logging.debug(
-        f"=========================> forwarding to {customer_auth_host}:8000/api/users"
-    )
-
-    user_data = flask_client_requests.post(
-        f"http://{customer_auth_host}:8000/api/users", json=request.json
-    ).json()
-    logging.debug(
-        f"=========================> response from {customer_auth_host}:8000/api/users: {user_data}"
-    )
-
-    return json.dumps(user_data)
+    return proxy(f"http://{customer_auth_host}:8000/api/users")
 
 
-@app.route("/api/users/auth", methods=["POST"])
+@route("/api/users/auth", methods=["POST"])
 def login_user():
-    logging.debug("=========================> login user called")
+    logging.debug("login user called")
 
     customer_auth_host = os.getenv("CUSTOMER_AUTH_HOST", "localhost")
-    logging.debug(
-        f"=========================> forwarding to {customer_auth_host}:8000/api/users/auth"
-    )
-
-    user_data = flask_client_requests.post(
-        f"http://{customer_auth_host}:8000/api/users/auth", json=request.json
-    ).json()
-    logging.debug(
-        f"=========================> response from {customer_auth_host}:8000/api/users/auth: {user_data}"
-    )
+    return proxy(f"http://{customer_auth_host}:8000/api/users/auth")
 
-    return json.dumps(user_data)
 
-
-@app.route("/api/users/logout", methods=["POST"])
+@route("/api/users/logout", methods=["POST"])
 def logout_user():
-    logging.debug("=========================> logout user called")
+    logging.debug("logout user called")
 
     customer_auth_host = os.getenv("CUSTOMER_AUTH_HOST", "localhost")
-    logging.debug(
-        f"=========================> forwarding to {customer_auth_host}:8000/api/users/logout"
-    )
-
-    user_data = flask_client_requests.post(
-        f"http://{customer_auth_host}:8000/api/users/logout", json=request.json
-    ).json()
-    logging.debug(
-        f"=========================> response from {customer_auth_host}:8000/api/users/logout: {user_data}"
-    )
+    return proxy(f"http://{customer_auth_host}:8000/api/users/logout")
 
-    return json.dumps(user_data)
 
-
-@app.route("/api/users/profile", methods=["GET", "PUT"])
+@route("/api/users/profile", methods=["GET", "PUT"])
 def profile_user():
-    logging.debug("=========================> profile user called")
+    logging.debug("profile user called")
 
     customer_auth_host = os.getenv("CUSTOMER_AUTH_HOST", "localhost")
-    logging.debug(
-        f"=========================> forwarding to {customer_auth_host}:8000/api/users/profile"
-    )
+    return proxy(f"http://{customer_auth_host}:8000/api/users/profile")
 
-    if request.method == "GET":
-        user_data = flask_client_requests.get(
-            f"http://{customer_auth_host}:8000/api/users/profile", json=request.json
-        ).json()
-        logging.debug(
-            f"=========================> response from {customer_auth_host}:8000/api/users/profile: {user_data}"
-        )
 
-    if request.method == "PUT":
-        user_data = flask_client_requests.put(
-            f"http://{customer_auth_host}:8000/api/users/profile", json=request.json
-        ).json()
-        logging.debug(
-            f"=========================> response from {customer_auth_host}:8000/api/users/profile: {user_data}"
-        )
-
-    return json.dumps(user_data)
-
-
-@app.route("/api/atm/", methods=["POST"])
+@route("/api/atm/", methods=["POST"])
+@cached("atm", 60)
 def get_atms():
-    logging.debug("=========================> get atms called")
+    logging.debug("get atms called")
 
     atm_locator_host = os.getenv("ATM_LOCATOR_HOST", "localhost")
-    logging.debug(
-        f"=========================> forwarding to {atm_locator_host}:8001/api/atm"
-    )
-
-    atm_data = flask_client_requests.post(
-        f"http://{atm_locator_host}:8001/api/atm", json=request.json
-    ).json()
-    logging.debug(
-        f"=========================> response from {atm_locator_host}:8001/api/atm: {atm_data}"
-    )
+    return proxy(f"http://{atm_locator_host}:8001/api/atm", atm_reads)
 
-    return json.dumps(atm_data)
 
-
-@app.route("/api/atm/<string:id>", methods=["GET"])
+@route("/api/atm/<string:id>", methods=["GET"])
+@cached("atm", 60, methods=("GET",))
 def get_specific_atm(id):
-    logging.debug("=========================> get specific atm called")
+    logging.debug("get specific atm called")
 
     atm_locator_host = os.getenv("ATM_LOCATOR_HOST", "localhost")
-    logging.debug(
-        f"=========================> forwarding to {atm_locator_host}:8001/api/atm/{id}"
-    )
-
-    atm_data = flask_client_requests.get(
-        f"http://{atm_locator_host}:8001/api/atm/{id}"
-    ).json()
-    logging.debug(
-        f"=========================> response from {atm_locator_host}:8001/api/atm/{id}: {atm_data}"
-    )
-
-    return json.dumps(atm_data)
+    return proxy(f"http://{atm_locator_host}:8001/api/atm/{id}", atm_reads)
 
 
 if __name__ == "__main__":
-    app.run(debug=True)
+    setup()
+    on_worker_start = None
+    if os.getenv("SERVICE_PROTOCOL", "http").lower() == "inproc":
+        import inproc
+
+        on_worker_start = inproc.on_worker_start
+    serve_flask(create_app(), 5000, on_worker_start=on_worker_start)
@@ -0,0 +1,44 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""In-process transport (``SERVICE_PROTOCOL=inproc``) for single-node deployments.
+
+The dashboard imports the accounts, transactions and loan services and calls
+their ``AccountsGeneric``, ``TransactionGeneric`` and ``LoanGeneric`` directly,
+so a request costs neither serialization nor a network hop. The services are
+imported from ``INPROC_SERVICES_DIR`` (default: the parent of ``dashboard/``,
+which holds ``accounts/``, ``transactions/`` and ``loan/`` in the repository
+and in the dashboard image).
+
+Importing the services' modules sets nothing up (their ``setup`` only runs
+when they are started on their own), so they log and count as the dashboard
+and query through its MongoDB client and pool. Transfers and loans share one
+account filter; ``on_worker_start`` starts it in each worker.
+"""
+
+import os
+import sys
+
+_root = os.getenv("INPROC_SERVICES_DIR", os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+for _name in ("accounts", "transactions", "loan"):
+    # appended: the dashboard's own modules come first
+    _path = os.path.join(_root, _name)
+    if _path not in sys.path:
+        sys.path.append(_path)
+
+import accounts  # noqa: E402
+import loan  # noqa: E402
+import transaction  # noqa: E402
+
+from common.account_filter import AccountFilter  # noqa: E402
+
+account_filter = AccountFilter.from_env(transaction.collection_accounts)
+transaction_generic = transaction.TransactionGeneric(account_filter)
+loan_generic = loan.LoanGeneric(account_filter)
+# new accounts pass the filter at once instead of after the next catch-up
+accounts_generic = accounts.AccountsGeneric(on_created=(account_filter.add,))
+
+
+def on_worker_start():
+    account_filter.ensure_started()
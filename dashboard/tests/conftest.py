@@ -0,0 +1,10 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+import os
+
+# read when dashboard.py is imported: the services run in the test process
+# and the cached routes are wrapped
+os.environ["SERVICE_PROTOCOL"] = "inproc"
+os.environ["CACHE_BACKEND"] = "memory"
@@ -0,0 +1,122 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+import json
+
+import pytest
+
+import dashboard
+from common import cache
+
+ACCOUNT = {
+    "account_type": "Checking", "currency": "USD", "address": "Mars", "govt_id_number": "1",
+    "government_id_type": "Passport", "balance": 100.0,
+}
+
+
+@pytest.fixture
+def client(database, monkeypatch):
+    database.accounts.insert_many([
+        dict(ACCOUNT, account_number="A1", email_id="a@example.com", name="Alice"),
+        dict(ACCOUNT, account_number="B1", email_id="b@example.com", name="Bob"),
+    ])
+    monkeypatch.setattr(dashboard, "response_cache", cache.MemoryBackend())
+    return dashboard.create_app().test_client()
+
+
+def balance(client, account_number="A1"):
+    return client.post("/account/detail", data={"account_number": account_number}).json["response"]["balance"]
+
+
+def history(client, account_number="A1"):
+    # answered as text/html, as before
+    return json.loads(client.post("/transaction/history", data={"account_number": account_number}).data)["response"]
+
+
+def loan_history(client, email="a@example.com"):
+    return json.loads(client.post("/loan/history", data={"email": email}).data)["response"]
+
+
+def set_balance(database, account_number, value):
+    database.accounts.update_one({"account_number": account_number}, {"$set": {"balance": value}})
+
+
+def test_detail_is_cached_without_the_owner_email(client, database):
+    response = client.post("/account/detail", data={"account_number": "A1"})
+    set_balance(database, "A1", 1.0)
+
+    assert "email_id" not in response.json["response"]
+    assert balance(client) == 100.0
+
+
+def test_transfer_invalidates_both_accounts(client):
+    assert (balance(client, "A1"), balance(client, "B1")) == (100.0, 100.0)
+    client.post("/transaction/", data={
+        "sender_account_number": "A1", "receiver_account_number": "B1", "amount": "5",
+        "sender_account_type": "Checking", "receiver_account_type": "Checking", "reason": "Rent",
+    })
+
+    assert (balance(client, "A1"), balance(client, "B1")) == (95.0, 105.0)
+
+
+def test_zelle_invalidates_the_accounts_of_both_emails(client):
+    assert balance(client, "B1") == 100.0 and history(client, "B1") == []
+    client.post("/transaction/zelle/", data={
+        "sender_email": "a@example.com", "receiver_email": "b@example.com", "amount": "5", "reason": "Rent",
+    })
+
+    assert balance(client, "B1") == 105.0
+    assert len(history(client, "B1")) == 1
+
+
+def test_loan_invalidates_the_account_and_loan_history(client):
+    assert balance(client) == 100.0
+    assert loan_history(client) == []
+    client.post("/loan/", data={
+        "name": "Alice", "email": "a@example.com", "account_type": "Checking", "account_number": "A1",
+        "govt_id_type": "Passport", "govt_id_number": "1", "loan_type": "Personal", "loan_amount": "50",
+        "interest_rate": "5", "time_period": "12",
+    })
+
+    assert balance(client) == 150.0
+    assert len(loan_history(client)) == 1
+
+
+def test_new_account_invalidates_the_owners_accounts(client):
+    accounts = lambda: client.post("/account/allaccounts", data={"email_id": "a@example.com"}).json["response"]
+    assert len(accounts()) == 1
+    client.post("/account/create", data={
+        "email_id": "a@example.com", "account_type": "Savings", "address": "Mars", "govt_id_number": "1",
+        "government_id_type": "Passport", "name": "Alice",
+    })
+
+    assert len(accounts()) == 2
+
+
+def test_other_accounts_stay_cached(client, database):
+    assert balance(client, "B1") == 100.0
+    client.post("/transaction/zelle/", data={
+        "sender_email": "a@example.com", "receiver_email": "a@example.com", "amount": "5", "reason": "Rent",
+    })
+    set_balance(database, "B1", 1.0)
+
+    assert balance(client, "B1") == 100.0
+
+
+def test_owner_tags(client):
+    dashboard.create_app()
+
+    assert dashboard.owner_tags("A1") == ["account:A1", "email:a@example.com"]
+    assert dashboard.owner_tags("A1", "") == ["account:A1"]
+    assert dashboard.owner_tags("X1") == ["account:X1"]
+
+
+def test_owner_tags_without_the_accounts_service(client, monkeypatch):
+    class Unavailable:
+        def load(self, account_number):
+            raise ConnectionError("accounts unavailable")
+
+    monkeypatch.setattr(dashboard, "account_details", Unavailable())
+
+    assert dashboard.owner_tags("A1") == ["account:A1"]
@@ -4,8 +4,8 @@
 
 import grpc 
 
-from loan_pb2_grpc import LoanServiceStub
-from loan_pb2 import LoanRequest 
+from protobufs.loan_pb2_grpc import LoanServiceStub
+from protobufs.loan_pb2 import LoanRequest 
 
 channel = grpc.insecure_channel('localhost:50053')
 client = LoanServiceStub(channel)
@@ -2,50 +2,86 @@
 # Use of this source code is governed by a BSD-style
 # license that can be found in the LICENSE file.
 
-from concurrent import futures
+from collections import OrderedDict
+import queue
 import random
 import datetime
 import os
-import grpc
+import sys
+import threading
+import time
+import uuid
 
 import logging
-from flask import Flask, request, jsonify
-# set logging to debug
-logging.basicConfig(level=logging.DEBUG)
-
-
-from loan_pb2 import *
-import loan_pb2_grpc
-
-from pymongo.mongo_client import MongoClient
-
-from dotenv import load_dotenv
-load_dotenv()
-
-
-# db_host = os.getenv("DATABASE_HOST", "localhost")
-db_url = os.getenv("DB_URL")
-if db_url is None:
-    raise Exception("DB_URL environment variable is not set")
-
-uri = db_url
-
-protocol = os.getenv('SERVICE_PROTOCOL', 'http')
-if protocol is None:
-    raise Exception("SERVICE_PROTOCOL environment variable is not set")
-
-protocol = protocol.lower()
-
-logging.debug(f"microservice protocol: {protocol}")
 
+from pymongo import ReplaceOne, UpdateOne
+from pymongo.errors import BulkWriteError, PyMongoError
 
+if __name__ == "__main__":
+    # before the imports below, which read their settings from the environment;
+    # importing this module (the dashboard's inproc mode) has no side effects
+    from dotenv import load_dotenv
+    load_dotenv()
+
+from common import log, metrics, mongo, profiling, timing, tracing
+from common.server import serve_flask, serve_grpc
+from common.account_filter import AccountFilter
+
+# queued (micro-batched) loan decisions, see LoanQueue
+queue_enabled = os.getenv("LOAN_QUEUE_ENABLED", "false").lower() == "true"
+queue_size = int(os.getenv("LOAN_QUEUE_SIZE", "1000"))
+queue_workers = int(os.getenv("LOAN_QUEUE_WORKERS", "2"))
+queue_batch_size = int(os.getenv("LOAN_QUEUE_BATCH_SIZE", "50"))
+queue_batch_wait_ms = int(os.getenv("LOAN_QUEUE_BATCH_WAIT_MS", "20"))
+queue_max_tickets = int(os.getenv("LOAN_QUEUE_MAX_TICKETS", "100000"))
+queue_ticket_ttl_s = int(os.getenv("LOAN_QUEUE_TICKET_TTL_S", "86400"))
+
+
+# pool size, compression, write concern, ... are tuned via MONGO_* (see common/mongo.py)
+collection_accounts = mongo.get_collection("accounts", "ledger")
+collection_accounts.ensure_index("account_number")
+collection_loans = mongo.get_collection("loans", "ledger")
+# pre-aggregated portfolio counters, one document per (day, loan_type, status)
+collection_loan_stats = mongo.get_collection("loan_stats", "stats")
+collection_loan_stats.ensure_index(
+    [("day", 1), ("loan_type", 1), ("status", 1)], unique=True
+)
+# serves history lookups and their version token (count + newest _id)
+collection_loans.ensure_index([("email", 1), ("_id", -1)])
+collection_loans.ensure_index("ticket_id", sparse=True)
+# queued applications' tickets, shared by all workers; expire after LOAN_QUEUE_TICKET_TTL_S
+collection_loan_tickets = mongo.get_collection("loan_tickets", "ledger")
+collection_loan_tickets.ensure_index("created", expireAfterSeconds=queue_ticket_ttl_s)
+
+
+def setup():
+    """Process-wide setup of the standalone service; the dashboard does its own."""
+    # LOG_LEVEL, LOG_FORMAT, ... (see common/log.py)
+    log.setup("loan")
+    metrics.setup("loan")
+    tracing.setup("loan")
+    profiling.setup("loan")
+    timing.setup("loan")
+
+    # db_host = os.getenv("DATABASE_HOST", "localhost")
+    if os.getenv("DB_URL") is None:
+        raise Exception("DB_URL environment variable is not set")
+    mongo.configure("loan")
+
+
+LOAN_FAILED = {"status": "Failed", "approved": False, "message": "Loan processing failed."}
+
+
+def _loanDecision(status):
+    approved = status == "Approved"
+    return {"status": status, "approved": approved, "message": "Loan Approved" if approved else "Loan Rejected"}
 
-client = MongoClient(uri)
-db = client["bank"]
-collection_accounts = db["accounts"]
-collection_loans = db["loans"]
 
 class LoanGeneric:
+    def __init__(self, account_filter):
+        # Bloom filter of known account numbers: rejects unknown numbers without a lookup
+        self.account_filter = account_filter
+
     def ProcessLoanRequest(self, request_data):
         name = request_data["name"]
         email = request_data["email"]
@@ -57,17 +93,22 @@ class LoanGeneric:
         loan_amount = float(request_data["loan_amount"])
         interest_rate = float(request_data["interest_rate"])
         time_period = request_data["time_period"]
+        if not self.account_filter.might_contain(account_number):
+            return {"approved": False, "message": "Email or Account number not found."}
+
         user_account = self.__getAccount(account_number)
+        if user_account is None:
+            self.account_filter.record_false_positive()
         
         # count = collection_loans.count_documents({"email_id": email, 'account_number': account_number})
         count =  collection_accounts.count_documents({"email_id": email, 'account_number': account_number})
 
-        logging.debug(f"user account only based on account number search : {user_account}")
-        logging.debug(f"Count whther the email and account exist or not : {count}")
+        logging.debug("user account only based on account number search: %s", user_account)
+        logging.debug("Count whether the email and account exist or not: %s", count)
         if count == 0:
             return {"approved": False, "message": "Email or Account number not found."}
         result = self.__approveLoan(user_account, loan_amount)
-        logging.debug(f"Result {result}")
+        logging.debug("Result %s", result)
         message = "Loan Approved" if result else "Loan Rejected"
         
         # insert loan request into db
@@ -88,10 +129,11 @@ class LoanGeneric:
         loan_request["status"] = "Approved" if result else "Declined"
 
         collection_loans.insert_one(loan_request)
+        self.__recordStats([loan_request])
 
         response = {"approved": result, "message": message}
-        logging.debug(f"Account: {account_number}")
-        logging.debug(f"Response: {response}")
+        logging.debug("Account: %s", account_number)
+        logging.debug("Response: %s", response)
         return response
 
     def getLoanHistory(self, request_data):
@@ -113,117 +155,476 @@ class LoanGeneric:
                     "interest_rate": l["interest_rate"],
                     "time_period": l["time_period"],
                     "status": l["status"],
-                    "timestamp": f"{l['timestamp']}",
+                    "timestamp": l["timestamp"],
                 }
             )
 
         return loan_history
 
-    def __getAccount(self, account_num):
-        r = None
-        accounts = collection_accounts.find()
-        for acc in accounts:
-            if acc["account_number"] == account_num:
-                r = acc
-                break
-        # logging.debug(f"Account {r}")
-        return r
-
-    def __approveLoan(self, account, amount):
-        if amount < 1:
-            return False
-
-        account["balance"] += amount
+    def getLoanHistoryVersion(self, request_data):
+        """Cheap version token (ETag) of an email's loan history.
 
-        collection_accounts.update_one(
-            {"account_number": account["account_number"]},
-            {"$set": {"balance": account["balance"]}},
+        Loans are only ever inserted, so the number of loans plus the newest
+        ``_id`` changes whenever the history does. Both come from the
+        ``(email, _id)`` index without touching the documents.
+        """
+        email = request_data["email"]
+        count = collection_loans.count_documents({"email": email})
+        if count == 0:
+            return "0"
+        newest = collection_loans.find_one(
+            {"email": email}, {"_id": 1}, sort=[("_id", -1)]
         )
+        return f"{count}-{newest['_id']}"
+
+    def ProcessLoanBatch(self, batch):
+        """Decide a micro-batch of queued applications.
+
+        ``batch`` is a list of ``(ticket_id, request_data)`` pairs. All accounts
+        are fetched with one ``$in`` query, the loan records are stored with one
+        ``insert_many`` and the approved loans are credited with one
+        ``bulk_write`` (one ``$inc`` per ticket). Returns a dict mapping
+        ticket_id to its decision.
+
+        Outcomes are per ticket: a ticket whose loan record was not stored, or
+        whose credit failed (its record is then removed), is ``Failed`` while
+        the rest of the batch stands. An exception means nothing was written,
+        except when the connection is lost mid-write; ``getLoanDecisions`` then
+        tells which records were stored.
+        """
+        account_numbers = [
+            n for n in {r["account_number"] for _, r in batch} if self.account_filter.might_contain(n)
+        ]
+        accounts = {
+            acc["account_number"]: acc
+            for acc in collection_accounts.find(
+                {"account_number": {"$in": account_numbers}},
+                {"account_number": 1, "email_id": 1},
+            )
+        }
 
-        return True
-
-class LoanService(loan_pb2_grpc.LoanServiceServicer):
-    def __init__(self) -> None:
-        super().__init__()
-        # enable github copiolot
-        self.loan = LoanGeneric()
-
-    def ProcessLoanRequest(self, request, context):
-        name = request.name
-        email = request.email
-        account_type = request.account_type
-        account_number = request.account_number
-        govt_id_type = request.govt_id_type
-        govt_id_number = request.govt_id_number
-        loan_type = request.loan_type
-        loan_amount = float(request.loan_amount)
-        interest_rate = float(request.interest_rate)
-        time_period = request.time_period
-
-        req = {'name': name, 'email': email, 'account_type': account_type, 'account_number': account_number, 'govt_id_type': govt_id_type, 'govt_id_number': govt_id_number, 'loan_type': loan_type, 'loan_amount': loan_amount, 'interest_rate': interest_rate, 'time_period': time_period}
-        resutl = self.loan.ProcessLoanRequest(req)  
-
-        response =  LoanResponse(approved=resutl['approved'],  message=resutl['message'])
-        return response
+        decisions = {}
+        loan_records = []
+        for ticket_id, request_data in batch:
+            account_number = request_data["account_number"]
+            loan_amount = float(request_data["loan_amount"])
+            account = accounts.get(account_number)
+            if account is None or account.get("email_id") != request_data["email"]:
+                decisions[ticket_id] = {
+                    "status": "Declined",
+                    "approved": False,
+                    "message": "Email or Account number not found.",
+                }
+                continue
 
-    def getLoanHistory(self, request, context):
+            result = loan_amount >= 1
+            loan_records.append(
+                {
+                    "name": request_data["name"],
+                    "email": request_data["email"],
+                    "account_type": request_data["account_type"],
+                    "account_number": account_number,
+                    "govt_id_type": request_data["govt_id_type"],
+                    "govt_id_number": request_data["govt_id_number"],
+                    "loan_type": request_data["loan_type"],
+                    "loan_amount": loan_amount,
+                    "interest_rate": float(request_data["interest_rate"]),
+                    "time_period": request_data["time_period"],
+                    "status": "Approved" if result else "Declined",
+                    "timestamp": datetime.datetime.now(),
+                    "ticket_id": ticket_id,
+                }
+            )
+            decisions[ticket_id] = {
+                "status": "Approved" if result else "Declined",
+                "approved": result,
+                "message": "Loan Approved" if result else "Loan Rejected",
+            }
+
+        stored = self.__storeLoans(loan_records)
+        approved = [r for r in loan_records if r["status"] == "Approved" and r["ticket_id"] in stored]
+        credited = self.__creditLoans(approved)
+        uncredited = [r["ticket_id"] for r in approved if r["ticket_id"] not in credited]
+        if uncredited:
+            collection_loans.delete_many({"ticket_id": {"$in": uncredited}})
+        failed = {r["ticket_id"] for r in loan_records if r["ticket_id"] not in stored}.union(uncredited)
+        for ticket_id in failed:
+            decisions[ticket_id] = dict(LOAN_FAILED)
+        kept = [r for r in loan_records if r["ticket_id"] not in failed]
+        if kept:
+            self.__recordStats(kept)
+
+        logging.debug(
+            "Loan batch decided: %s applications, %s credited, %s failed", len(batch), len(credited), len(failed)
+        )
+        return decisions
+
+    def __storeLoans(self, loan_records):
+        """Ticket ids of the loan records stored."""
+        if not loan_records:
+            return set()
+        ticket_ids = {r["ticket_id"] for r in loan_records}
+        try:
+            collection_loans.insert_many(loan_records, ordered=False)
+        except BulkWriteError as e:
+            logging.error("Loan batch: %s loan records not stored", len(e.details["writeErrors"]))
+            return ticket_ids - {loan_records[err["index"]]["ticket_id"] for err in e.details["writeErrors"]}
+        return ticket_ids
+
+    def __creditLoans(self, loan_records):
+        """Ticket ids of the approved loans credited to their account."""
+        if not loan_records:
+            return set()
+        try:
+            collection_accounts.bulk_write(
+                [
+                    UpdateOne({"account_number": r["account_number"]}, {"$inc": {"balance": r["loan_amount"]}})
+                    for r in loan_records
+                ],
+                ordered=False,
+            )
+        except BulkWriteError as e:
+            logging.error("Loan batch: %s credits not applied", len(e.details["writeErrors"]))
+            failed = {loan_records[err["index"]]["ticket_id"] for err in e.details["writeErrors"]}
+            return {r["ticket_id"] for r in loan_records} - failed
+        return {r["ticket_id"] for r in loan_records}
+
+    def getLoanDecisions(self, ticket_ids):
+        """Decisions of the tickets whose loan record is stored."""
+        return {
+            loan["ticket_id"]: _loanDecision(loan["status"])
+            for loan in collection_loans.find(
+                {"ticket_id": {"$in": list(ticket_ids)}}, {"ticket_id": 1, "status": 1, "_id": 0}
+            )
+        }
 
-        email = request.email
-        req = {'email': email}
-        loan_history = []
+    def recordLoanTicket(self, ticket_id, decision):
+        collection_loan_tickets.insert_one(dict(decision, _id=ticket_id, created=datetime.datetime.now()))
 
-        loans = self.loan.getLoanHistory(req)
+    def dropLoanTicket(self, ticket_id):
+        collection_loan_tickets.delete_one({"_id": ticket_id})
 
-        for l in loans:
-            loan_history.append(Loan(name=l['name'], email=l['email'], account_type=l['account_type'], account_number=l['account_number'], govt_id_type=l['govt_id_type'], govt_id_number=l['govt_id_number'], loan_type=l['loan_type'], loan_amount=l['loan_amount'], interest_rate=l['interest_rate'], time_period=l['time_period'], status=l['status'], timestamp=f"{l['timestamp']}"))
-        
-        return LoansHistoryResponse(loans=loan_history)
+    def recordLoanTicketDecisions(self, decisions):
+        collection_loan_tickets.bulk_write(
+            [UpdateOne({"_id": ticket_id}, {"$set": decision}) for ticket_id, decision in decisions.items()],
+            ordered=False,
+        )
 
+    def getLoanStatus(self, ticket_id):
+        ticket = collection_loan_tickets.find_one(
+            {"_id": ticket_id}, {"status": 1, "approved": 1, "message": 1, "_id": 0}
+        )
+        if ticket is not None:
+            return ticket
+        # tickets expired from loan_tickets
+        loan = collection_loans.find_one(
+            {"ticket_id": ticket_id}, {"status": 1, "_id": 0}
+        )
+        if loan is None:
+            return None
+        return _loanDecision(loan["status"])
+
+    def getLoanPortfolioStats(self, request_data):
+        query = {}
+        if request_data.get("from_day") or request_data.get("to_day"):
+            query["day"] = {}
+            if request_data.get("from_day"):
+                query["day"]["$gte"] = request_data["from_day"]
+            if request_data.get("to_day"):
+                query["day"]["$lte"] = request_data["to_day"]
+        for key in ("loan_type", "status"):
+            if request_data.get(key):
+                query[key] = request_data[key]
+
+        buckets = []
+        by_loan_type = {}
+        by_status = {}
+        total_count = 0
+        total_amount = 0.0
+        for b in collection_loan_stats.find(query, {"_id": 0}).sort("day", 1):
+            bucket = {
+                "day": b["day"],
+                "loan_type": b["loan_type"],
+                "status": b["status"],
+                "count": b["count"],
+                "total_amount": b["total_amount"],
+            }
+            buckets.append(bucket)
+            total_count += bucket["count"]
+            total_amount += bucket["total_amount"]
+            for totals, key in ((by_loan_type, bucket["loan_type"]), (by_status, bucket["status"])):
+                t = totals.setdefault(key, {"count": 0, "total_amount": 0.0})
+                t["count"] += bucket["count"]
+                t["total_amount"] += bucket["total_amount"]
+
+        return {
+            "buckets": buckets,
+            "total_count": total_count,
+            "total_amount": total_amount,
+            "by_loan_type": by_loan_type,
+            "by_status": by_status,
+        }
 
+    def rebuildLoanStats(self, before=None):
+        """Recompute the ``loan_stats`` buckets of the days before ``before``
+        (default: today) from the ``loans`` collection.
+
+        Used to backfill counters for loans written before the counters existed
+        (or by another writer). New loans only increment today's buckets, so
+        replacing earlier days' buckets one by one never loses a concurrent
+        increment; today's buckets are left to the live counters.
+        """
+        if before is None:
+            before = datetime.datetime.combine(datetime.date.today(), datetime.time())
+        buckets = collection_loans.aggregate(
+            [
+                {"$match": {"timestamp": {"$lt": before}}},
+                {
+                    "$group": {
+                        "_id": {
+                            "day": {"$dateToString": {"format": "%Y-%m-%d", "date": "$timestamp"}},
+                            "loan_type": "$loan_type",
+                            "status": "$status",
+                        },
+                        "count": {"$sum": 1},
+                        "total_amount": {"$sum": "$loan_amount"},
+                    }
+                },
+                {
+                    "$project": {
+                        "_id": 0,
+                        "day": "$_id.day",
+                        "loan_type": "$_id.loan_type",
+                        "status": "$_id.status",
+                        "count": 1,
+                        "total_amount": 1,
+                    }
+                },
+            ]
+        )
+        replacements = [
+            ReplaceOne({"day": b["day"], "loan_type": b["loan_type"], "status": b["status"]}, b, upsert=True)
+            for b in buckets
+        ]
+        if replacements:
+            collection_loan_stats.bulk_write(replacements, ordered=False)
+        logging.info("Loan stats rebuilt before %s: %s buckets", before.date(), len(replacements))
+        return len(replacements)
+
+    def __recordStats(self, loan_records):
+        increments = {}
+        for l in loan_records:
+            key = (l["timestamp"].strftime("%Y-%m-%d"), l["loan_type"], l["status"])
+            count, amount = increments.get(key, (0, 0.0))
+            increments[key] = (count + 1, amount + l["loan_amount"])
+
+        # the loans are stored and credited already: a lost increment must not
+        # fail them (rebuild-stats repairs past days)
+        try:
+            collection_loan_stats.bulk_write(
+                [
+                    UpdateOne(
+                        {"day": day, "loan_type": loan_type, "status": status},
+                        {"$inc": {"count": count, "total_amount": amount}},
+                        upsert=True,
+                    )
+                    for (day, loan_type, status), (count, amount) in increments.items()
+                ],
+                ordered=False,
+            )
+        except PyMongoError:
+            logging.exception("Loan stats not recorded for %s loans", len(loan_records))
 
+    def __getAccount(self, account_num):
+        return collection_accounts.find_one({"account_number": account_num})
 
-app = Flask(__name__)
-loan_generic = LoanGeneric()
-@app.route("/loan/request", methods=["POST"])
-def process_loan_request():
-    request_data = request.json
-    logging.debug(f"Request: {request_data}")
-    response = loan_generic.ProcessLoanRequest(request_data)
-    return jsonify(response)
+    def __approveLoan(self, account, amount):
+        if amount < 1:
+            return False
 
+        account["balance"] += amount
 
-@app.route("/loan/history", methods=["POST"])
-def get_loan_history():
-    logging.debug("----------------> Request: /loan/history")
-    d = request.json
-    logging.debug(f"Request: {d}")
-    response = loan_generic.getLoanHistory({"email": d['email']})
-    return jsonify(response)
+        collection_accounts.update_one(
+            {"account_number": account["account_number"]},
+            {"$set": {"balance": account["balance"]}},
+        )
 
+        return True
 
+class LoanQueue:
+    """Bounded queue of loan applications decided in micro-batches.
+
+    ``submit`` acknowledges an application with a ticket id right away; a pool
+    of worker threads drains the queue in batches of up to ``batch_size``
+    applications (waiting at most ``batch_wait_ms`` to fill a batch) and hands
+    them to ``LoanGeneric.ProcessLoanBatch``.
+
+    Tickets are stored in the ``loan_tickets`` collection, ``Queued`` before
+    the application is enqueued and then with its decision, so any worker
+    process can answer ``status``. The most recent ``max_tickets`` are also
+    kept in memory by the process that queued them.
+    """
+
+    def __init__(self, loan, maxsize, workers, batch_size, batch_wait_ms, max_tickets):
+        self.loan = loan
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.workers = workers
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait_ms / 1000.0
+        self.max_tickets = max_tickets
+        self.tickets = OrderedDict()
+        self.lock = threading.Lock()
+        self.threads = []
+
+    def start(self):
+        with self.lock:
+            if self.threads:
+                return
+            for i in range(self.workers):
+                t = threading.Thread(
+                    target=self.__worker, name=f"loan-queue-{i}", daemon=True
+                )
+                t.start()
+                self.threads.append(t)
+        logging.debug("Loan queue started with %s workers", self.workers)
+
+    def submit(self, request_data):
+        self.start()
+        rejected = {"accepted": False, "ticket_id": "", "message": "Loan queue is full, retry later."}
+        if self.queue.full():
+            return rejected
+        ticket_id = uuid.uuid4().hex
+        # recorded before it is enqueued: a worker may decide it right away
+        queued = {"status": "Queued", "approved": False, "message": "Loan application queued."}
+        self.loan.recordLoanTicket(ticket_id, queued)
+        self.__record(ticket_id, queued)
+        try:
+            self.queue.put_nowait((ticket_id, request_data))
+        except queue.Full:
+            self.__forget(ticket_id)
+            self.loan.dropLoanTicket(ticket_id)
+            return rejected
+        return {"accepted": True, "ticket_id": ticket_id, "message": "Loan application queued."}
+
+    def status(self, ticket_id):
+        with self.lock:
+            decision = self.tickets.get(ticket_id)
+        if decision is None:
+            metrics.cache_miss("loan_tickets")
+            decision = self.loan.getLoanStatus(ticket_id)
+        else:
+            metrics.cache_hit("loan_tickets")
+        if decision is None:
+            decision = {"status": "Unknown", "approved": False, "message": "Ticket not found."}
+        return dict(decision, ticket_id=ticket_id)
+
+    def __record(self, ticket_id, decision):
+        with self.lock:
+            self.tickets[ticket_id] = decision
+            self.tickets.move_to_end(ticket_id)
+            while len(self.tickets) > self.max_tickets:
+                self.tickets.popitem(last=False)
+
+    def __forget(self, ticket_id):
+        with self.lock:
+            self.tickets.pop(ticket_id, None)
+
+    def __nextBatch(self):
+        batch = [self.queue.get()]
+        deadline = time.monotonic() + self.batch_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def __worker(self):
+        while True:
+            batch = self.__nextBatch()
+            try:
+                decisions = self.loan.ProcessLoanBatch(batch)
+            except Exception:
+                logging.exception("Loan batch failed")
+                decisions = self.__failedBatch(batch)
+            try:
+                self.loan.recordLoanTicketDecisions(decisions)
+            except Exception:
+                logging.exception("Loan decisions of %s tickets not stored", len(decisions))
+            for ticket_id, decision in decisions.items():
+                self.__record(ticket_id, decision)
+            for _ in batch:
+                self.queue.task_done()
+
+    def __failedBatch(self, batch):
+        """Decisions after ``ProcessLoanBatch`` raised: the stored loan records
+        stand, the other tickets failed."""
+        ticket_ids = [ticket_id for ticket_id, _ in batch]
+        try:
+            stored = self.loan.getLoanDecisions(ticket_ids)
+        except Exception:
+            logging.exception("Loan records of a failed batch not found, tickets: %s", ticket_ids)
+            stored = {}
+        return {ticket_id: stored.get(ticket_id, dict(LOAN_FAILED)) for ticket_id in ticket_ids}
+
+
+def create_loan_queue(loan_generic):
+    """The ``LOAN_QUEUE_*`` configured queue; its workers start on the first submission."""
+    return LoanQueue(
+        loan_generic,
+        maxsize=queue_size,
+        workers=queue_workers,
+        batch_size=queue_batch_size,
+        batch_wait_ms=queue_batch_wait_ms,
+        max_tickets=queue_max_tickets,
+    )
+
+
+def create_app(account_filter):
+    """The HTTP service (see ``loan_http.py``)."""
+    import loan_http
+
+    loan_generic = LoanGeneric(account_filter)
+    return loan_http.create_app(loan_generic, create_loan_queue(loan_generic), queue_enabled, account_filter)
 
 
 def serverGRPC(port):
-    logging.debug(f"Starting GRPC server on port {port}")
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
-    loan_pb2_grpc.add_LoanServiceServicer_to_server(LoanService(), server)
-    server.add_insecure_port(f"[::]:{port}")
-    server.start()
-    server.wait_for_termination()
+    logging.debug("Starting GRPC server on port %s", port)
+    # imported here: the HTTP service never loads grpc or the generated code
+    import loan_grpc
+    from protobufs import loan_pb2_grpc
+
+    account_filter = AccountFilter.from_env(collection_accounts)
+    account_filter.start()
+    loan_generic = LoanGeneric(account_filter)
+    serve_grpc(
+        loan_grpc.LoanService(loan_generic, create_loan_queue(loan_generic), queue_enabled),
+        loan_pb2_grpc.add_LoanServiceServicer_to_server,
+        port,
+    )
 
 def serverFlask(port):
-    logging.debug(f"Starting Flask server on port {port}")
-    app.run(host='0.0.0.0' ,port=port, debug=True)
+    logging.debug("Starting Flask server on port %s", port)
+    account_filter = AccountFilter.from_env(collection_accounts)
+    # the filter is built in each worker, after the fork
+    serve_flask(create_app(account_filter), port, on_worker_start=account_filter.ensure_started)
 
 
 if __name__ == "__main__":
+    setup()
     port =  50053
 
+    # backfill job: python loan.py rebuild-stats
+    if len(sys.argv) > 1 and sys.argv[1] == "rebuild-stats":
+        LoanGeneric(AccountFilter.from_env(collection_accounts)).rebuildLoanStats()
+        sys.exit(0)
+
+    protocol = os.getenv('SERVICE_PROTOCOL', 'http').lower()
+    logging.debug("microservice protocol: %s", protocol)
     if protocol == "grpc":
         serverGRPC(port)
     else:
         serverFlask(port)
-
-
-
-
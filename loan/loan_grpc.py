@@ -0,0 +1,84 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""gRPC API of the loan service (``SERVICE_PROTOCOL=grpc``)."""
+
+import grpc
+
+from protobufs.loan_pb2 import (
+    LoanResponse,
+    LoansHistoryResponse,
+    LoanStatsResponse,
+    LoanStatus,
+    LoanTicket,
+)
+from protobufs import loan_pb2_grpc
+
+from common import metrics, proto
+
+
+class LoanService(loan_pb2_grpc.LoanServiceServicer):
+    def __init__(self, loan_generic, loan_queue, queue_enabled) -> None:
+        super().__init__()
+        # enable github copiolot
+        self.loan = loan_generic
+        self.loan_queue = loan_queue
+        self.queue_enabled = queue_enabled
+
+    def ProcessLoanRequest(self, request, context):
+        name = request.name
+        email = request.email
+        account_type = request.account_type
+        account_number = request.account_number
+        govt_id_type = request.govt_id_type
+        govt_id_number = request.govt_id_number
+        loan_type = request.loan_type
+        loan_amount = float(request.loan_amount)
+        interest_rate = float(request.interest_rate)
+        time_period = request.time_period
+
+        req = {'name': name, 'email': email, 'account_type': account_type, 'account_number': account_number, 'govt_id_type': govt_id_type, 'govt_id_number': govt_id_number, 'loan_type': loan_type, 'loan_amount': loan_amount, 'interest_rate': interest_rate, 'time_period': time_period}
+        resutl = self.loan.ProcessLoanRequest(req)  
+
+        response =  LoanResponse(approved=resutl['approved'],  message=resutl['message'])
+        return response
+
+    def getLoanHistory(self, request, context):
+
+        email = request.email
+        req = {'email': email}
+
+        # conditional request: the dashboard forwards If-None-Match as metadata
+        version = self.loan.getLoanHistoryVersion(req)
+        if_none_match = dict(context.invocation_metadata()).get('if-none-match')
+        if if_none_match == version:
+            metrics.cache_hit('etag')
+            context.set_trailing_metadata((('etag', version), ('not-modified', '1')))
+            return LoansHistoryResponse()
+        if if_none_match:
+            metrics.cache_miss('etag')
+        context.set_trailing_metadata((('etag', version),))
+
+        loans = self.loan.getLoanHistory(req)
+        return proto.from_dict(LoansHistoryResponse, {'loans': loans})
+
+    def SubmitLoanRequest(self, request, context):
+        if not self.queue_enabled:
+            context.abort(grpc.StatusCode.UNIMPLEMENTED, "Loan queue is disabled (LOAN_QUEUE_ENABLED)")
+
+        req = {'name': request.name, 'email': request.email, 'account_type': request.account_type, 'account_number': request.account_number, 'govt_id_type': request.govt_id_type, 'govt_id_number': request.govt_id_number, 'loan_type': request.loan_type, 'loan_amount': float(request.loan_amount), 'interest_rate': float(request.interest_rate), 'time_period': request.time_period}
+        ticket = self.loan_queue.submit(req)
+        if not ticket['accepted']:
+            context.set_code(grpc.StatusCode.RESOURCE_EXHAUSTED)
+            context.set_details(ticket['message'])
+        return LoanTicket(accepted=ticket['accepted'], ticket_id=ticket['ticket_id'], message=ticket['message'])
+
+    def getLoanStatus(self, request, context):
+        status = self.loan_queue.status(request.ticket_id)
+        return LoanStatus(ticket_id=status['ticket_id'], status=status['status'], approved=status['approved'], message=status['message'])
+
+    def getLoanPortfolioStats(self, request, context):
+        req = {'from_day': request.from_day, 'to_day': request.to_day, 'loan_type': request.loan_type, 'status': request.status}
+        stats = self.loan.getLoanPortfolioStats(req)
+        return proto.from_dict(LoanStatsResponse, stats)
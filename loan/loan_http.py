@@ -0,0 +1,76 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""HTTP API of the loan service (``SERVICE_PROTOCOL=http``)."""
+
+import logging
+
+from flask import Flask, request, jsonify
+
+from common import compression, metrics, mongo, profiling, timing, tracing
+
+
+def create_app(loan_generic, loan_queue, queue_enabled, account_filter):
+    app = Flask(__name__)
+    metrics.instrument_flask(app)
+    tracing.instrument_flask(app)
+    profiling.instrument_flask(app)
+    timing.instrument_flask(app)
+    compression.instrument_flask(app)
+
+    def not_modified(version):
+        response = app.make_response(("", 304))
+        response.set_etag(version)
+        return response
+
+    @app.route("/loan/request", methods=["POST"])
+    def process_loan_request():
+        request_data = request.json
+        logging.debug("Request: %s", request_data)
+        response = loan_generic.ProcessLoanRequest(request_data)
+        return jsonify(response)
+
+    @app.route("/loan/history", methods=["POST"])
+    def get_loan_history():
+        d = request.json
+        logging.debug("Request: %s", d)
+        version = loan_generic.getLoanHistoryVersion({"email": d['email']})
+        if request.if_none_match.contains(version):
+            return not_modified(version)
+        response = jsonify(loan_generic.getLoanHistory({"email": d['email']}))
+        response.set_etag(version)
+        return response
+
+    @app.route("/loan/queue", methods=["POST"])
+    def submit_loan_request():
+        if not queue_enabled:
+            return jsonify({"accepted": False, "ticket_id": "", "message": "Loan queue is disabled."}), 404
+        request_data = request.json
+        ticket = loan_queue.submit(request_data)
+        return jsonify(ticket), (202 if ticket["accepted"] else 503)
+
+    @app.route("/loan/status/<string:ticket_id>", methods=["GET"])
+    def get_loan_status(ticket_id):
+        status = loan_queue.status(ticket_id)
+        return jsonify(status), (404 if status["status"] == "Unknown" else 200)
+
+    @app.route("/loan/mongo-pool", methods=["GET"])
+    def get_mongo_pool_stats():
+        return jsonify(mongo.pool_stats())
+
+    @app.route("/loan/mongo-queries", methods=["GET"])
+    def get_mongo_query_stats():
+        return jsonify(mongo.query_stats())
+
+    @app.route("/loan/account-filter", methods=["GET"])
+    def get_account_filter_stats():
+        return jsonify(account_filter.stats())
+
+    @app.route("/loan/stats", methods=["GET", "POST"])
+    def get_loan_portfolio_stats():
+        d = request.get_json(silent=True) or request.args
+        response = loan_generic.getLoanPortfolioStats(d)
+        return jsonify(response)
+
+    return app
@@ -0,0 +1,42 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+import pytest
+
+import loan
+import loan_http
+from common.account_filter import AccountFilter
+from test_loan_queue import application, loan_queue
+
+
+@pytest.fixture
+def client(database):
+    database.accounts.insert_one({"account_number": "A1", "email_id": "a@example.com", "balance": 10.0})
+    loan_generic = loan.LoanGeneric(AccountFilter(loan.collection_accounts, enabled=False))
+    return loan_http.create_app(loan_generic, loan_queue(loan_generic), False, loan_generic.account_filter).test_client()
+
+
+def history(client, etag=None):
+    headers = {"If-None-Match": etag} if etag else {}
+    return client.post("/loan/history", json={"email": "a@example.com"}, headers=headers)
+
+
+def test_unchanged_history_is_not_modified(client):
+    client.post("/loan/request", json=application())
+    first = history(client)
+    response = history(client, etag=first.headers["ETag"])
+
+    assert first.status_code == 200 and len(first.json) == 1
+    assert response.status_code == 304
+    assert response.headers["ETag"] == first.headers["ETag"]
+
+
+def test_new_loan_changes_the_etag(client):
+    etag = history(client).headers["ETag"]
+    client.post("/loan/request", json=application())
+    response = history(client, etag=etag)
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert len(response.json) == 1
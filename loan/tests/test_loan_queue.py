@@ -0,0 +1,136 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+import pytest
+
+import loan
+import loan_http
+from common.account_filter import AccountFilter
+
+
+def application(account_number="A1", email="a@example.com", amount=100):
+    return {
+        "name": "Alice",
+        "email": email,
+        "account_type": "Checking",
+        "account_number": account_number,
+        "govt_id_type": "Passport",
+        "govt_id_number": "P1",
+        "loan_type": "Personal",
+        "loan_amount": amount,
+        "interest_rate": 5,
+        "time_period": "12",
+    }
+
+
+@pytest.fixture
+def loan_generic(database):
+    database.accounts.insert_one({"account_number": "A1", "email_id": "a@example.com", "balance": 10.0})
+    return loan.LoanGeneric(AccountFilter(loan.collection_accounts, enabled=False))
+
+
+def loan_queue(loan_generic, maxsize=10, workers=1):
+    return loan.LoanQueue(loan_generic, maxsize=maxsize, workers=workers, batch_size=10, batch_wait_ms=1, max_tickets=10)
+
+
+def test_ticket_is_decided_and_credited(loan_generic, database):
+    queue = loan_queue(loan_generic)
+    approved = queue.submit(application())
+    declined = queue.submit(application(email="b@example.com"))
+    queue.queue.join()
+
+    assert approved["accepted"] and declined["accepted"]
+    assert queue.status(approved["ticket_id"]) == {
+        "status": "Approved", "approved": True, "message": "Loan Approved", "ticket_id": approved["ticket_id"],
+    }
+    assert queue.status(declined["ticket_id"])["status"] == "Declined"
+    assert database.accounts.find_one({"account_number": "A1"})["balance"] == 110.0
+    assert database.loans.count_documents({"ticket_id": approved["ticket_id"]}) == 1
+
+
+def test_ticket_is_queued_until_decided(loan_generic, database):
+    queue = loan_queue(loan_generic, workers=0)
+    ticket = queue.submit(application())
+
+    assert queue.status(ticket["ticket_id"])["status"] == "Queued"
+    assert database.loan_tickets.find_one({"_id": ticket["ticket_id"]})["status"] == "Queued"
+
+
+def test_status_is_shared_across_workers(loan_generic):
+    queue = loan_queue(loan_generic)
+    ticket = queue.submit(application())
+    queue.queue.join()
+
+    # another worker process has no in-memory ticket
+    other = loan_queue(loan_generic)
+    assert other.status(ticket["ticket_id"])["status"] == "Approved"
+
+
+def test_status_of_expired_ticket_comes_from_the_loan(loan_generic, database):
+    queue = loan_queue(loan_generic)
+    ticket = queue.submit(application())
+    queue.queue.join()
+    database.loan_tickets.delete_many({})
+
+    assert loan_queue(loan_generic).status(ticket["ticket_id"])["status"] == "Approved"
+
+
+def test_unknown_ticket(loan_generic):
+    assert loan_queue(loan_generic).status("nope") == {
+        "status": "Unknown", "approved": False, "message": "Ticket not found.", "ticket_id": "nope",
+    }
+
+
+def test_full_queue_rejects_without_a_ticket(loan_generic, database):
+    queue = loan_queue(loan_generic, maxsize=1, workers=0)
+    queue.submit(application())
+    rejected = queue.submit(application())
+
+    assert rejected == {"accepted": False, "ticket_id": "", "message": "Loan queue is full, retry later."}
+    assert database.loan_tickets.count_documents({}) == 1
+
+
+def test_failed_batch_keeps_the_stored_loans(loan_generic, database, monkeypatch):
+    queue = loan_queue(loan_generic, workers=0)
+    stored = queue.submit(application())
+    lost = queue.submit(application())
+
+    def process(batch):
+        # the connection dropped after the first loan record was written
+        loan.collection_loans.insert_one({"ticket_id": stored["ticket_id"], "status": "Approved"})
+        raise ConnectionError("lost")
+
+    monkeypatch.setattr(loan_generic, "ProcessLoanBatch", process)
+    queue.workers = 1
+    queue.start()
+    queue.queue.join()
+
+    assert queue.status(stored["ticket_id"])["status"] == "Approved"
+    assert queue.status(lost["ticket_id"]) == dict(loan.LOAN_FAILED, ticket_id=lost["ticket_id"])
+    assert database.loan_tickets.find_one({"_id": lost["ticket_id"]})["status"] == "Failed"
+
+
+def test_unknown_account_is_declined(loan_generic):
+    decisions = loan_generic.ProcessLoanBatch([("t1", application(account_number="A2"))])
+
+    assert decisions["t1"]["status"] == "Declined"
+    assert decisions["t1"]["message"] == "Email or Account number not found."
+
+
+def test_http_queue_and_status(loan_generic):
+    queue = loan_queue(loan_generic)
+    client = loan_http.create_app(loan_generic, queue, True, loan_generic.account_filter).test_client()
+
+    response = client.post("/loan/queue", json=application())
+    assert response.status_code == 202
+    queue.queue.join()
+    status = client.get(f"/loan/status/{response.json['ticket_id']}")
+    assert status.status_code == 200 and status.json["status"] == "Approved"
+    assert client.get("/loan/status/nope").status_code == 404
+
+
+def test_http_queue_disabled(loan_generic):
+    client = loan_http.create_app(loan_generic, loan_queue(loan_generic), False, loan_generic.account_filter).test_client()
+
+    assert client.post("/loan/queue", json=application()).status_code == 404
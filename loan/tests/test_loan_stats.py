@@ -0,0 +1,101 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+import datetime
+
+import pytest
+from pymongo.errors import PyMongoError
+
+import loan
+from common.account_filter import AccountFilter
+from test_loan_queue import application
+
+TODAY = datetime.date.today().strftime("%Y-%m-%d")
+
+
+@pytest.fixture
+def loan_generic(database):
+    database.accounts.insert_one({"account_number": "A1", "email_id": "a@example.com", "balance": 10.0})
+    return loan.LoanGeneric(AccountFilter(loan.collection_accounts, enabled=False))
+
+
+def loan_record(day, status="Approved", loan_type="Personal", amount=100.0):
+    return {
+        "email": "a@example.com",
+        "loan_type": loan_type,
+        "loan_amount": amount,
+        "status": status,
+        "timestamp": datetime.datetime.fromisoformat(day).replace(hour=12),
+    }
+
+
+def test_loans_increment_todays_buckets(loan_generic):
+    loan_generic.ProcessLoanRequest(application(amount=100))
+    loan_generic.ProcessLoanRequest(application(amount=0))
+    loan_generic.ProcessLoanBatch([("t1", application(amount=50)), ("t2", application(amount=25))])
+
+    stats = loan_generic.getLoanPortfolioStats({})
+    assert stats["buckets"] == [
+        {"day": TODAY, "loan_type": "Personal", "status": "Approved", "count": 3, "total_amount": 175.0},
+        {"day": TODAY, "loan_type": "Personal", "status": "Declined", "count": 1, "total_amount": 0.0},
+    ]
+    assert stats["total_count"] == 4
+    assert stats["by_status"]["Approved"] == {"count": 3, "total_amount": 175.0}
+
+
+def test_stats_filters(loan_generic, database):
+    database.loan_stats.insert_many([
+        {"day": "2024-01-01", "loan_type": "Personal", "status": "Approved", "count": 1, "total_amount": 10.0},
+        {"day": "2024-01-02", "loan_type": "Home", "status": "Approved", "count": 2, "total_amount": 20.0},
+        {"day": "2024-01-03", "loan_type": "Home", "status": "Declined", "count": 4, "total_amount": 40.0},
+    ])
+
+    stats = loan_generic.getLoanPortfolioStats({"from_day": "2024-01-02", "loan_type": "Home"})
+    assert [b["day"] for b in stats["buckets"]] == ["2024-01-02", "2024-01-03"]
+    assert stats["by_loan_type"] == {"Home": {"count": 6, "total_amount": 60.0}}
+    assert loan_generic.getLoanPortfolioStats({"to_day": "2024-01-01"})["total_count"] == 1
+
+
+def test_rebuild_replaces_past_days_only(loan_generic, database):
+    database.loans.insert_many([
+        loan_record("2024-01-01"),
+        loan_record("2024-01-01", amount=50.0),
+        loan_record("2024-01-02", status="Declined"),
+    ])
+    database.loan_stats.insert_many([
+        # stale counter of a past day, and today's live counter
+        {"day": "2024-01-01", "loan_type": "Personal", "status": "Approved", "count": 7, "total_amount": 1.0},
+        {"day": TODAY, "loan_type": "Personal", "status": "Approved", "count": 5, "total_amount": 500.0},
+    ])
+
+    assert loan_generic.rebuildLoanStats() == 2
+
+    buckets = {(b["day"], b["status"]): (b["count"], b["total_amount"]) for b in loan_generic.getLoanPortfolioStats({})["buckets"]}
+    assert buckets == {
+        ("2024-01-01", "Approved"): (2, 150.0),
+        ("2024-01-02", "Declined"): (1, 100.0),
+        (TODAY, "Approved"): (5, 500.0),
+    }
+
+
+def test_rebuild_before(loan_generic, database):
+    database.loans.insert_many([loan_record("2024-01-01"), loan_record("2024-01-02")])
+
+    assert loan_generic.rebuildLoanStats(before=datetime.datetime(2024, 1, 2)) == 1
+    assert [b["day"] for b in loan_generic.getLoanPortfolioStats({})["buckets"]] == ["2024-01-01"]
+
+
+class BrokenStats:
+    def bulk_write(self, *args, **kwargs):
+        raise PyMongoError("stats unavailable")
+
+
+def test_failed_stats_update_keeps_the_loan(loan_generic, database, monkeypatch):
+    monkeypatch.setattr(loan, "collection_loan_stats", BrokenStats())
+
+    assert loan_generic.ProcessLoanRequest(application())["approved"] is True
+    decisions = loan_generic.ProcessLoanBatch([("t1", application())])
+    assert decisions["t1"]["status"] == "Approved"
+    assert database.loans.count_documents({"status": "Approved"}) == 2
+    assert database.accounts.find_one({"account_number": "A1"})["balance"] == 210.0
@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+"""
+Martian Bank - JSON Codec Benchmark
+===================================
+Measures the CPU time spent turning a transaction history into the
+dashboard's ``{"response": [...]}`` body (the transactions service's
+/transaction-history route, then the dashboard relaying it), comparing:
+
+  before  rows formatted with f-strings/str(), Flask's default jsonify,
+          dashboard response.json() + json.dumps({"response": ...})
+  after   raw rows through common.codec (orjson when installed),
+          dashboard splicing the downstream bytes into the envelope
+
+Both run inside a Flask app context so jsonify goes through the app's JSON
+provider, as in the services.
+
+Usage:
+    python codec_benchmark.py --rows 1000 --requests 200
+"""
+
+import argparse
+import datetime
+import json
+import os
+import sys
+import time
+
+from bson.objectid import ObjectId
+from flask import Flask, jsonify
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common import codec, flask_json  # noqa: E402
+
+
+def documents(rows):
+    now = datetime.datetime.now()
+    return [
+        {
+            "_id": ObjectId(),
+            "sender": "IBAN1234567890",
+            "receiver": "IBAN0987654321",
+            "amount": 12.5 + i,
+            "reason": "Benchmark transfer",
+            "time_stamp": now - datetime.timedelta(minutes=i),
+        }
+        for i in range(rows)
+    ]
+
+
+def request_before(docs):
+    rows = [
+        {
+            "account_number": t["receiver"],
+            "amount": t["amount"],
+            "reason": t["reason"],
+            "time_stamp": f"{t['time_stamp']}",
+            "type": "credit",
+            "transaction_id": str(t["_id"]),
+        }
+        for t in docs
+    ]
+    body = jsonify(rows).get_data()
+    return json.dumps({"response": json.loads(body)})
+
+
+def request_after(docs):
+    rows = [
+        {
+            "account_number": t["receiver"],
+            "amount": t["amount"],
+            "reason": t["reason"],
+            "time_stamp": t["time_stamp"],
+            "type": "credit",
+            "transaction_id": t["_id"],
+        }
+        for t in docs
+    ]
+    body = jsonify(rows).get_data()
+    return b'{"response":' + body + b"}"
+
+
+def measure(app, handle, docs, requests):
+    with app.app_context():
+        for _ in range(min(20, requests)):
+            handle(docs)
+        start = time.thread_time()
+        for _ in range(requests):
+            handle(docs)
+        return (time.thread_time() - start) / requests * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure history encoding CPU time")
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    docs = documents(args.rows)
+    before_app = Flask("before")
+    after_app = Flask("after")
+    after_app.json = flask_json.JSONProvider(after_app)
+
+    before = measure(before_app, request_before, docs, args.requests)
+    after = measure(after_app, request_after, docs, args.requests)
+    print(f"{args.rows} rows, codec backend {codec.BACKEND}")
+    print(f"before: {before:8.3f} ms of CPU per history")
+    print(f" after: {after:8.3f} ms of CPU per history  ({before / after:.1f}x less)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+"""
+Martian Bank - Locust Run Comparison
+====================================
+Compares two Locust ``--csv`` runs (``<name>_stats.csv``) endpoint by endpoint:
+requests/sec, median, p95, p99 and failure rate, with the relative change of
+the second run against the first. Used to compare server configurations, e.g.
+the Werkzeug development server (``WEB_SERVER=werkzeug``) against gunicorn.
+The ``<name>_server_timing.csv`` files written by comprehensive_system_test.py
+compare the same way, phase by phase.
+
+Usage:
+    python compare_runs.py results/werkzeug_stats.csv results/gunicorn_stats.csv
+    python compare_runs.py results/werkzeug_server_timing.csv results/gunicorn_server_timing.csv
+"""
+
+import argparse
+import csv
+
+COLUMNS = [
+    ("Requests/s", "rps"),
+    ("50%", "p50"),
+    ("95%", "p95"),
+    ("99%", "p99"),
+]
+
+
+def load(path):
+    rows = {}
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            count = int(row["Request Count"] or 0)
+            failures = int(row["Failure Count"] or 0)
+            stats = {label: float(row[column] or 0) for column, label in COLUMNS}
+            stats["fail%"] = failures / count * 100 if count else 0.0
+            rows[row["Name"]] = stats
+    return rows
+
+
+def change(before, after):
+    if not before:
+        return ""
+    return f"{(after - before) / before * 100:+.0f}%"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two Locust CSV runs")
+    parser.add_argument("baseline", help="<name>_stats.csv of the baseline run")
+    parser.add_argument("candidate", help="<name>_stats.csv of the run to compare")
+    args = parser.parse_args()
+
+    baseline = load(args.baseline)
+    candidate = load(args.candidate)
+    names = [n for n in baseline if n in candidate and n != "Aggregated"]
+    if "Aggregated" in baseline and "Aggregated" in candidate:
+        names.append("Aggregated")
+
+    width = max([len(n) for n in names] + [8])
+    metrics = [label for _, label in COLUMNS] + ["fail%"]
+    print(f"{'Endpoint':<{width}}  " + "  ".join(f"{m:>23}" for m in metrics))
+    for name in names:
+        cells = []
+        for m in metrics:
+            before, after = baseline[name][m], candidate[name][m]
+            cells.append(f"{before:>7.1f} -> {after:>7.1f} {change(before, after):>6}")
+        print(f"{name:<{width}}  " + "  ".join(cells))
+
+
+if __name__ == "__main__":
+    main()
@@ -22,11 +22,27 @@ Usage:
   locust -f comprehensive_system_test.py --headless --host=http://136.119.54.74:8080
 
 The test will automatically run all scenarios and generate reports.
+
+Comparing server configurations (e.g. WEB_SERVER=werkzeug vs gunicorn):
+  LOCUST_AUTOMATED_MODE=true LOCUST_SCENARIOS=4 LOCUST_RUN_LABEL=werkzeug \
+    locust -f comprehensive_system_test.py --headless --host=... --csv results/werkzeug
+  LOCUST_AUTOMATED_MODE=true LOCUST_SCENARIOS=4 LOCUST_RUN_LABEL=gunicorn \
+    locust -f comprehensive_system_test.py --headless --host=... --csv results/gunicorn
+  python compare_runs.py results/werkzeug_stats.csv results/gunicorn_stats.csv
+
+Responses carrying a Server-Timing header are also recorded per phase, as
+rows named "<request name> [<phase>]" in a separate table: they do not count
+as requests. With --csv <prefix> it is written to <prefix>_server_timing.csv,
+which compare_runs.py reads like the stats CSV (LOCUST_SERVER_TIMING=false
+turns this off).
 """
 
 from locust import HttpUser, task, SequentialTaskSet, between, TaskSet, events
 from locust.env import Environment
+from locust.runners import WorkerRunner
+from locust.stats import RequestStats, StatsEntry
 from faker import Faker
+import csv
 import random
 import time
 import logging
@@ -73,6 +89,18 @@ SCENARIOS = [
     }
 ]
 
+# Optional subset of scenarios to run, by number (e.g. "4" for the stress test only)
+if os.getenv('LOCUST_SCENARIOS'):
+    SCENARIOS = [SCENARIOS[int(n) - 1] for n in os.getenv('LOCUST_SCENARIOS').split(',')]
+
+# Label of the server configuration under test, logged with every scenario
+RUN_LABEL = os.getenv('LOCUST_RUN_LABEL')
+
+# Report the Server-Timing phases of every response as "<name> [<phase>]" rows
+SERVER_TIMING = os.getenv('LOCUST_SERVER_TIMING', 'true').lower() == 'true'
+# kept apart from environment.stats so phases are not counted as requests
+phase_stats = RequestStats()
+
 # Current scenario tracker
 current_scenario = {"index": 0, "start_time": None}
 
@@ -429,6 +457,74 @@ class CasualBankingUser(HttpUser):
     weight = 7  # 70% of users
 
 
+@events.request.add_listener
+def on_request(request_type, name, response=None, context=None, exception=None, **kwargs):
+    """
+    Splits each dashboard response's Server-Timing header (parse, downstream,
+    downstream_mongo_read, serialize, ...) into per-phase entries of
+    phase_stats, a latency breakdown next to the end-to-end time.
+    """
+    if not SERVER_TIMING or exception or response is None:
+        return
+    header = response.headers.get("Server-Timing")
+    if not header:
+        return
+    for entry in header.split(","):
+        phase, _, params = entry.strip().partition(";")
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "dur" and phase:
+                phase_stats.log_request("TIMING", f"{name} [{phase}]", float(value), 0)
+
+
+@events.report_to_master.add_listener
+def on_report_to_master(client_id, data, **kwargs):
+    """Sends this worker's phases to the master (and resets them)."""
+    data["server_timing"] = phase_stats.serialize_stats()
+
+
+@events.worker_report.add_listener
+def on_worker_report(client_id, data, **kwargs):
+    """Merges a worker's phases into the master's table."""
+    for entry_data in data.get("server_timing", ()):
+        entry = StatsEntry.unserialize(entry_data)
+        phase_stats.get(entry.name, entry.method).extend(entry)
+
+
+def write_server_timing(environment):
+    """
+    Writes phase_stats to <csv prefix>_server_timing.csv, with the columns of
+    Locust's stats CSV that compare_runs.py reads, or logs it without --csv.
+    """
+    entries = sorted(phase_stats.entries.values(), key=lambda e: e.name)
+    if not entries:
+        return
+    rows = [
+        {
+            "Type": e.method,
+            "Name": e.name,
+            "Request Count": e.num_requests,
+            "Failure Count": 0,
+            "Requests/s": e.total_rps,
+            "50%": e.get_response_time_percentile(0.5),
+            "95%": e.get_response_time_percentile(0.95),
+            "99%": e.get_response_time_percentile(0.99),
+        }
+        for e in entries
+    ]
+    prefix = environment.parsed_options.csv_prefix if environment.parsed_options else None
+    if not prefix:
+        logger.info("Server-Timing phases (ms): name, count, p50, p95, p99")
+        for row in rows:
+            logger.info(f"  {row['Name']}: {row['Request Count']}, {row['50%']}, {row['95%']}, {row['99%']}")
+        return
+    with open(f"{prefix}_server_timing.csv", "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    logger.info(f"Server-Timing phases written to {prefix}_server_timing.csv")
+
+
 # Event handlers for automated multi-scenario testing
 @events.test_start.add_listener
 def on_test_start(environment, **kwargs):
@@ -445,6 +541,8 @@ def on_test_start(environment, **kwargs):
     logger.info("MARTIAN BANK COMPREHENSIVE PERFORMANCE TEST - AUTOMATED MODE")
     logger.info("=" * 80)
     logger.info(f"Total scenarios to run: {len(SCENARIOS)}")
+    if RUN_LABEL:
+        logger.info(f"Run label: {RUN_LABEL}")
     logger.info("")
     
     # Start first scenario
@@ -469,7 +567,7 @@ def start_scenario(environment, scenario_index):
     current_scenario["start_time"] = time.time()
     
     logger.info("-" * 80)
-    logger.info(f"STARTING: {scenario['name']}")
+    logger.info(f"STARTING: {scenario['name']}" + (f" [{RUN_LABEL}]" if RUN_LABEL else ""))
     logger.info(f"Description: {scenario['description']}")
     logger.info(f"Users: {scenario['users']}")
     logger.info(f"Spawn Rate: {scenario['spawn_rate']} users/sec")
@@ -529,6 +627,8 @@ def on_quitting(environment, **kwargs):
     """
     Called when Locust is shutting down
     """
+    if SERVER_TIMING and not isinstance(environment.runner, WorkerRunner):
+        write_server_timing(environment)
     logger.info("")
     logger.info("=" * 80)
     logger.info("TEST SUITE COMPLETE - Shutting down")
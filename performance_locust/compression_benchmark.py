@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+"""
+Martian Bank - Response Compression Benchmark
+=============================================
+Measures the CPU/bytes tradeoff of compressing transaction histories of
+several sizes, as the dashboard sends them (``{"response": [...]}`` JSON) and
+as the transactions service sends them over gRPC (``GetALLTransactionsResponse``):
+
+  bytes      size on the wire
+  compress   server CPU time per response
+  inflate    client CPU time per response
+  total      compress + transfer at --mbps + inflate
+
+Encodings whose package (``brotli``, ``zstandard``) is missing are skipped.
+The ``total`` column shows where compression stops paying off, which is what
+``COMPRESSION_MIN_BYTES`` / ``GRPC_COMPRESSION_MIN_BYTES`` are set from.
+
+Usage:
+    python compression_benchmark.py --rows 3,20,200,1000 --mbps 10
+"""
+
+import argparse
+import datetime
+import gzip
+import os
+import sys
+import time
+import zlib
+
+from bson.objectid import ObjectId
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common import codec  # noqa: E402
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    from protobufs.transaction_pb2 import GetALLTransactionsResponse, Transaction  # noqa: E402
+except ImportError:
+    GetALLTransactionsResponse = None
+
+
+def history(rows):
+    now = datetime.datetime.now()
+    return [
+        {
+            "account_number": "IBAN%010d" % (i % 7),
+            "amount": round(12.5 + i * 3.7, 2),
+            "reason": ("Rent", "Groceries", "Zelle transfer", "Salary")[i % 4],
+            "time_stamp": now - datetime.timedelta(minutes=17 * i),
+            "type": "credit" if i % 3 else "debit",
+            "transaction_id": ObjectId(),
+        }
+        for i in range(rows)
+    ]
+
+
+def encodings():
+    yield "identity", lambda b: b, lambda b: b
+    for level in (1, 6):
+        yield f"gzip-{level}", lambda b, level=level: gzip.compress(b, compresslevel=level, mtime=0), gzip.decompress
+    if brotli is not None:
+        for quality in (4, 6):
+            yield f"br-{quality}", lambda b, quality=quality: brotli.compress(b, quality=quality), brotli.decompress
+    if zstandard is not None:
+        for level in (1, 3):
+            compressor = zstandard.ZstdCompressor(level=level)
+            yield f"zstd-{level}", compressor.compress, zstandard.ZstdDecompressor().decompress
+
+
+def grpc_encodings():
+    yield "identity", lambda b: b, lambda b: b
+    # what grpc core's gzip sends (zlib default level)
+    yield "gzip", lambda b: gzip.compress(b, mtime=0), gzip.decompress
+    yield "deflate", zlib.compress, zlib.decompress
+
+
+def timed(fn, body, repeat):
+    start = time.thread_time()
+    for _ in range(repeat):
+        out = fn(body)
+    return out, (time.thread_time() - start) / repeat
+
+
+def report(title, body, codecs, mbps, repeat):
+    print(f"\n{title}: {len(body)} bytes")
+    print(f"  {'encoding':<10} {'bytes':>9} {'ratio':>6} {'compress':>10} {'inflate':>10} {'total':>10}")
+    for name, compress, decompress in codecs:
+        compressed, compress_s = timed(compress, body, repeat)
+        _, inflate_s = timed(decompress, compressed, repeat)
+        transfer_s = len(compressed) * 8 / (mbps * 1e6)
+        total = compress_s + transfer_s + inflate_s
+        print(
+            f"  {name:<10} {len(compressed):>9} {len(body) / len(compressed):>5.1f}x "
+            f"{compress_s * 1000:>8.3f}ms {inflate_s * 1000:>8.3f}ms {total * 1000:>8.2f}ms"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure compression CPU time and size of transaction histories")
+    parser.add_argument("--rows", default="3,20,200,1000", help="comma-separated history sizes")
+    parser.add_argument("--mbps", type=float, default=10, help="client bandwidth for the total column")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    for rows in (int(r) for r in args.rows.split(",")):
+        docs = history(rows)
+        report(f"{rows} rows, HTTP JSON", codec.dumps({"response": docs}), list(encodings()), args.mbps, args.repeat)
+        if GetALLTransactionsResponse is not None:
+            message = GetALLTransactionsResponse(transactions=[
+                Transaction(
+                    account_number=t["account_number"], amount=t["amount"], reason=t["reason"],
+                    time_stamp=t["time_stamp"].isoformat(), type=t["type"], transaction_id=str(t["transaction_id"]),
+                )
+                for t in docs
+            ])
+            report(f"{rows} rows, gRPC", message.SerializeToString(), list(grpc_encodings()), args.mbps, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
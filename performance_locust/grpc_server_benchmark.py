@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+"""
+Martian Bank - gRPC Server Benchmark
+====================================
+Measures RPS and latency percentiles of one read RPC of the accounts,
+transactions or loan service, for each handler pool size
+(``GRPC_MAX_WORKERS``).
+
+With ``--start`` the benchmark starts the service itself once per size (the
+service needs ``DB_URL`` and ``SERVICE_PROTOCOL=grpc`` in the environment, and
+extra ``GRPC_*`` variables are passed through). Without it, it measures the
+server already listening on ``--target``.
+
+Usage:
+    python grpc_server_benchmark.py --service accounts --arg user@martian.bank \\
+        --start --workers 10,32 --requests 5000 --concurrency 100
+    python grpc_server_benchmark.py --service loan --arg user@martian.bank --target localhost:50053
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import grpc
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+from protobufs import accounts_pb2  # noqa: E402
+from protobufs import accounts_pb2_grpc  # noqa: E402
+from protobufs import loan_pb2  # noqa: E402
+from protobufs import loan_pb2_grpc  # noqa: E402
+from protobufs import transaction_pb2  # noqa: E402
+from protobufs import transaction_pb2_grpc  # noqa: E402
+
+SERVICES = {
+    # service: (script, port, stub factory, call)
+    "accounts": (
+        "accounts/accounts.py", 50051,
+        accounts_pb2_grpc.AccountDetailsServiceStub,
+        lambda stub, arg: stub.getAccounts(accounts_pb2.GetAccountsRequest(email_id=arg)),
+    ),
+    "transactions": (
+        "transactions/transaction.py", 50052,
+        transaction_pb2_grpc.TransactionServiceStub,
+        lambda stub, arg: stub.getTransactionsHistory(transaction_pb2.GetALLTransactionsRequest(account_number=arg)),
+    ),
+    "loan": (
+        "loan/loan.py", 50053,
+        loan_pb2_grpc.LoanServiceStub,
+        lambda stub, arg: stub.getLoanHistory(loan_pb2.LoansHistoryRequest(email=arg)),
+    ),
+}
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p / 100))]
+
+
+def run(args, target):
+    _, _, stub_factory, call = SERVICES[args.service]
+    channel = grpc.insecure_channel(target)
+    grpc.channel_ready_future(channel).result(timeout=30)
+    stub = stub_factory(channel)
+
+    def one(_):
+        start = time.perf_counter()
+        try:
+            call(stub, args.arg)
+            return time.perf_counter() - start, None
+        except grpc.RpcError as e:
+            return time.perf_counter() - start, e.code().name
+
+    for _ in range(args.warmup):
+        one(None)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(one, range(args.requests)))
+    elapsed = time.perf_counter() - start
+    channel.close()
+
+    latencies = sorted(latency * 1000 for latency, error in results if error is None)
+    errors = {}
+    for _, error in results:
+        if error is not None:
+            errors[error] = errors.get(error, 0) + 1
+    return {
+        "rps": len(results) / elapsed,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "errors": errors,
+    }
+
+
+def start_service(args, workers):
+    script, port, _, _ = SERVICES[args.service]
+    env = dict(os.environ, GRPC_MAX_WORKERS=workers, SERVICE_PROTOCOL="grpc")
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [REPO, env.get("PYTHONPATH")]))
+    process = subprocess.Popen(
+        [sys.executable, os.path.basename(script)],
+        cwd=os.path.join(REPO, os.path.dirname(script)),
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    return process, f"localhost:{port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark gRPC server pool sizes")
+    parser.add_argument("--service", choices=sorted(SERVICES), required=True)
+    parser.add_argument("--arg", required=True, help="email (accounts, loan) or account number (transactions)")
+    parser.add_argument("--target", help="host:port of a running server (default: the service's local port)")
+    parser.add_argument("--start", action="store_true", help="start the service once per pool size")
+    parser.add_argument("--workers", default="10,32", help="GRPC_MAX_WORKERS values to compare")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=50)
+    args = parser.parse_args()
+
+    sizes = args.workers.split(",") if args.start else ["running server"]
+    for workers in sizes:
+        process = None
+        target = args.target or f"localhost:{SERVICES[args.service][1]}"
+        if args.start:
+            process, target = start_service(args, workers)
+        try:
+            r = run(args, target)
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait()
+        print(
+            f"{workers:>8}: {r['rps']:8.1f} RPS  p50 {r['p50']:7.1f} ms  p95 {r['p95']:7.1f} ms  "
+            f"p99 {r['p99']:7.1f} ms  errors {r['errors'] or 0}"
+        )
+
+
+if __name__ == "__main__":
+    main()
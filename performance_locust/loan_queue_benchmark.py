@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+"""
+Martian Bank - Loan Queue Benchmark
+===================================
+Measures sustained loan applications/sec against the loan microservice
+(HTTP mode), comparing the synchronous ``/loan/request`` route with the
+queued ``/loan/queue`` + ``/loan/status/<ticket_id>`` pipeline.
+
+The loan service must run with ``LOAN_QUEUE_ENABLED=true`` for the queued
+mode. The account used for the applications must already exist.
+
+Usage:
+    python loan_queue_benchmark.py --host http://localhost:50053 \\
+        --account-number IBAN1234 --email user@martian.bank --requests 2000 --concurrency 50
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+
+def build_application(args, i):
+    return {
+        "name": "Benchmark User",
+        "email": args.email,
+        "account_type": "Checking",
+        "account_number": args.account_number,
+        "govt_id_type": "Passport",
+        "govt_id_number": f"BENCH{i}",
+        "loan_type": "Rover",
+        "loan_amount": 1000,
+        "interest_rate": 5,
+        "time_period": "12",
+    }
+
+
+def run_sync(args, session):
+    def apply(i):
+        return session.post(f"{args.host}/loan/request", json=build_application(args, i)).ok
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        ok = sum(pool.map(apply, range(args.requests)))
+    return ok, time.perf_counter() - start
+
+
+def run_queued(args, session):
+    def submit(i):
+        r = session.post(f"{args.host}/loan/queue", json=build_application(args, i))
+        return r.json()["ticket_id"] if r.status_code == 202 else None
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        tickets = [t for t in pool.map(submit, range(args.requests)) if t]
+    accepted = time.perf_counter() - start
+
+    pending = set(tickets)
+    while pending:
+        for ticket_id in list(pending):
+            status = session.get(f"{args.host}/loan/status/{ticket_id}").json()["status"]
+            if status != "Queued":
+                pending.discard(ticket_id)
+        if pending:
+            time.sleep(args.poll_interval)
+    return len(tickets), accepted, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark synchronous vs queued loan decisions")
+    parser.add_argument("--host", default="http://localhost:50053")
+    parser.add_argument("--account-number", required=True)
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--poll-interval", type=float, default=0.05)
+    parser.add_argument("--mode", choices=["sync", "queued", "both"], default="both")
+    args = parser.parse_args()
+
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_maxsize=args.concurrency)
+    session.mount("http://", adapter)
+
+    if args.mode in ("sync", "both"):
+        ok, elapsed = run_sync(args, session)
+        print(f"sync:   {ok}/{args.requests} decided in {elapsed:.2f}s -> {ok / elapsed:.1f} applications/sec")
+
+    if args.mode in ("queued", "both"):
+        accepted, ack_elapsed, elapsed = run_queued(args, session)
+        print(f"queued: {accepted}/{args.requests} accepted in {ack_elapsed:.2f}s -> {accepted / ack_elapsed:.1f} acks/sec")
+        print(f"queued: {accepted} decided in {elapsed:.2f}s -> {accepted / elapsed:.1f} applications/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+"""
+Martian Bank - Logging Overhead Benchmark
+=========================================
+Measures the CPU time the logging calls of one transfer request cost the
+request thread (the transactions service logs the email, both account
+documents, sender, receiver and transaction id), comparing:
+
+  before         logging.basicConfig(level=DEBUG) with eager f-strings
+  info           common.log at LOG_LEVEL=INFO with lazy %-style arguments
+  debug-queue    common.log at DEBUG with the background queue handler
+  debug-sampled  as debug-queue, with LOG_SAMPLE_RATE=0.01
+
+Output goes to /dev/null so only the logging work itself is measured. With
+--db-url it also times the count_documents round trip that
+__getAccountwithEmail used to run only to log its result.
+
+Usage:
+    python logging_benchmark.py --requests 20000
+"""
+
+import argparse
+import datetime
+import logging
+import os
+import sys
+import time
+
+from bson.objectid import ObjectId
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common import log  # noqa: E402
+
+DOCUMENT = {
+    "_id": ObjectId(),
+    "email_id": "user@martian.bank",
+    "account_type": "Checking",
+    "address": "1 Olympus Mons Way",
+    "govt_id_number": "123456789",
+    "government_id_type": "Passport",
+    "name": "Benchmark User",
+    "balance": 1234.56,
+    "currency": "USD",
+    "account_number": "IBAN1234567890",
+    "created_at": datetime.datetime.now(),
+}
+
+
+def request_before(doc):
+    logging.debug(f"Email: {doc['email_id']}")
+    logging.debug(f"Checking Account: {doc}")
+    logging.debug(f"Checking Account: {doc}")
+    logging.debug(f"---> sender: {doc}")
+    logging.debug(f"--->receiver: {doc}")
+    logging.debug(f"Transaction ID: {doc['_id']}")
+
+
+def request_after(doc):
+    logging.debug("Email: %s", doc["email_id"])
+    logging.debug("Checking Account: %s", doc)
+    logging.debug("Checking Account: %s", doc)
+    logging.debug("sender: %s", doc)
+    logging.debug("receiver: %s", doc)
+    logging.debug("Transaction ID: %s", doc["_id"])
+
+
+def configure(mode, devnull):
+    root = logging.getLogger()
+    for h in list(root.handlers):
+        root.removeHandler(h)
+    os.environ.pop("LOG_SAMPLE_RATE", None)
+    if mode == "before":
+        logging.basicConfig(level=logging.DEBUG, stream=devnull, force=True)
+        return request_before
+    os.environ["LOG_LEVEL"] = "INFO" if mode == "info" else "DEBUG"
+    if mode == "debug-sampled":
+        os.environ["LOG_SAMPLE_RATE"] = "0.01"
+    log.setup("benchmark", use_queue=mode != "info")
+    handler = root.handlers[0]
+    (handler.handler if isinstance(handler, log.BackgroundQueueHandler) else handler).setStream(devnull)
+    return request_after
+
+
+def measure(mode, requests, devnull):
+    handle = configure(mode, devnull)
+    for _ in range(min(1000, requests)):
+        handle(DOCUMENT)
+    start = time.thread_time()
+    for _ in range(requests):
+        handle(DOCUMENT)
+    elapsed = time.thread_time() - start
+    handler = logging.getLogger().handlers[0]
+    if isinstance(handler, log.BackgroundQueueHandler):
+        handler.stop()
+    return elapsed / requests * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure per-request logging CPU time")
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--db-url", help="also time the removed count_documents round trip")
+    args = parser.parse_args()
+
+    with open(os.devnull, "w") as devnull:
+        results = {mode: measure(mode, args.requests, devnull)
+                   for mode in ("before", "info", "debug-queue", "debug-sampled")}
+    for mode, us in results.items():
+        saved = f"  ({results['before'] / us:.1f}x less)" if mode != "before" and us else ""
+        print(f"{mode:>14}: {us:8.2f} us of request-thread CPU per request{saved}")
+
+    if args.db_url:
+        from pymongo import MongoClient
+
+        collection = MongoClient(args.db_url)[os.getenv("MONGO_DB_NAME", "bank")]["accounts"]
+        collection.count_documents({"email_id": DOCUMENT["email_id"], "account_type": "Checking"})
+        start = time.perf_counter()
+        for _ in range(100):
+            collection.count_documents({"email_id": DOCUMENT["email_id"], "account_type": "Checking"})
+        print(f"removed count_documents: {(time.perf_counter() - start) * 10:.2f} ms per transfer by email")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+#!/usr/bin/env python
+"""
+Martian Bank - Protobuf Conversion Benchmark
+============================================
+Measures the CPU time of converting transaction histories of several sizes
+between MongoDB documents / dicts and ``GetALLTransactionsResponse``, as the
+services' gRPC APIs and the dashboard's gRPC clients do, comparing:
+
+  manual       the hand-written loops the services used before
+  proto        common.proto.from_dict / to_dict / to_json
+  closures     the same conversion with plain per-type closures over
+               precomputed field lists, which common.proto generates code
+               instead of (kept here to show what that buys)
+  json_format  google.protobuf.json_format (ParseDict after the same
+               isoformat()/str() as manual, MessageToDict, MessageToJson)
+
+in three directions:
+
+  build  documents -> response message (the servicer)
+  read   response message -> list of dicts (the dashboard client)
+  json   response message -> JSON bytes
+
+The protobuf backend in use is printed first; numbers taken with the pure
+Python backend are not comparable.
+
+Usage:
+    python proto_benchmark.py --rows 20,200,1000 --repeat 200
+"""
+
+import argparse
+import datetime
+import operator
+import os
+import sys
+import time
+
+from bson.objectid import ObjectId
+from google.protobuf import json_format
+from google.protobuf.descriptor import FieldDescriptor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common import proto  # noqa: E402
+from protobufs.transaction_pb2 import GetALLTransactionsResponse, Transaction  # noqa: E402
+
+
+def documents(rows):
+    now = datetime.datetime.now()
+    return [
+        {
+            "_id": ObjectId(),
+            "account_number": "IBAN%010d" % (i % 7),
+            "receiver_account_number": "IBAN%010d" % (i % 5),
+            "amount": round(12.5 + i * 3.7, 2),
+            "reason": ("Rent", "Groceries", "Zelle transfer", "Salary")[i % 4],
+            "time_stamp": now - datetime.timedelta(minutes=17 * i),
+            "type": "credit" if i % 3 else "debit",
+            "transaction_id": ObjectId(),
+        }
+        for i in range(rows)
+    ]
+
+
+def _row(t):
+    return {
+        "account_number": t["account_number"],
+        "amount": t["amount"],
+        "reason": t["reason"],
+        "time_stamp": t["time_stamp"].isoformat(),
+        "type": t["type"],
+        "transaction_id": str(t["transaction_id"]),
+    }
+
+
+def build_manual(docs):
+    return GetALLTransactionsResponse(transactions=[Transaction(**_row(t)) for t in docs])
+
+
+def build_proto(docs):
+    return proto.from_dict(GetALLTransactionsResponse, {"transactions": docs})
+
+
+def build_json_format(docs):
+    return json_format.ParseDict({"transactions": [_row(t) for t in docs]}, GetALLTransactionsResponse())
+
+
+def closures(cls):
+    """``(build, read)`` of a message type without nested messages, from
+    field lists computed once."""
+    fields = cls.DESCRIPTOR.fields
+    names = tuple(f.name for f in fields)
+    strings = tuple(i for i, f in enumerate(fields) if f.type == FieldDescriptor.TYPE_STRING)
+    getter = operator.attrgetter(*names)
+
+    def build(data):
+        values = list(map(data.get, names))
+        for i in strings:
+            value = values[i]
+            if type(value) is not str and value is not None:
+                values[i] = value.isoformat() if isinstance(value, datetime.datetime) else str(value)
+        return cls(**dict(zip(names, values)))
+
+    def read(message):
+        return dict(zip(names, getter(message)))
+
+    return build, read
+
+
+_build_transaction, _read_transaction = closures(Transaction)
+
+
+def build_closures(docs):
+    return GetALLTransactionsResponse(transactions=[_build_transaction(t) for t in docs])
+
+
+def read_manual(response):
+    return [
+        {
+            "account_number": t.account_number,
+            "amount": t.amount,
+            "reason": t.reason,
+            "time_stamp": t.time_stamp,
+            "type": t.type,
+            "transaction_id": t.transaction_id,
+        }
+        for t in response.transactions
+    ]
+
+
+def read_proto(response):
+    return proto.to_dict(response)["transactions"]
+
+
+def read_closures(response):
+    return [_read_transaction(t) for t in response.transactions]
+
+
+def read_json_format(response):
+    return json_format.MessageToDict(
+        response, preserving_proto_field_name=True, always_print_fields_with_no_presence=True
+    )["transactions"]
+
+
+def json_proto(response):
+    return proto.to_json(response)
+
+
+def json_json_format(response):
+    return json_format.MessageToJson(
+        response, preserving_proto_field_name=True, always_print_fields_with_no_presence=True, indent=None
+    )
+
+
+CASES = (
+    # (direction, input, {variant: function})
+    ("build", "docs", {
+        "manual": build_manual, "proto": build_proto, "closures": build_closures, "json_format": build_json_format,
+    }),
+    ("read", "response", {
+        "manual": read_manual, "proto": read_proto, "closures": read_closures, "json_format": read_json_format,
+    }),
+    ("json", "response", {"proto": json_proto, "json_format": json_json_format}),
+)
+
+
+def measure(function, value, repeat):
+    for _ in range(min(20, repeat)):
+        function(value)
+    start = time.thread_time()
+    for _ in range(repeat):
+        function(value)
+    return (time.thread_time() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure protobuf <-> dict conversion CPU time")
+    parser.add_argument("--rows", default="20,200,1000", help="history sizes")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"protobuf backend: {proto.check_backend()}")
+    print(f"{'rows':>6} {'':>6} {'manual':>10} {'proto':>10} {'closures':>10} {'json_format':>12}  (ms of CPU per history)")
+    for rows in map(int, args.rows.split(",")):
+        docs = documents(rows)
+        inputs = {"docs": docs, "response": build_manual(docs)}
+        assert build_proto(docs) == inputs["response"] == build_closures(docs) == build_json_format(docs)
+        assert read_proto(inputs["response"]) == read_manual(inputs["response"]) == read_closures(inputs["response"])
+        for direction, given, variants in CASES:
+            times = {name: measure(function, inputs[given], args.repeat) for name, function in variants.items()}
+            cells = [f"{times[name]:10.3f}" if name in times else f"{'-':>10}" for name in ("manual", "proto", "closures")]
+            print(f"{rows:>6} {direction:>6} {' '.join(cells)} {times['json_format']:12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+"""
+Martian Bank - Startup Benchmark
+================================
+Measures how long the services take to start, for each ``SERVICE_PROTOCOL``:
+
+* ``import``: importing the service's module in a fresh interpreter, which
+  every process (and every ``inproc`` dashboard) pays before serving;
+* ``ready``: from spawning ``python <service>.py`` to its first successful
+  answer to a real request (a MongoDB read), i.e. container start-to-ready.
+
+Each number is the median of ``--runs`` fresh processes. The services need
+``DB_URL`` in the environment, and the account and email given must exist in
+it; other variables (``WEB_SERVER``, ``WEB_WORKERS``, ...) are passed through.
+The dashboard is measured in the ``inproc`` mode only, where it answers
+``/account/allaccounts`` without the other services.
+
+Usage:
+    python startup_benchmark.py --account IBAN0000000001 --email user@martian.bank \\
+        --services accounts,transactions,loan,dashboard --modes http,grpc --runs 5
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import grpc
+import requests
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+from protobufs import accounts_pb2  # noqa: E402
+from protobufs import accounts_pb2_grpc  # noqa: E402
+from protobufs import loan_pb2  # noqa: E402
+from protobufs import loan_pb2_grpc  # noqa: E402
+from protobufs import transaction_pb2  # noqa: E402
+from protobufs import transaction_pb2_grpc  # noqa: E402
+
+SERVICES = {
+    # service: (script, port, {mode: first request})
+    "accounts": ("accounts/accounts.py", 50051, {
+        "http": lambda args, url: requests.post(f"{url}/get-all-accounts", json={"email_id": args.email}, timeout=5),
+        "grpc": lambda args, channel: accounts_pb2_grpc.AccountDetailsServiceStub(channel).getAccounts(
+            accounts_pb2.GetAccountsRequest(email_id=args.email), timeout=5),
+    }),
+    "transactions": ("transactions/transaction.py", 50052, {
+        "http": lambda args, url: requests.post(
+            f"{url}/transaction-history", json={"account_number": args.account}, timeout=5),
+        "grpc": lambda args, channel: transaction_pb2_grpc.TransactionServiceStub(channel).getTransactionsHistory(
+            transaction_pb2.GetALLTransactionsRequest(account_number=args.account), timeout=5),
+    }),
+    "loan": ("loan/loan.py", 50053, {
+        "http": lambda args, url: requests.post(f"{url}/loan/history", json={"email": args.email}, timeout=5),
+        "grpc": lambda args, channel: loan_pb2_grpc.LoanServiceStub(channel).getLoanHistory(
+            loan_pb2.LoansHistoryRequest(email=args.email), timeout=5),
+    }),
+    "dashboard": ("dashboard/dashboard.py", 5000, {
+        "inproc": lambda args, url: requests.post(f"{url}/account/allaccounts", data={"email_id": args.email}, timeout=5),
+    }),
+}
+
+
+def environment(mode):
+    env = dict(os.environ, SERVICE_PROTOCOL=mode)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [REPO, env.get("PYTHONPATH")]))
+    return env
+
+
+def import_time(script, mode):
+    module = os.path.splitext(os.path.basename(script))[0]
+    code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=os.path.join(REPO, os.path.dirname(script)),
+        env=environment(mode),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(output.stdout.strip().splitlines()[-1])
+
+
+def first_response(args, mode, port, request):
+    if mode == "grpc":
+        with grpc.insecure_channel(f"localhost:{port}") as channel:
+            request(args, channel)
+        return
+    response = request(args, f"http://localhost:{port}")
+    response.raise_for_status()
+
+
+def ready_time(args, script, port, mode, request, timeout=60):
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, os.path.basename(script)],
+        cwd=os.path.join(REPO, os.path.dirname(script)),
+        env=environment(mode),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            if process.poll() is not None:
+                raise Exception(f"{script} exited with {process.returncode}")
+            try:
+                first_response(args, mode, port, request)
+                return time.perf_counter() - start
+            except (grpc.RpcError, requests.RequestException):
+                time.sleep(0.02)
+        raise Exception(f"{script} did not answer in {timeout}s")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark service startup")
+    parser.add_argument("--account", required=True, help="account number read by transactions")
+    parser.add_argument("--email", required=True, help="email read by accounts, loan and dashboard")
+    parser.add_argument("--services", default="accounts,transactions,loan,dashboard", help=f"any of {','.join(SERVICES)}")
+    parser.add_argument("--modes", default="http,grpc", help="modes of accounts, transactions and loan")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    for service in args.services.split(","):
+        script, port, requests_by_mode = SERVICES[service]
+        modes = [mode for mode in args.modes.split(",") if mode in requests_by_mode] or list(requests_by_mode)
+        for mode in modes:
+            imports = [import_time(script, mode) for _ in range(args.runs)]
+            ready = [ready_time(args, script, port, mode, requests_by_mode[mode]) for _ in range(args.runs)]
+            print(
+                f"{service:>12} {mode:>6}: import {statistics.median(imports) * 1000:7.1f} ms  "
+                f"ready {statistics.median(ready) * 1000:7.1f} ms  ({args.runs} runs)"
+            )
+
+
+if __name__ == "__main__":
+    main()
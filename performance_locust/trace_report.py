@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+"""
+Martian Bank - Trace Report
+===========================
+Prints the critical path of the slowest traces recorded by common/tracing.py
+(``TRACE_EXPORTER=file`` or ``http``): the chain of spans that determined
+each trace's end-to-end latency, with the time each spent outside its
+children on the path ("self").
+
+With ``--collect`` it instead runs a stand-in collector for
+``TRACE_EXPORTER=http``, appending every POSTed batch to ``--out``.
+
+Usage:
+    python trace_report.py /tmp/martianbank-traces.jsonl --top 5
+    python trace_report.py traces.jsonl --route "POST /transaction/zelle/" --summary
+    python trace_report.py --collect 4319 --out traces.jsonl
+"""
+
+import argparse
+import json
+import sys
+import threading
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def load(paths):
+    traces = defaultdict(dict)
+    for path in paths:
+        with open(path) as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    span = json.loads(line)
+                    span["end"] = span["start"] + span["duration_ms"] / 1000
+                    traces[span["trace_id"]][span["span_id"]] = span
+    return traces
+
+
+def root_of(spans):
+    roots = [s for s in spans.values() if s["parent_id"] not in spans]
+    return max(roots, key=lambda s: s["duration_ms"]) if roots else None
+
+
+def critical_path(span, children, depth=0):
+    """Walk back from the end of ``span``: the child finishing last before the
+    cursor is on the path, then the one finishing last before it started."""
+    chosen = []
+    cursor = span["end"]
+    for child in sorted(children[span["span_id"]], key=lambda s: s["end"], reverse=True):
+        # a millisecond of slack for clock differences between services
+        if child["end"] <= cursor + 0.001:
+            chosen.append(child)
+            cursor = child["start"]
+    own = span["duration_ms"] - sum(c["duration_ms"] for c in chosen)
+    path = [(depth, span, max(own, 0.0))]
+    for child in reversed(chosen):
+        path.extend(critical_path(child, children, depth + 1))
+    return path
+
+
+def report(args):
+    traces = load(args.files)
+    rows = []
+    for spans in traces.values():
+        root = root_of(spans)
+        if root is None or (args.route and root["name"] != args.route):
+            continue
+        rows.append((root, spans))
+    rows.sort(key=lambda r: r[0]["duration_ms"], reverse=True)
+    if not rows:
+        print("No matching traces")
+        return
+
+    totals = defaultdict(float)
+    for root, spans in rows[:args.top]:
+        children = defaultdict(list)
+        for s in spans.values():
+            children[s["parent_id"]].append(s)
+        print(f"\ntrace {root['trace_id']}  {root['name']}  {root['duration_ms']:.1f} ms  ({len(spans)} spans)")
+        for depth, span, own in critical_path(root, children):
+            label = span["name"]
+            collection = span["attributes"].get("db.collection")
+            if collection:
+                label += f" {collection}"
+            error = f"  ERROR {span['error']}" if span.get("error") else ""
+            print(f"  {'  ' * depth}{span['service']:<12} {label:<48} {span['duration_ms']:8.1f} ms  self {own:7.1f} ms{error}")
+            totals[(span["service"], label)] += own
+
+    if args.summary:
+        print(f"\nSelf time on the critical path of the {min(args.top, len(rows))} slowest traces:")
+        for (service, label), ms in sorted(totals.items(), key=lambda kv: kv[1], reverse=True)[:15]:
+            print(f"  {service:<12} {label:<48} {ms:9.1f} ms")
+
+
+def collect(args):
+    out = open(args.out, "a")
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            with lock:
+                out.write(body.decode())
+                out.flush()
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, *_):
+            pass
+
+    print(f"Collecting spans on :{args.collect} into {args.out}", file=sys.stderr)
+    ThreadingHTTPServer(("0.0.0.0", args.collect), Handler).serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Critical path of the slowest traces")
+    parser.add_argument("files", nargs="*", help="span files written by TRACE_EXPORTER=file or --collect")
+    parser.add_argument("--top", type=int, default=5, help="number of slowest traces to print")
+    parser.add_argument("--route", help='only traces whose root span has this name, e.g. "POST /transaction/zelle/"')
+    parser.add_argument("--summary", action="store_true", help="aggregate self time over the printed traces")
+    parser.add_argument("--collect", type=int, metavar="PORT", help="run a collector for TRACE_EXPORTER=http")
+    parser.add_argument("--out", default="traces.jsonl", help="file the collector appends to")
+    args = parser.parse_args()
+
+    if args.collect:
+        collect(args)
+    elif args.files:
+        report(args)
+    else:
+        parser.error("give span files or --collect PORT")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+"""
+Martian Bank - Dashboard Transport Benchmark
+============================================
+Measures RPS and latency percentiles of dashboard read routes for each way the
+dashboard reaches the accounts, transactions and loan services
+(``SERVICE_PROTOCOL=grpc`` / ``http`` / ``inproc``).
+
+With ``--start`` the benchmark starts the stack itself once per mode: the
+three services and the dashboard for ``grpc`` and ``http``, the dashboard
+alone for ``inproc``. They need ``DB_URL`` in the environment, and the
+account and email given must exist in it; other variables (``WEB_SERVER``,
+``WEB_WORKERS``, ...) are passed through. Without ``--start``, it
+measures the dashboard already listening on ``--target``.
+
+Usage:
+    python transport_benchmark.py --account IBAN0000000001 --email user@martian.bank \\
+        --start --modes grpc,http,inproc --requests 5000 --concurrency 50
+    python transport_benchmark.py --account IBAN0000000001 --email user@martian.bank \\
+        --routes detail,history --target http://localhost:5000
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SERVICES = ("accounts/accounts.py", "transactions/transaction.py", "loan/loan.py")
+
+ROUTES = {
+    # route: (path, form)
+    "detail": ("/account/detail", lambda args: {"account_number": args.account}),
+    "accounts": ("/account/allaccounts", lambda args: {"email_id": args.email}),
+    "history": ("/transaction/history", lambda args: {"account_number": args.account}),
+    "loans": ("/loan/history", lambda args: {"email": args.email}),
+}
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p / 100))]
+
+
+def run(args, target, route):
+    path, form = ROUTES[route]
+    url = target.rstrip("/") + path
+    data = form(args)
+    session = requests.Session()
+    session.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=args.concurrency))
+
+    def one(_):
+        start = time.perf_counter()
+        try:
+            response = session.post(url, data=data, timeout=30)
+            error = None if response.status_code == 200 else str(response.status_code)
+        except requests.RequestException as e:
+            error = type(e).__name__
+        return time.perf_counter() - start, error
+
+    for _ in range(args.warmup):
+        one(None)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(one, range(args.requests)))
+    elapsed = time.perf_counter() - start
+    session.close()
+
+    latencies = sorted(latency * 1000 for latency, error in results if error is None)
+    errors = {}
+    for _, error in results:
+        if error is not None:
+            errors[error] = errors.get(error, 0) + 1
+    return {
+        "rps": len(results) / elapsed,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "errors": errors,
+    }
+
+
+def start_stack(mode):
+    env = dict(os.environ, SERVICE_PROTOCOL=mode)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [REPO, env.get("PYTHONPATH")]))
+    scripts = ("dashboard/dashboard.py",) if mode == "inproc" else SERVICES + ("dashboard/dashboard.py",)
+    return [
+        subprocess.Popen(
+            [sys.executable, os.path.basename(script)],
+            cwd=os.path.join(REPO, os.path.dirname(script)),
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        for script in scripts
+    ]
+
+
+def wait_ready(target, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            requests.get(target, timeout=1)
+            return
+        except requests.RequestException:
+            time.sleep(0.2)
+    raise Exception(f"dashboard at {target} did not start in {timeout}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard's transports")
+    parser.add_argument("--account", required=True, help="account number read by detail and history")
+    parser.add_argument("--email", required=True, help="email read by accounts and loans")
+    parser.add_argument("--routes", default="detail,accounts,history,loans", help=f"any of {','.join(ROUTES)}")
+    parser.add_argument("--target", default="http://localhost:5000", help="dashboard URL")
+    parser.add_argument("--start", action="store_true", help="start the stack once per mode")
+    parser.add_argument("--modes", default="grpc,http,inproc")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=50)
+    args = parser.parse_args()
+
+    modes = args.modes.split(",") if args.start else [os.getenv("SERVICE_PROTOCOL", "running dashboard")]
+    for mode in modes:
+        processes = start_stack(mode) if args.start else []
+        try:
+            wait_ready(args.target)
+            for route in args.routes.split(","):
+                r = run(args, args.target, route)
+                print(
+                    f"{mode:>8} {route:>8}: {r['rps']:8.1f} RPS  p50 {r['p50']:7.1f} ms  p95 {r['p95']:7.1f} ms  "
+                    f"p99 {r['p99']:7.1f} ms  errors {r['errors'] or 0}"
+                )
+        finally:
+            for process in processes:
+                process.terminate()
+            for process in processes:
+                process.wait()
+
+
+if __name__ == "__main__":
+    main()
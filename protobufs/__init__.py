@@ -0,0 +1,13 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""Python code generated from the ``.proto`` files in this directory, shared
+by the dashboard and the services (``from protobufs import accounts_pb2``).
+
+Regenerate it from the repository root after changing a ``.proto`` file::
+
+    python -m grpc_tools.protoc -I . --python_out=. --grpc_python_out=. protobufs/*.proto
+
+``common.proto`` converts the messages to and from dicts and JSON.
+"""
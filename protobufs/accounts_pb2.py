@@ -0,0 +1,58 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+# -*- coding: utf-8 -*-
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# NO CHECKED-IN PROTOBUF GENCODE
+# source: protobufs/accounts.proto
+# Protobuf Python Version: 7.35.1
+"""Generated protocol buffer code."""
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import runtime_version as _runtime_version
+from google.protobuf import symbol_database as _symbol_database
+from google.protobuf.internal import builder as _builder
+_runtime_version.ValidateProtobufRuntimeVersion(
+    _runtime_version.Domain.PUBLIC,
+    7,
+    35,
+    1,
+    '',
+    'protobufs/accounts.proto'
+)
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x18protobufs/accounts.proto\"\xbf\x01\n\x07\x41\x63\x63ount\x12\x16\n\x0e\x61\x63\x63ount_number\x18\x01 \x01(\t\x12\x10\n\x08\x65mail_id\x18\x02 \x01(\t\x12\x14\n\x0c\x61\x63\x63ount_type\x18\x03 \x01(\t\x12\x0f\n\x07\x61\x64\x64ress\x18\x04 \x01(\t\x12\x16\n\x0egovt_id_number\x18\x05 \x01(\t\x12\x1a\n\x12government_id_type\x18\x06 \x01(\t\x12\x0c\n\x04name\x18\x07 \x01(\t\x12\x10\n\x08\x63urrency\x18\x08 \x01(\t\x12\x0f\n\x07\x62\x61lance\x18\t \x01(\x01\"\x91\x01\n\x14\x43reateAccountRequest\x12\x10\n\x08\x65mail_id\x18\x01 \x01(\t\x12\x14\n\x0c\x61\x63\x63ount_type\x18\x02 \x01(\t\x12\x0f\n\x07\x61\x64\x64ress\x18\x03 \x01(\t\x12\x16\n\x0egovt_id_number\x18\x04 \x01(\t\x12\x1a\n\x12government_id_type\x18\x05 \x01(\t\x12\x0c\n\x04name\x18\x06 \x01(\t\"\'\n\x15\x43reateAccountResponse\x12\x0e\n\x06result\x18\x01 \x01(\x08\"&\n\x12GetAccountsRequest\x12\x10\n\x08\x65mail_id\x18\x01 \x01(\t\"1\n\x13GetAccountsResponse\x12\x1a\n\x08\x61\x63\x63ounts\x18\x01 \x03(\x0b\x32\x08.Account\"j\n\rAccountDetail\x12\x16\n\x0e\x61\x63\x63ount_number\x18\x01 \x01(\t\x12\x0c\n\x04name\x18\x02 \x01(\t\x12\x0f\n\x07\x62\x61lance\x18\x03 \x01(\x01\x12\x10\n\x08\x63urrency\x18\x04 \x01(\t\x12\x10\n\x08\x65mail_id\x18\x05 \x01(\t\"1\n\x17GetAccountDetailRequest\x12\x16\n\x0e\x61\x63\x63ount_number\x18\x01 \x01(\t\"8\n\x1dGetAccountDetailsBatchRequest\x12\x17\n\x0f\x61\x63\x63ount_numbers\x18\x01 \x03(\t\"B\n\x1eGetAccountDetailsBatchResponse\x12 \n\x08\x61\x63\x63ounts\x18\x01 \x03(\x0b\x32\x0e.AccountDetail2\xab\x02\n\x15\x41\x63\x63ountDetailsService\x12=\n\x11getAccountDetails\x12\x18.GetAccountDetailRequest\x1a\x0e.AccountDetail\x12>\n\rcreateAccount\x12\x15.CreateAccountRequest\x1a\x16.CreateAccountResponse\x12\x38\n\x0bgetAccounts\x12\x13.GetAccountsRequest\x1a\x14.GetAccountsResponse\x12Y\n\x16getAccountDetailsBatch\x12\x1e.GetAccountDetailsBatchRequest\x1a\x1f.GetAccountDetailsBatchResponseb\x06proto3')
+
+_globals = globals()
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'protobufs.accounts_pb2', _globals)
+if not _descriptor._USE_C_DESCRIPTORS:
+  DESCRIPTOR._loaded_options = None
+  _globals['_ACCOUNT']._serialized_start=29
+  _globals['_ACCOUNT']._serialized_end=220
+  _globals['_CREATEACCOUNTREQUEST']._serialized_start=223
+  _globals['_CREATEACCOUNTREQUEST']._serialized_end=368
+  _globals['_CREATEACCOUNTRESPONSE']._serialized_start=370
+  _globals['_CREATEACCOUNTRESPONSE']._serialized_end=409
+  _globals['_GETACCOUNTSREQUEST']._serialized_start=411
+  _globals['_GETACCOUNTSREQUEST']._serialized_end=449
+  _globals['_GETACCOUNTSRESPONSE']._serialized_start=451
+  _globals['_GETACCOUNTSRESPONSE']._serialized_end=500
+  _globals['_ACCOUNTDETAIL']._serialized_start=502
+  _globals['_ACCOUNTDETAIL']._serialized_end=608
+  _globals['_GETACCOUNTDETAILREQUEST']._serialized_start=610
+  _globals['_GETACCOUNTDETAILREQUEST']._serialized_end=659
+  _globals['_GETACCOUNTDETAILSBATCHREQUEST']._serialized_start=661
+  _globals['_GETACCOUNTDETAILSBATCHREQUEST']._serialized_end=717
+  _globals['_GETACCOUNTDETAILSBATCHRESPONSE']._serialized_start=719
+  _globals['_GETACCOUNTDETAILSBATCHRESPONSE']._serialized_end=785
+  _globals['_ACCOUNTDETAILSSERVICE']._serialized_start=788
+  _globals['_ACCOUNTDETAILSSERVICE']._serialized_end=1087
+# @@protoc_insertion_point(module_scope)
@@ -0,0 +1,242 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+# Generated by the gRPC Python protocol compiler plugin. DO NOT EDIT!
+"""Client and server classes corresponding to protobuf-defined services."""
+import grpc
+import warnings
+
+from protobufs import accounts_pb2 as protobufs_dot_accounts__pb2
+
+GRPC_GENERATED_VERSION = '1.84.0'
+GRPC_VERSION = grpc.__version__
+_version_not_supported = False
+
+try:
+    from grpc._utilities import first_version_is_lower
+    _version_not_supported = first_version_is_lower(GRPC_VERSION, GRPC_GENERATED_VERSION)
+except ImportError:
+    _version_not_supported = True
+
+if _version_not_supported:
+    raise RuntimeError(
+        f'The grpc package installed is at version {GRPC_VERSION},'
+        + ' but the generated code in protobufs/accounts_pb2_grpc.py depends on'
+        + f' grpcio>={GRPC_GENERATED_VERSION}.'
+        + f' Please upgrade your grpc module to grpcio>={GRPC_GENERATED_VERSION}'
+        + f' or downgrade your generated code using grpcio-tools<={GRPC_VERSION}.'
+    )
+
+
+class AccountDetailsServiceStub:
+    """message GetAccountDetailResponse {
+    AccountDetail account = 1;
+    }
+
+    """
+
+    def __init__(self, channel):
+        """Constructor.
+
+        Args:
+            channel: A grpc.Channel.
+        """
+        self.getAccountDetails = channel.unary_unary(
+                '/AccountDetailsService/getAccountDetails',
+                request_serializer=protobufs_dot_accounts__pb2.GetAccountDetailRequest.SerializeToString,
+                response_deserializer=protobufs_dot_accounts__pb2.AccountDetail.FromString,
+                _registered_method=True)
+        self.createAccount = channel.unary_unary(
+                '/AccountDetailsService/createAccount',
+                request_serializer=protobufs_dot_accounts__pb2.CreateAccountRequest.SerializeToString,
+                response_deserializer=protobufs_dot_accounts__pb2.CreateAccountResponse.FromString,
+                _registered_method=True)
+        self.getAccounts = channel.unary_unary(
+                '/AccountDetailsService/getAccounts',
+                request_serializer=protobufs_dot_accounts__pb2.GetAccountsRequest.SerializeToString,
+                response_deserializer=protobufs_dot_accounts__pb2.GetAccountsResponse.FromString,
+                _registered_method=True)
+        self.getAccountDetailsBatch = channel.unary_unary(
+                '/AccountDetailsService/getAccountDetailsBatch',
+                request_serializer=protobufs_dot_accounts__pb2.GetAccountDetailsBatchRequest.SerializeToString,
+                response_deserializer=protobufs_dot_accounts__pb2.GetAccountDetailsBatchResponse.FromString,
+                _registered_method=True)
+
+
+class AccountDetailsServiceServicer:
+    """message GetAccountDetailResponse {
+    AccountDetail account = 1;
+    }
+
+    """
+
+    def getAccountDetails(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def createAccount(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def getAccounts(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def getAccountDetailsBatch(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+
+def add_AccountDetailsServiceServicer_to_server(servicer, server):
+    rpc_method_handlers = {
+            'getAccountDetails': grpc.unary_unary_rpc_method_handler(
+                    servicer.getAccountDetails,
+                    request_deserializer=protobufs_dot_accounts__pb2.GetAccountDetailRequest.FromString,
+                    response_serializer=protobufs_dot_accounts__pb2.AccountDetail.SerializeToString,
+            ),
+            'createAccount': grpc.unary_unary_rpc_method_handler(
+                    servicer.createAccount,
+                    request_deserializer=protobufs_dot_accounts__pb2.CreateAccountRequest.FromString,
+                    response_serializer=protobufs_dot_accounts__pb2.CreateAccountResponse.SerializeToString,
+            ),
+            'getAccounts': grpc.unary_unary_rpc_method_handler(
+                    servicer.getAccounts,
+                    request_deserializer=protobufs_dot_accounts__pb2.GetAccountsRequest.FromString,
+                    response_serializer=protobufs_dot_accounts__pb2.GetAccountsResponse.SerializeToString,
+            ),
+            'getAccountDetailsBatch': grpc.unary_unary_rpc_method_handler(
+                    servicer.getAccountDetailsBatch,
+                    request_deserializer=protobufs_dot_accounts__pb2.GetAccountDetailsBatchRequest.FromString,
+                    response_serializer=protobufs_dot_accounts__pb2.GetAccountDetailsBatchResponse.SerializeToString,
+            ),
+    }
+    generic_handler = grpc.method_handlers_generic_handler(
+            'AccountDetailsService', rpc_method_handlers)
+    server.add_generic_rpc_handlers((generic_handler,))
+    server.add_registered_method_handlers('AccountDetailsService', rpc_method_handlers)
+
+
+ # This class is part of an EXPERIMENTAL API.
+class AccountDetailsService:
+    """message GetAccountDetailResponse {
+    AccountDetail account = 1;
+    }
+
+    """
+
+    @staticmethod
+    def getAccountDetails(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/AccountDetailsService/getAccountDetails',
+            protobufs_dot_accounts__pb2.GetAccountDetailRequest.SerializeToString,
+            protobufs_dot_accounts__pb2.AccountDetail.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def createAccount(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/AccountDetailsService/createAccount',
+            protobufs_dot_accounts__pb2.CreateAccountRequest.SerializeToString,
+            protobufs_dot_accounts__pb2.CreateAccountResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def getAccounts(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/AccountDetailsService/getAccounts',
+            protobufs_dot_accounts__pb2.GetAccountsRequest.SerializeToString,
+            protobufs_dot_accounts__pb2.GetAccountsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def getAccountDetailsBatch(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/AccountDetailsService/getAccountDetailsBatch',
+            protobufs_dot_accounts__pb2.GetAccountDetailsBatchRequest.SerializeToString,
+            protobufs_dot_accounts__pb2.GetAccountDetailsBatchResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
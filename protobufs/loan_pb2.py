@@ -0,0 +1,72 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+# -*- coding: utf-8 -*-
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# NO CHECKED-IN PROTOBUF GENCODE
+# source: protobufs/loan.proto
+# Protobuf Python Version: 7.35.1
+"""Generated protocol buffer code."""
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import runtime_version as _runtime_version
+from google.protobuf import symbol_database as _symbol_database
+from google.protobuf.internal import builder as _builder
+_runtime_version.ValidateProtobufRuntimeVersion(
+    _runtime_version.Domain.PUBLIC,
+    7,
+    35,
+    1,
+    '',
+    'protobufs/loan.proto'
+)
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x14protobufs/loan.proto\"\xda\x01\n\x0bLoanRequest\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\r\n\x05\x65mail\x18\x02 \x01(\t\x12\x14\n\x0c\x61\x63\x63ount_type\x18\x03 \x01(\t\x12\x16\n\x0e\x61\x63\x63ount_number\x18\x04 \x01(\t\x12\x14\n\x0cgovt_id_type\x18\x05 \x01(\t\x12\x16\n\x0egovt_id_number\x18\x06 \x01(\t\x12\x11\n\tloan_type\x18\x07 \x01(\t\x12\x13\n\x0bloan_amount\x18\x08 \x01(\x01\x12\x15\n\rinterest_rate\x18\t \x01(\x01\x12\x13\n\x0btime_period\x18\n \x01(\t\"1\n\x0cLoanResponse\x12\x10\n\x08\x61pproved\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\"$\n\x13LoansHistoryRequest\x12\r\n\x05\x65mail\x18\x01 \x01(\t\"\xf6\x01\n\x04Loan\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\r\n\x05\x65mail\x18\x02 \x01(\t\x12\x14\n\x0c\x61\x63\x63ount_type\x18\x03 \x01(\t\x12\x16\n\x0e\x61\x63\x63ount_number\x18\x04 \x01(\t\x12\x14\n\x0cgovt_id_type\x18\x05 \x01(\t\x12\x16\n\x0egovt_id_number\x18\x06 \x01(\t\x12\x11\n\tloan_type\x18\x07 \x01(\t\x12\x13\n\x0bloan_amount\x18\x08 \x01(\x01\x12\x15\n\rinterest_rate\x18\t \x01(\x01\x12\x13\n\x0btime_period\x18\n \x01(\t\x12\x0e\n\x06status\x18\x0b \x01(\t\x12\x11\n\ttimestamp\x18\x0c \x01(\t\",\n\x14LoansHistoryResponse\x12\x14\n\x05loans\x18\x01 \x03(\x0b\x32\x05.Loan\"B\n\nLoanTicket\x12\x10\n\x08\x61\x63\x63\x65pted\x18\x01 \x01(\x08\x12\x11\n\tticket_id\x18\x02 \x01(\t\x12\x0f\n\x07message\x18\x03 \x01(\t\"&\n\x11LoanStatusRequest\x12\x11\n\tticket_id\x18\x01 \x01(\t\"R\n\nLoanStatus\x12\x11\n\tticket_id\x18\x01 \x01(\t\x12\x0e\n\x06status\x18\x02 \x01(\t\x12\x10\n\x08\x61pproved\x18\x03 \x01(\x08\x12\x0f\n\x07message\x18\x04 \x01(\t\"W\n\x10LoanStatsRequest\x12\x10\n\x08\x66rom_day\x18\x01 \x01(\t\x12\x0e\n\x06to_day\x18\x02 \x01(\t\x12\x11\n\tloan_type\x18\x03 \x01(\t\x12\x0e\n\x06status\x18\x04 \x01(\t\"f\n\x0fLoanStatsBucket\x12\x0b\n\x03\x64\x61y\x18\x01 \x01(\t\x12\x11\n\tloan_type\x18\x02 \x01(\t\x12\x0e\n\x06status\x18\x03 \x01(\t\x12\r\n\x05\x63ount\x18\x04 \x01(\x03\x12\x14\n\x0ctotal_amount\x18\x05 \x01(\x01\"5\n\x0eLoanStatsTotal\x12\r\n\x05\x63ount\x18\x01 \x01(\x03\x12\x14\n\x0ctotal_amount\x18\x02 \x01(\x01\"\xd6\x02\n\x11LoanStatsResponse\x12!\n\x07\x62uckets\x18\x01 \x03(\x0b\x32\x10.LoanStatsBucket\x12\x13\n\x0btotal_count\x18\x02 \x01(\x03\x12\x14\n\x0ctotal_amount\x18\x03 \x01(\x01\x12\x38\n\x0c\x62y_loan_type\x18\x04 \x03(\x0b\x32\".LoanStatsResponse.ByLoanTypeEntry\x12\x33\n\tby_status\x18\x05 \x03(\x0b\x32 .LoanStatsResponse.ByStatusEntry\x1a\x42\n\x0f\x42yLoanTypeEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\x1e\n\x05value\x18\x02 \x01(\x0b\x32\x0f.LoanStatsTotal:\x02\x38\x01\x1a@\n\rByStatusEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\x1e\n\x05value\x18\x02 \x01(\x0b\x32\x0f.LoanStatsTotal:\x02\x38\x01\x32\xa1\x02\n\x0bLoanService\x12\x31\n\x12ProcessLoanRequest\x12\x0c.LoanRequest\x1a\r.LoanResponse\x12=\n\x0egetLoanHistory\x12\x14.LoansHistoryRequest\x1a\x15.LoansHistoryResponse\x12.\n\x11SubmitLoanRequest\x12\x0c.LoanRequest\x1a\x0b.LoanTicket\x12\x30\n\rgetLoanStatus\x12\x12.LoanStatusRequest\x1a\x0b.LoanStatus\x12>\n\x15getLoanPortfolioStats\x12\x11.LoanStatsRequest\x1a\x12.LoanStatsResponseb\x06proto3')
+
+_globals = globals()
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'protobufs.loan_pb2', _globals)
+if not _descriptor._USE_C_DESCRIPTORS:
+  DESCRIPTOR._loaded_options = None
+  _globals['_LOANSTATSRESPONSE_BYLOANTYPEENTRY']._loaded_options = None
+  _globals['_LOANSTATSRESPONSE_BYLOANTYPEENTRY']._serialized_options = b'8\001'
+  _globals['_LOANSTATSRESPONSE_BYSTATUSENTRY']._loaded_options = None
+  _globals['_LOANSTATSRESPONSE_BYSTATUSENTRY']._serialized_options = b'8\001'
+  _globals['_LOANREQUEST']._serialized_start=25
+  _globals['_LOANREQUEST']._serialized_end=243
+  _globals['_LOANRESPONSE']._serialized_start=245
+  _globals['_LOANRESPONSE']._serialized_end=294
+  _globals['_LOANSHISTORYREQUEST']._serialized_start=296
+  _globals['_LOANSHISTORYREQUEST']._serialized_end=332
+  _globals['_LOAN']._serialized_start=335
+  _globals['_LOAN']._serialized_end=581
+  _globals['_LOANSHISTORYRESPONSE']._serialized_start=583
+  _globals['_LOANSHISTORYRESPONSE']._serialized_end=627
+  _globals['_LOANTICKET']._serialized_start=629
+  _globals['_LOANTICKET']._serialized_end=695
+  _globals['_LOANSTATUSREQUEST']._serialized_start=697
+  _globals['_LOANSTATUSREQUEST']._serialized_end=735
+  _globals['_LOANSTATUS']._serialized_start=737
+  _globals['_LOANSTATUS']._serialized_end=819
+  _globals['_LOANSTATSREQUEST']._serialized_start=821
+  _globals['_LOANSTATSREQUEST']._serialized_end=908
+  _globals['_LOANSTATSBUCKET']._serialized_start=910
+  _globals['_LOANSTATSBUCKET']._serialized_end=1012
+  _globals['_LOANSTATSTOTAL']._serialized_start=1014
+  _globals['_LOANSTATSTOTAL']._serialized_end=1067
+  _globals['_LOANSTATSRESPONSE']._serialized_start=1070
+  _globals['_LOANSTATSRESPONSE']._serialized_end=1412
+  _globals['_LOANSTATSRESPONSE_BYLOANTYPEENTRY']._serialized_start=1280
+  _globals['_LOANSTATSRESPONSE_BYLOANTYPEENTRY']._serialized_end=1346
+  _globals['_LOANSTATSRESPONSE_BYSTATUSENTRY']._serialized_start=1348
+  _globals['_LOANSTATSRESPONSE_BYSTATUSENTRY']._serialized_end=1412
+  _globals['_LOANSERVICE']._serialized_start=1415
+  _globals['_LOANSERVICE']._serialized_end=1704
+# @@protoc_insertion_point(module_scope)
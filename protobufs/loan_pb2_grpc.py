@@ -0,0 +1,273 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+# Generated by the gRPC Python protocol compiler plugin. DO NOT EDIT!
+"""Client and server classes corresponding to protobuf-defined services."""
+import grpc
+import warnings
+
+from protobufs import loan_pb2 as protobufs_dot_loan__pb2
+
+GRPC_GENERATED_VERSION = '1.84.0'
+GRPC_VERSION = grpc.__version__
+_version_not_supported = False
+
+try:
+    from grpc._utilities import first_version_is_lower
+    _version_not_supported = first_version_is_lower(GRPC_VERSION, GRPC_GENERATED_VERSION)
+except ImportError:
+    _version_not_supported = True
+
+if _version_not_supported:
+    raise RuntimeError(
+        f'The grpc package installed is at version {GRPC_VERSION},'
+        + ' but the generated code in protobufs/loan_pb2_grpc.py depends on'
+        + f' grpcio>={GRPC_GENERATED_VERSION}.'
+        + f' Please upgrade your grpc module to grpcio>={GRPC_GENERATED_VERSION}'
+        + f' or downgrade your generated code using grpcio-tools<={GRPC_VERSION}.'
+    )
+
+
+class LoanServiceStub:
+    """Missing associated documentation comment in .proto file."""
+
+    def __init__(self, channel):
+        """Constructor.
+
+        Args:
+            channel: A grpc.Channel.
+        """
+        self.ProcessLoanRequest = channel.unary_unary(
+                '/LoanService/ProcessLoanRequest',
+                request_serializer=protobufs_dot_loan__pb2.LoanRequest.SerializeToString,
+                response_deserializer=protobufs_dot_loan__pb2.LoanResponse.FromString,
+                _registered_method=True)
+        self.getLoanHistory = channel.unary_unary(
+                '/LoanService/getLoanHistory',
+                request_serializer=protobufs_dot_loan__pb2.LoansHistoryRequest.SerializeToString,
+                response_deserializer=protobufs_dot_loan__pb2.LoansHistoryResponse.FromString,
+                _registered_method=True)
+        self.SubmitLoanRequest = channel.unary_unary(
+                '/LoanService/SubmitLoanRequest',
+                request_serializer=protobufs_dot_loan__pb2.LoanRequest.SerializeToString,
+                response_deserializer=protobufs_dot_loan__pb2.LoanTicket.FromString,
+                _registered_method=True)
+        self.getLoanStatus = channel.unary_unary(
+                '/LoanService/getLoanStatus',
+                request_serializer=protobufs_dot_loan__pb2.LoanStatusRequest.SerializeToString,
+                response_deserializer=protobufs_dot_loan__pb2.LoanStatus.FromString,
+                _registered_method=True)
+        self.getLoanPortfolioStats = channel.unary_unary(
+                '/LoanService/getLoanPortfolioStats',
+                request_serializer=protobufs_dot_loan__pb2.LoanStatsRequest.SerializeToString,
+                response_deserializer=protobufs_dot_loan__pb2.LoanStatsResponse.FromString,
+                _registered_method=True)
+
+
+class LoanServiceServicer:
+    """Missing associated documentation comment in .proto file."""
+
+    def ProcessLoanRequest(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def getLoanHistory(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def SubmitLoanRequest(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def getLoanStatus(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def getLoanPortfolioStats(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+
+def add_LoanServiceServicer_to_server(servicer, server):
+    rpc_method_handlers = {
+            'ProcessLoanRequest': grpc.unary_unary_rpc_method_handler(
+                    servicer.ProcessLoanRequest,
+                    request_deserializer=protobufs_dot_loan__pb2.LoanRequest.FromString,
+                    response_serializer=protobufs_dot_loan__pb2.LoanResponse.SerializeToString,
+            ),
+            'getLoanHistory': grpc.unary_unary_rpc_method_handler(
+                    servicer.getLoanHistory,
+                    request_deserializer=protobufs_dot_loan__pb2.LoansHistoryRequest.FromString,
+                    response_serializer=protobufs_dot_loan__pb2.LoansHistoryResponse.SerializeToString,
+            ),
+            'SubmitLoanRequest': grpc.unary_unary_rpc_method_handler(
+                    servicer.SubmitLoanRequest,
+                    request_deserializer=protobufs_dot_loan__pb2.LoanRequest.FromString,
+                    response_serializer=protobufs_dot_loan__pb2.LoanTicket.SerializeToString,
+            ),
+            'getLoanStatus': grpc.unary_unary_rpc_method_handler(
+                    servicer.getLoanStatus,
+                    request_deserializer=protobufs_dot_loan__pb2.LoanStatusRequest.FromString,
+                    response_serializer=protobufs_dot_loan__pb2.LoanStatus.SerializeToString,
+            ),
+            'getLoanPortfolioStats': grpc.unary_unary_rpc_method_handler(
+                    servicer.getLoanPortfolioStats,
+                    request_deserializer=protobufs_dot_loan__pb2.LoanStatsRequest.FromString,
+                    response_serializer=protobufs_dot_loan__pb2.LoanStatsResponse.SerializeToString,
+            ),
+    }
+    generic_handler = grpc.method_handlers_generic_handler(
+            'LoanService', rpc_method_handlers)
+    server.add_generic_rpc_handlers((generic_handler,))
+    server.add_registered_method_handlers('LoanService', rpc_method_handlers)
+
+
+ # This class is part of an EXPERIMENTAL API.
+class LoanService:
+    """Missing associated documentation comment in .proto file."""
+
+    @staticmethod
+    def ProcessLoanRequest(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/LoanService/ProcessLoanRequest',
+            protobufs_dot_loan__pb2.LoanRequest.SerializeToString,
+            protobufs_dot_loan__pb2.LoanResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def getLoanHistory(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/LoanService/getLoanHistory',
+            protobufs_dot_loan__pb2.LoansHistoryRequest.SerializeToString,
+            protobufs_dot_loan__pb2.LoansHistoryResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def SubmitLoanRequest(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/LoanService/SubmitLoanRequest',
+            protobufs_dot_loan__pb2.LoanRequest.SerializeToString,
+            protobufs_dot_loan__pb2.LoanTicket.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def getLoanStatus(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/LoanService/getLoanStatus',
+            protobufs_dot_loan__pb2.LoanStatusRequest.SerializeToString,
+            protobufs_dot_loan__pb2.LoanStatus.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def getLoanPortfolioStats(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/LoanService/getLoanPortfolioStats',
+            protobufs_dot_loan__pb2.LoanStatsRequest.SerializeToString,
+            protobufs_dot_loan__pb2.LoanStatsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
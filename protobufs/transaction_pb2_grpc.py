@@ -0,0 +1,230 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+# Generated by the gRPC Python protocol compiler plugin. DO NOT EDIT!
+"""Client and server classes corresponding to protobuf-defined services."""
+import grpc
+import warnings
+
+from protobufs import transaction_pb2 as protobufs_dot_transaction__pb2
+
+GRPC_GENERATED_VERSION = '1.84.0'
+GRPC_VERSION = grpc.__version__
+_version_not_supported = False
+
+try:
+    from grpc._utilities import first_version_is_lower
+    _version_not_supported = first_version_is_lower(GRPC_VERSION, GRPC_GENERATED_VERSION)
+except ImportError:
+    _version_not_supported = True
+
+if _version_not_supported:
+    raise RuntimeError(
+        f'The grpc package installed is at version {GRPC_VERSION},'
+        + ' but the generated code in protobufs/transaction_pb2_grpc.py depends on'
+        + f' grpcio>={GRPC_GENERATED_VERSION}.'
+        + f' Please upgrade your grpc module to grpcio>={GRPC_GENERATED_VERSION}'
+        + f' or downgrade your generated code using grpcio-tools<={GRPC_VERSION}.'
+    )
+
+
+class TransactionServiceStub:
+    """Missing associated documentation comment in .proto file."""
+
+    def __init__(self, channel):
+        """Constructor.
+
+        Args:
+            channel: A grpc.Channel.
+        """
+        self.sendMoney = channel.unary_unary(
+                '/TransactionService/sendMoney',
+                request_serializer=protobufs_dot_transaction__pb2.TransactionRequest.SerializeToString,
+                response_deserializer=protobufs_dot_transaction__pb2.TransactionResponse.FromString,
+                _registered_method=True)
+        self.getTransactionsHistory = channel.unary_unary(
+                '/TransactionService/getTransactionsHistory',
+                request_serializer=protobufs_dot_transaction__pb2.GetALLTransactionsRequest.SerializeToString,
+                response_deserializer=protobufs_dot_transaction__pb2.GetALLTransactionsResponse.FromString,
+                _registered_method=True)
+        self.Zelle = channel.unary_unary(
+                '/TransactionService/Zelle',
+                request_serializer=protobufs_dot_transaction__pb2.ZelleRequest.SerializeToString,
+                response_deserializer=protobufs_dot_transaction__pb2.TransactionResponse.FromString,
+                _registered_method=True)
+        self.getTransactionByID = channel.unary_unary(
+                '/TransactionService/getTransactionByID',
+                request_serializer=protobufs_dot_transaction__pb2.TransactionByIDRequest.SerializeToString,
+                response_deserializer=protobufs_dot_transaction__pb2.Transaction.FromString,
+                _registered_method=True)
+
+
+class TransactionServiceServicer:
+    """Missing associated documentation comment in .proto file."""
+
+    def sendMoney(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def getTransactionsHistory(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def Zelle(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def getTransactionByID(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+
+def add_TransactionServiceServicer_to_server(servicer, server):
+    rpc_method_handlers = {
+            'sendMoney': grpc.unary_unary_rpc_method_handler(
+                    servicer.sendMoney,
+                    request_deserializer=protobufs_dot_transaction__pb2.TransactionRequest.FromString,
+                    response_serializer=protobufs_dot_transaction__pb2.TransactionResponse.SerializeToString,
+            ),
+            'getTransactionsHistory': grpc.unary_unary_rpc_method_handler(
+                    servicer.getTransactionsHistory,
+                    request_deserializer=protobufs_dot_transaction__pb2.GetALLTransactionsRequest.FromString,
+                    response_serializer=protobufs_dot_transaction__pb2.GetALLTransactionsResponse.SerializeToString,
+            ),
+            'Zelle': grpc.unary_unary_rpc_method_handler(
+                    servicer.Zelle,
+                    request_deserializer=protobufs_dot_transaction__pb2.ZelleRequest.FromString,
+                    response_serializer=protobufs_dot_transaction__pb2.TransactionResponse.SerializeToString,
+            ),
+            'getTransactionByID': grpc.unary_unary_rpc_method_handler(
+                    servicer.getTransactionByID,
+                    request_deserializer=protobufs_dot_transaction__pb2.TransactionByIDRequest.FromString,
+                    response_serializer=protobufs_dot_transaction__pb2.Transaction.SerializeToString,
+            ),
+    }
+    generic_handler = grpc.method_handlers_generic_handler(
+            'TransactionService', rpc_method_handlers)
+    server.add_generic_rpc_handlers((generic_handler,))
+    server.add_registered_method_handlers('TransactionService', rpc_method_handlers)
+
+
+ # This class is part of an EXPERIMENTAL API.
+class TransactionService:
+    """Missing associated documentation comment in .proto file."""
+
+    @staticmethod
+    def sendMoney(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/TransactionService/sendMoney',
+            protobufs_dot_transaction__pb2.TransactionRequest.SerializeToString,
+            protobufs_dot_transaction__pb2.TransactionResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def getTransactionsHistory(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/TransactionService/getTransactionsHistory',
+            protobufs_dot_transaction__pb2.GetALLTransactionsRequest.SerializeToString,
+            protobufs_dot_transaction__pb2.GetALLTransactionsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def Zelle(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/TransactionService/Zelle',
+            protobufs_dot_transaction__pb2.ZelleRequest.SerializeToString,
+            protobufs_dot_transaction__pb2.TransactionResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def getTransactionByID(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/TransactionService/getTransactionByID',
+            protobufs_dot_transaction__pb2.TransactionByIDRequest.SerializeToString,
+            protobufs_dot_transaction__pb2.Transaction.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
@@ -65,6 +65,7 @@ run_python_microservice() {
     osascript -e "\
         tell application \"Terminal\" to do script \
         \"cd '$current_dir' && cd '$service_name' && \
+        export PYTHONPATH='$current_dir' WEB_SERVER=werkzeug MONGO_QUERY_MONITOR=true MONGO_EXPLAIN=all && \
         rm -rf venv_bankapp && python3 -m venv venv_bankapp && \
         source venv_bankapp/bin/activate && \
         pip3 install -r requirements.txt && python3 '$service_alias.py'\""
@@ -4,8 +4,8 @@
 
 import grpc 
 
-from transaction_pb2_grpc import TransactionServiceStub
-from transaction_pb2 import TransactionRequest, TransactionResponse
+from protobufs.transaction_pb2_grpc import TransactionServiceStub
+from protobufs.transaction_pb2 import TransactionRequest, TransactionResponse
 
 channel = grpc.insecure_channel('localhost:50052')
 client = TransactionServiceStub(channel)
@@ -0,0 +1,52 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+import pytest
+from dotmap import DotMap
+
+import accounts
+import transaction
+from common.account_filter import AccountFilter
+
+
+@pytest.fixture
+def account_filter(database):
+    database.accounts.insert_many([
+        {"account_number": "A1", "email_id": "a@example.com", "account_type": "Checking", "balance": 100.0},
+        {"account_number": "B1", "email_id": "b@example.com", "account_type": "Checking", "balance": 100.0},
+    ])
+    account_filter = AccountFilter(transaction.collection_accounts)
+    account_filter.rebuild()
+    return account_filter
+
+
+def send(account_filter, sender, receiver):
+    return transaction.TransactionGeneric(account_filter).SendMoney(
+        DotMap(sender_account_number=sender, receiver_account_number=receiver, amount=1, reason="Rent")
+    )
+
+
+def test_unknown_numbers_are_rejected(account_filter):
+    assert send(account_filter, "X1", "B1") == {"approved": False, "message": "Sender Account Not Found."}
+    assert send(account_filter, "A1", "X1") == {"approved": False, "message": "Receiver Account Not Found."}
+    assert send(account_filter, "A1", "B1")["approved"]
+    assert account_filter.stats()["rejections"] == 2
+
+
+def test_false_positive_is_recorded(account_filter):
+    account_filter.add("X1")
+
+    assert send(account_filter, "X1", "B1") == {"approved": False, "message": "Sender Account Not Found."}
+    assert account_filter.stats()["false_positives"] == 1
+
+
+def test_account_created_in_process_is_accepted(account_filter):
+    created = accounts.AccountsGeneric(on_created=(account_filter.add,))
+    assert created.createAccount(DotMap(
+        email_id="c@example.com", account_type="Checking", address="Mars", govt_id_number="1",
+        government_id_type="Passport", name="Carol",
+    ))
+    number = accounts.collection.find_one({"email_id": "c@example.com"})["account_number"]
+
+    assert send(account_filter, number, "A1")["approved"]
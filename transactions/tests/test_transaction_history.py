@@ -0,0 +1,115 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+import pytest
+
+import transaction
+from common.account_filter import AccountFilter
+
+
+@pytest.fixture
+def client(database):
+    database.accounts.insert_many([
+        {"account_number": "A1", "email_id": "a@example.com", "account_type": "Checking", "balance": 100.0},
+        {"account_number": "B1", "email_id": "b@example.com", "account_type": "Checking", "balance": 100.0},
+    ])
+    return transaction.create_app(AccountFilter(transaction.collection_accounts, enabled=False)).test_client()
+
+
+def transfer(client, amount=1, sender="A1", receiver="B1"):
+    response = client.post(
+        "/transfer",
+        json={"sender_account_number": sender, "receiver_account_number": receiver, "amount": amount, "reason": "Rent"},
+    )
+    assert response.json["approved"]
+
+
+def history(client, account_number="A1", etag=None, **kwargs):
+    headers = {"If-None-Match": etag} if etag else {}
+    return client.post("/transaction-history", json={"account_number": account_number, **kwargs}, headers=headers)
+
+
+def test_history_has_an_etag(client):
+    transfer(client)
+    response = history(client)
+
+    assert response.status_code == 200
+    assert len(response.json) == 1
+    assert response.headers["ETag"]
+
+
+def test_unchanged_history_is_not_modified(client):
+    transfer(client)
+    etag = history(client).headers["ETag"]
+    response = history(client, etag=etag)
+
+    assert response.status_code == 304
+    assert response.data == b""
+    assert response.headers["ETag"] == etag
+
+
+def test_new_transaction_changes_the_etag(client):
+    transfer(client)
+    etag = history(client).headers["ETag"]
+    transfer(client, sender="B1", receiver="A1")
+    response = history(client, etag=etag)
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert len(response.json) == 2
+
+
+def test_etag_is_per_account(client, database):
+    database.accounts.insert_one({"account_number": "C1", "balance": 0.0})
+    transfer(client)
+    etag = history(client, "C1").headers["ETag"]
+    transfer(client)
+
+    assert history(client, "C1", etag=etag).status_code == 304
+
+
+def test_since_transaction_id_returns_the_newer_rows(client):
+    for amount in (1, 2, 3):
+        transfer(client, amount)
+    rows = history(client).json
+    response = history(client, since=rows[0]["transaction_id"])
+
+    assert [r["amount"] for r in rows] == [1, 2, 3]
+    assert response.json == rows[1:]
+
+
+def test_since_last_row_is_empty(client):
+    transfer(client)
+    rows = history(client).json
+
+    assert history(client, since=rows[-1]["transaction_id"]).json == []
+
+
+def test_since_timestamp(client, database):
+    transfer(client, 1)
+    transfer(client, 2)
+    newest = database.transactions.find_one({"amount": 2})
+    database.transactions.update_one({"_id": newest["_id"]}, {"$set": {"time_stamp": newest["time_stamp"].replace(year=2100)}})
+    response = history(client, since="2099-01-01T00:00:00")
+
+    assert [r["amount"] for r in response.json] == [2]
+
+
+def test_invalid_since(client):
+    transfer(client)
+    response = history(client, since="yesterday")
+
+    assert response.status_code == 400
+    assert "ETag" not in response.headers
+
+
+def test_delta_has_its_own_etag(client):
+    transfer(client)
+    since = history(client).json[0]["transaction_id"]
+    full = history(client).headers["ETag"]
+    delta = history(client, since=since)
+
+    assert delta.headers["ETag"] != full
+    assert history(client, etag=full, since=since).status_code == 200
+    assert history(client, etag=delta.headers["ETag"], since=since).status_code == 304
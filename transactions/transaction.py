@@ -2,74 +2,70 @@
 # Use of this source code is governed by a BSD-style
 # license that can be found in the LICENSE file.
 
-from concurrent import futures
 import datetime
+import hashlib
 from bson.objectid import ObjectId
 import os
-import grpc
-from flask import Flask, request, jsonify
-
-from dotmap import DotMap
-
-# Configure the logging settings
-import logging
-
-logging.basicConfig(
-    level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(message)s"
-)
-from transaction_pb2 import *
-import transaction_pb2_grpc
-from flask import Flask, request, jsonify
-
-from google.protobuf.json_format import MessageToDict
-
-from dotenv import load_dotenv
-load_dotenv()
 
 import logging
 
-# set logging to debug
-logging.basicConfig(level=logging.DEBUG)
-
-from pymongo.mongo_client import MongoClient
-
-
-# db_host = os.getenv("DATABASE_HOST", "localhost")
-
-db_url = os.getenv("DB_URL")
-if db_url is None:
-    raise Exception("DB_URL environment variable is not set")                   
+if __name__ == "__main__":
+    # before the imports below, which read their settings from the environment;
+    # importing this module (the dashboard's inproc mode) has no side effects
+    from dotenv import load_dotenv
+    load_dotenv()
 
-uri = db_url
+from common import log, metrics, mongo, profiling, timing, tracing
+from common.server import serve_flask, serve_grpc
+from common.account_filter import AccountFilter
 
 
-# protocol = os.getenv('SERVICE_PROTOCOL')
-protocol = os.getenv('SERVICE_PROTOCOL', 'http')
-if protocol is None:
-    raise Exception("SERVICE_PROTOCOL environment variable is not set")
+# pool size, compression, write concern, ... are tuned via MONGO_* (see common/mongo.py)
+collection_accounts = mongo.get_collection("accounts", "ledger")
+collection_accounts.ensure_index("account_number")
+collection_transactions = mongo.get_collection("transactions", "ledger")
+# serve history lookups and their version token (count + newest _id)
+collection_transactions.ensure_index([("sender", 1), ("_id", -1)])
+collection_transactions.ensure_index([("receiver", 1), ("_id", -1)])
 
-protocol = protocol.lower()
-logging.debug(f"microservice protocol: {protocol}")
 
+def setup():
+    """Process-wide setup of the standalone service; the dashboard does its own."""
+    # LOG_LEVEL, LOG_FORMAT, ... (see common/log.py)
+    log.setup("transactions")
+    metrics.setup("transactions")
+    tracing.setup("transactions")
+    profiling.setup("transactions")
+    timing.setup("transactions")
 
-client = MongoClient(uri)
-#client = MongoClient(uri, maxPoolSize=200, minPoolSize=10) #--> To increase the connection pool size
-db = client["bank"]
-collection_accounts = db["accounts"]
-collection_transactions = db["transactions"]
+    # db_host = os.getenv("DATABASE_HOST", "localhost")
+    if os.getenv("DB_URL") is None:
+        raise Exception("DB_URL environment variable is not set")
+    mongo.configure("transactions")
 
 
 class TransactionGeneric:
+    def __init__(self, account_filter):
+        # Bloom filter of known account numbers: rejects unknown numbers without a lookup
+        self.account_filter = account_filter
+
     def SendMoney(self, request):
+        if not self.account_filter.might_contain(request.sender_account_number):
+            return {"approved": False, "message": "Sender Account Not Found."}
+        if not self.account_filter.might_contain(request.receiver_account_number):
+            return {"approved": False, "message": "Receiver Account Not Found."}
+
         sender_account = self.__getAccount(request.sender_account_number)
         receiver_account = self.__getAccount(request.receiver_account_number)
+        if sender_account is None or receiver_account is None:
+            self.account_filter.record_false_positive()
         return self.__transfer(
             sender_account, receiver_account, float(request.amount), request.reason
         )
 
     def GetTransactionByID(self, request):
         transaction_id = request.transaction_id
-        logging.debug(f"Transaction ID: {transaction_id}")
+        logging.debug("Transaction ID: %s", transaction_id)
         count = collection_transactions.count_documents(
             {"_id": ObjectId(transaction_id)}
         )
@@ -85,44 +81,68 @@ class TransactionGeneric:
             "account_number": transaction["receiver"],
             "amount": transaction["amount"],
             "reason": transaction["reason"],
-            "time_stamp": f"{transaction['time_stamp']}",
+            "time_stamp": transaction["time_stamp"],
             "type": "credit",
-            "transaction_id": str(transaction["_id"]),
+            "transaction_id": transaction["_id"],
         }
 
     def GetTransactionsHistory(self, request):
         account_number = request.account_number
         # logging.debug(f"Account Number: {account_number}")
+        since = self.__sinceFilter(request.since or "")
 
-        # find based on account number only based on sender
-        transactions_credit = collection_transactions.find({"sender": account_number})
-        transactions_debit = collection_transactions.find({"receiver": account_number})
+        # one query in _id order: the last row is the next since cursor
+        transactions = collection_transactions.find(
+            {"$or": [{"sender": account_number}, {"receiver": account_number}], **since}
+        ).sort("_id", 1)
 
         transactions_list = []
-        for t in transactions_credit:
-            temp_t = {
-                "account_number": t["receiver"],
-                "amount": t["amount"],
-                "reason": t["reason"],
-                "time_stamp": f"{t['time_stamp']}",
-                "type": "credit",
-                "transaction_id": str(t["_id"]),
-            }
-            transactions_list.append(temp_t)
-
-        for t in transactions_debit:
+        for t in transactions:
             temp_t = {
                 "account_number": t["receiver"],
                 "amount": t["amount"],
                 "reason": t["reason"],
-                "time_stamp": f"{t['time_stamp']}",
+                "time_stamp": t["time_stamp"],
                 "type": "credit",
-                "transaction_id": str(t["_id"]),
+                "transaction_id": t["_id"],
             }
             transactions_list.append(temp_t)
 
         return transactions_list
 
+    def __sinceFilter(self, since):
+        # delta sync: a last-seen transaction_id is a range on the
+        # (sender, _id) / (receiver, _id) indexes; timestamps filter the
+        # account's rows by time_stamp. Raises ValueError on bad input.
+        if not since:
+            return {}
+        if ObjectId.is_valid(since):
+            return {"_id": {"$gt": ObjectId(since)}}
+        return {"time_stamp": {"$gt": datetime.datetime.fromisoformat(since)}}
+
+    def GetTransactionsHistoryVersion(self, request):
+        """Cheap version token (ETag) of an account's transaction history.
+
+        Ledger rows are only ever inserted, so the number of rows plus the
+        newest ``_id`` changes whenever the history does. Both come from the
+        ``(sender, _id)`` / ``(receiver, _id)`` indexes. A delta (``since``)
+        is a different representation of the history, so its version also
+        carries a digest of ``since``.
+        """
+        account_number = request.account_number
+        query = {"$or": [{"sender": account_number}, {"receiver": account_number}]}
+        count = collection_transactions.count_documents(query)
+        version = "0"
+        if count > 0:
+            newest = collection_transactions.find_one(
+                query, {"_id": 1}, sort=[("_id", -1)]
+            )
+            version = f"{count}-{newest['_id']}"
+        if request.since:
+            # hashed: since is not validated yet and may not be header-safe
+            version += "-" + hashlib.blake2b(request.since.encode(), digest_size=8).hexdigest()
+        return version
+
     def Zelle(self, request):
         sender_email = request.sender_email
         receiver_email = request.receiver_email
@@ -146,8 +166,8 @@ class TransactionGeneric:
         result = self.__doTransaction(
             sender_account, receiver_account, amount, reason=reason
         )
-        logging.debug(f"---> sender: {sender_account}")
-        logging.debug(f"--->receiver: {receiver_account}")
+        logging.debug("sender: %s", sender_account)
+        logging.debug("receiver: %s", receiver_account)
         return result
 
     def __doTransaction(self, sender, receiver, amount, reason=""):
@@ -183,11 +203,7 @@ class TransactionGeneric:
         return {"approved": True, "message": "Transaction is Successful."}
 
     def __getAccountwithEmail(self, email):
-        logging.debug(f"Email: {email}")
-        # log the document with the email
-        logging.debug(
-            f"Document with email: {collection_accounts.count_documents({'email_id': email, 'account_type': 'Checking'})}"
-        )
+        logging.debug("Email: %s", email)
 
         document = None
 
@@ -201,7 +217,7 @@ class TransactionGeneric:
                 {"email_id": email, "account_type": "Checking"}
             )
             document = checking_account[0]
-            logging.debug(f"Checking Account: {document}")
+            logging.debug("Checking Account: %s", document)
             return document
         else:
             if (
@@ -214,126 +230,49 @@ class TransactionGeneric:
                     {"email_id": email, "account_type": "Savings"}
                 )
                 document = saving_account[0]
-                logging.debug(f"Savings Account: {document}")
+                logging.debug("Savings Account: %s", document)
                 return document
             # logging.debug(f"Savings Account: {document}")
         logging.debug("No Account Found")
         return document
 
     def __getAccount(self, account_num):
-        r = None
-        accounts = collection_accounts.find()
-        # logging.debug(f"Accounts: {list(accounts)}")
-        for acc in accounts:
-            if acc["account_number"] == account_num:
-                r = acc
-                break
-        # logging.debug(f"Account {r}")
-        return r
-
-
-class TransactionService(transaction_pb2_grpc.TransactionServiceServicer):
-    def __init__(self):
-        self.transaction = TransactionGeneric()
-
-    def sendMoney(self, request, context):
-        t = TransactionResponse()
-        result = self.transaction.SendMoney(request)
-        t.approved = result["approved"]
-        t.message = result["message"]
-        return t
-
-    def Zelle(self, request, context):
-        result = self.transaction.Zelle(request)
-        t = TransactionResponse(approved=result["approved"], message=result["message"])
-        return t
-
-    def getTransactionByID(self, request, context):
-        result = self.transaction.GetTransactionByID(request)
-        if len(result) == 0:
-            return Transaction()
-        else:
-            return Transaction(
-                account_number=result["account_number"],
-                amount=result["amount"],
-                reason=result["reason"],
-                time_stamp=result["time_stamp"],
-                type="credit",
-                transaction_id=result["transaction_id"],
-            )
-
-    def getTransactionsHistory(self, request, context):
-        results = self.transaction.GetTransactionsHistory(request)
-        transactions_list = []
-        for t in results:
-            temp_t = Transaction(
-                account_number=t["account_number"],
-                amount=t["amount"],
-                reason=t["reason"],
-                time_stamp=t["time_stamp"],
-                type=t["type"],
-                transaction_id=t["transaction_id"],
-            )
-            transactions_list.append(temp_t)
+        return collection_accounts.find_one({"account_number": account_num})
 
-        return GetALLTransactionsResponse(transactions=transactions_list)
 
+def create_app(account_filter):
+    """The HTTP service (see ``transaction_http.py``)."""
+    import transaction_http
 
-
-
-
-
-app = Flask(__name__)
-transaction_generic = TransactionGeneric()
-
-@app.route("/transfer", methods=["POST"])
-def sendMoney():
-    data = request.json
-    data = DotMap(data)
-    result = transaction_generic.SendMoney(data)
-    return jsonify(result)
-
-@app.route("/zelle", methods=["POST"])
-def zelle():
-    logging.debug(" Zelle API called")
-    data = request.json
-    data = DotMap(data)
-    result = transaction_generic.Zelle(data)
-    return jsonify(result)
-
-@app.route("/transaction-with-id", methods=["POST"])
-def getTransactionByID():
-    logging.debug(" Get Transaction By ID API called")
-    data = request.json
-    data = DotMap(data)
-    result = transaction_generic.GetTransactionByID(data)
-    return jsonify(result)
-
-@app.route("/transaction-history", methods=["POST"])
-def getTransactionsHistory():
-    data = request.json
-    data = DotMap(data)
-    result = transaction_generic.GetTransactionsHistory(data)
-    return jsonify(result)
-
+    return transaction_http.create_app(TransactionGeneric(account_filter), account_filter)
 
 
 def serverFlask(port):
-    logging.debug(f"Starting Flask server on port {port}")
-    app.run(host='0.0.0.0' ,port=port, debug=True)
+    logging.debug("Starting Flask server on port %s", port)
+    account_filter = AccountFilter.from_env(collection_accounts)
+    # the filter is built in each worker, after the fork
+    serve_flask(create_app(account_filter), port, on_worker_start=account_filter.ensure_started)
 
 
 def serverGRPC(port):
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
-    transaction_pb2_grpc.add_TransactionServiceServicer_to_server(
-        TransactionService(), server
+    logging.debug("Starting GRPC server on port %s", port)
+    # imported here: the HTTP service never loads grpc or the generated code
+    import transaction_grpc
+    from protobufs import transaction_pb2_grpc
+
+    account_filter = AccountFilter.from_env(collection_accounts)
+    account_filter.start()
+    serve_grpc(
+        transaction_grpc.TransactionService(TransactionGeneric(account_filter)),
+        transaction_pb2_grpc.add_TransactionServiceServicer_to_server,
+        port,
     )
-    server.add_insecure_port(f"[::]:{port}")
-    logging.debug(f"Starting server. Listening on port {port}.")
-    server.start()
-    server.wait_for_termination()
 
 if __name__ == "__main__":
+    setup()
+    protocol = os.getenv('SERVICE_PROTOCOL', 'http').lower()
+    logging.debug("microservice protocol: %s", protocol)
+
     port  = 50052
     # serverGRPC(port)
     # serverFlask(port)
@@ -342,4 +281,3 @@ if __name__ == "__main__":
         serverGRPC(port)
     else:
         serverFlask(port)
-
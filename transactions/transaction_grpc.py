@@ -0,0 +1,54 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""gRPC API of the transactions service (``SERVICE_PROTOCOL=grpc``)."""
+
+import grpc
+
+from protobufs.transaction_pb2 import GetALLTransactionsResponse, Transaction, TransactionResponse
+from protobufs import transaction_pb2_grpc
+
+from common import metrics, proto
+
+
+class TransactionService(transaction_pb2_grpc.TransactionServiceServicer):
+    def __init__(self, transaction_generic):
+        self.transaction = transaction_generic
+
+    def sendMoney(self, request, context):
+        t = TransactionResponse()
+        result = self.transaction.SendMoney(request)
+        t.approved = result["approved"]
+        t.message = result["message"]
+        return t
+
+    def Zelle(self, request, context):
+        result = self.transaction.Zelle(request)
+        t = TransactionResponse(approved=result["approved"], message=result["message"])
+        return t
+
+    def getTransactionByID(self, request, context):
+        result = self.transaction.GetTransactionByID(request)
+        if len(result) == 0:
+            return Transaction()
+        else:
+            return proto.from_dict(Transaction, dict(result, type="credit"))
+
+    def getTransactionsHistory(self, request, context):
+        # conditional request: the dashboard forwards If-None-Match as metadata
+        version = self.transaction.GetTransactionsHistoryVersion(request)
+        if_none_match = dict(context.invocation_metadata()).get("if-none-match")
+        if if_none_match == version:
+            metrics.cache_hit("etag")
+            context.set_trailing_metadata((("etag", version), ("not-modified", "1")))
+            return GetALLTransactionsResponse()
+        if if_none_match:
+            metrics.cache_miss("etag")
+        context.set_trailing_metadata((("etag", version),))
+
+        try:
+            results = self.transaction.GetTransactionsHistory(request)
+        except ValueError:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, f"Invalid since: {request.since}")
+        return proto.from_dict(GetALLTransactionsResponse, {"transactions": results})
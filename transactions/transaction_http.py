@@ -0,0 +1,78 @@
+# Copyright (c) 2023 Cisco Systems, Inc. and its affiliates All rights reserved.
+# Use of this source code is governed by a BSD-style
+# license that can be found in the LICENSE file.
+
+"""HTTP API of the transactions service (``SERVICE_PROTOCOL=http``)."""
+
+import logging
+
+from dotmap import DotMap
+from flask import Flask, request, jsonify
+
+from common import compression, metrics, mongo, profiling, timing, tracing
+
+
+def create_app(transaction_generic, account_filter):
+    app = Flask(__name__)
+    metrics.instrument_flask(app)
+    tracing.instrument_flask(app)
+    profiling.instrument_flask(app)
+    timing.instrument_flask(app)
+    compression.instrument_flask(app)
+
+    def not_modified(version):
+        response = app.make_response(("", 304))
+        response.set_etag(version)
+        return response
+
+    @app.route("/transfer", methods=["POST"])
+    def sendMoney():
+        data = request.json
+        data = DotMap(data)
+        result = transaction_generic.SendMoney(data)
+        return jsonify(result)
+
+    @app.route("/zelle", methods=["POST"])
+    def zelle():
+        logging.debug(" Zelle API called")
+        data = request.json
+        data = DotMap(data)
+        result = transaction_generic.Zelle(data)
+        return jsonify(result)
+
+    @app.route("/transaction-with-id", methods=["POST"])
+    def getTransactionByID():
+        logging.debug(" Get Transaction By ID API called")
+        data = request.json
+        data = DotMap(data)
+        result = transaction_generic.GetTransactionByID(data)
+        return jsonify(result)
+
+    @app.route("/transaction-history", methods=["POST"])
+    def getTransactionsHistory():
+        data = request.json
+        data = DotMap(data)
+        version = transaction_generic.GetTransactionsHistoryVersion(data)
+        if request.if_none_match.contains(version):
+            return not_modified(version)
+        try:
+            result = transaction_generic.GetTransactionsHistory(data)
+        except ValueError:
+            return jsonify({"error": f"Invalid since: {data.since}"}), 400
+        response = jsonify(result)
+        response.set_etag(version)
+        return response
+
+    @app.route("/mongo-pool", methods=["GET"])
+    def getMongoPoolStats():
+        return jsonify(mongo.pool_stats())
+
+    @app.route("/mongo-queries", methods=["GET"])
+    def getMongoQueryStats():
+        return jsonify(mongo.query_stats())
+
+    @app.route("/account-filter", methods=["GET"])
+    def getAccountFilterStats():
+        return jsonify(account_filter.stats())
+
+    return app